@@ -8,9 +8,11 @@ sys.path.insert(0, backend_dir)
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from models.db import db
+from utils.json_provider import FastJSONProvider
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson-backed when installed
 CORS(app)  # Enable CORS for all routes
 
 # Configuration
@@ -26,6 +28,86 @@ else:
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Keyset pagination of list endpoints (?limit= is capped at MAX_PAGE_SIZE)
+app.config['DEFAULT_PAGE_SIZE'] = int(os.environ.get('DEFAULT_PAGE_SIZE', 20))
+app.config['MAX_PAGE_SIZE'] = int(os.environ.get('MAX_PAGE_SIZE', 100))
+
+# Cache-Control max-age (seconds) of conditional GET responses; clients
+# revalidate with If-None-Match afterwards and get a 304 if nothing changed
+app.config['HTTP_CACHE_MAX_AGE'] = int(os.environ.get('HTTP_CACHE_MAX_AGE', 30))
+
+# Shared secret for /api/admin endpoints (sent as X-Admin-Token); unset disables them
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+
+# Rows per INSERT/commit when bulk loading job feeds (see ingest_jobs.py)
+app.config['INGEST_BATCH_SIZE'] = int(os.environ.get('INGEST_BATCH_SIZE', 1000))
+
+# Estimated description similarity (Jaccard of word shingles) above which a
+# new posting is treated as a near-duplicate of an existing one
+app.config['DUPLICATE_THRESHOLD'] = float(os.environ.get('DUPLICATE_THRESHOLD', 0.8))
+
+# Similar jobs (see compute_job_neighbors.py): neighbors kept per job, the
+# blend of skill Jaccard and description cosine, and the posting-list length
+# above which a skill is too common to make two jobs candidates on its own
+app.config['NEIGHBORS_PER_JOB'] = int(os.environ.get('NEIGHBORS_PER_JOB', 10))
+app.config['NEIGHBOR_SKILL_WEIGHT'] = float(os.environ.get('NEIGHBOR_SKILL_WEIGHT', 0.5))
+app.config['NEIGHBOR_TEXT_WEIGHT'] = float(os.environ.get('NEIGHBOR_TEXT_WEIGHT', 0.5))
+app.config['NEIGHBOR_MAX_POSTING'] = int(os.environ.get('NEIGHBOR_MAX_POSTING', 2000))
+
+# Where recommendation candidates come from: 'index' (in-process skill index)
+# or 'sql' (scored by the database over the job_skills/user_skills tables)
+app.config['RECOMMENDATION_SOURCE'] = os.environ.get('RECOMMENDATION_SOURCE', 'index')
+
+# Directory of the persisted TF-IDF job model (see build_job_model.py)
+app.config['JOB_MODEL_DIR'] = os.environ.get('JOB_MODEL_DIR') or \
+    os.path.join(backend_dir, '..', 'ml', 'models', 'job_tfidf')
+
+# Hybrid recommendations: how many skill-overlap candidates get reranked by
+# text similarity, and how the two scores are blended
+app.config['RANKER_CANDIDATES'] = int(os.environ.get('RANKER_CANDIDATES', 300))
+app.config['RANKER_SKILL_WEIGHT'] = float(os.environ.get('RANKER_SKILL_WEIGHT', 0.7))
+app.config['RANKER_TEXT_WEIGHT'] = float(os.environ.get('RANKER_TEXT_WEIGHT', 0.3))
+
+# spaCy pipeline used to parse resumes: 'ner' keeps only the entity
+# recognizer, 'full' the whole pipeline. parse_worker.py loads it once before
+# forking its parser processes, so they share its pages
+app.config['NLP_MODEL'] = os.environ.get('NLP_MODEL', 'en_core_web_sm')
+app.config['NLP_PROFILE'] = os.environ.get('NLP_PROFILE', 'ner')
+
+# Resume parse queue (see parse_worker.py): parser processes per worker, how
+# long a claimed job stays invisible to other workers before it is retried,
+# and how many attempts a resume gets before its job is marked failed
+app.config['RESUME_PARSE_CONCURRENCY'] = int(os.environ.get('RESUME_PARSE_CONCURRENCY', 2))
+app.config['RESUME_PARSE_VISIBILITY_TIMEOUT'] = int(os.environ.get('RESUME_PARSE_VISIBILITY_TIMEOUT', 300))
+app.config['RESUME_PARSE_MAX_ATTEMPTS'] = int(os.environ.get('RESUME_PARSE_MAX_ATTEMPTS', 3))
+
+# Budgets of the text extraction of one resume: pages read, bytes of text and
+# seconds, after which the text is truncated (and the resume flagged), and
+# the memory of the sandboxed extraction process
+app.config['RESUME_PARSE_MAX_PAGES'] = int(os.environ.get('RESUME_PARSE_MAX_PAGES', 20))
+app.config['RESUME_PARSE_MAX_BYTES'] = int(os.environ.get('RESUME_PARSE_MAX_BYTES', 1024 * 1024))
+app.config['RESUME_PARSE_MAX_SECONDS'] = float(os.environ.get('RESUME_PARSE_MAX_SECONDS', 30))
+app.config['RESUME_PARSE_MAX_MEMORY'] = int(os.environ.get('RESUME_PARSE_MAX_MEMORY', 512 * 1024 * 1024))
+
+# Resume.parsed_data larger than this many bytes is stored zlib-compressed
+# (0: never compress)
+app.config['RESUME_PARSED_COMPRESS_MIN'] = int(os.environ.get('RESUME_PARSED_COMPRESS_MIN', 2048))
+
+# Text extraction backends (see ml/scripts/text_extraction.py); run
+# ml/scripts/benchmark_extractors.py on a sample of resumes to pick them
+app.config['PDF_EXTRACTOR'] = os.environ.get('PDF_EXTRACTOR', 'pypdf2')
+app.config['DOCX_EXTRACTOR'] = os.environ.get('DOCX_EXTRACTOR', 'iterparse')
+
+# POST /api/resumes/analyze/batch: most resumes per request, and processes
+# scoring batches larger than one chunk (0: score in the request thread)
+app.config['ANALYZE_BATCH_MAX'] = int(os.environ.get('ANALYZE_BATCH_MAX', 1000))
+app.config['ANALYZE_BATCH_PROCESSES'] = int(os.environ.get('ANALYZE_BATCH_PROCESSES', 2))
+
+# Cache of resume parses and analyses by content hash: least recently used
+# entries are evicted past either bound
+app.config['PARSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('PARSE_CACHE_MAX_ENTRIES', 10000))
+app.config['PARSE_CACHE_MAX_BYTES'] = int(os.environ.get('PARSE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
 # Initialize database with app
 db.init_app(app)
 
@@ -35,17 +117,35 @@ from models.job import Job
 from models.resume import Resume
 from models.user_job_match import UserJobMatch
 from models.portfolio import Portfolio
+from models.skill import Skill
+from models.user_skill import UserSkill
+from models.job_skill import JobSkill
+from models.job_lsh_band import JobLshBand
+from models.job_neighbor import JobNeighbor
+from models.job_neighbor_run import JobNeighborRun
+from models.job_list_version import JobListVersion
+from models.parse_job import ParseJob
+from models.parse_cache_entry import ParseCacheEntry
+from utils.schema import upgrade_schema
+from utils.job_search import ensure_search_index
+# Registers the hooks that count job writes (and creates the counter row with its table)
+import utils.job_version
 
 # Create database tables if they don't exist
 with app.app_context():
     db.create_all()
+    with db.engine.begin() as connection:
+        # Columns and indexes added to existing tables since the database was created
+        upgrade_schema(connection)
+        # Full-text index for databases created before job search existed
+        ensure_search_index(connection)
 
 # Create upload folder if it doesn't exist
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
     os.makedirs(app.config['UPLOAD_FOLDER'])
 
 # Import routes
-from routes import auth_routes, resume_routes, job_routes, portfolio_routes, user_routes
+from routes import auth_routes, resume_routes, job_routes, portfolio_routes, user_routes, admin_routes
 
 # Register blueprints
 app.register_blueprint(auth_routes.bp)
@@ -53,6 +153,7 @@ app.register_blueprint(resume_routes.bp)
 app.register_blueprint(job_routes.bp)
 app.register_blueprint(portfolio_routes.bp)
 app.register_blueprint(user_routes.bp)
+app.register_blueprint(admin_routes.bp)
 
 @app.route('/')
 def index():
@@ -0,0 +1,51 @@
+import sys
+import os
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from sqlalchemy import update
+from models.db import db
+from models.job import Job
+from utils.job_attributes import parse_location, parse_salary_range
+
+BATCH_SIZE = 1000
+
+def backfill_job_attributes():
+    """Parse salary_min/max and city/region/country/remote for every existing job"""
+    with app.app_context():
+        print("Backfilling job salary and location columns...")
+        count = 0
+        last_id = 0
+        while True:
+            rows = (db.session.query(Job.id, Job.salary_range, Job.location)
+                    .filter(Job.id > last_id)
+                    .order_by(Job.id)
+                    .limit(BATCH_SIZE)
+                    .all())
+            if not rows:
+                break
+            
+            updates = []
+            for job_id, salary_range, location in rows:
+                salary_min, salary_max = parse_salary_range(salary_range)
+                updates.append(dict(parse_location(location), id=job_id,
+                                    salary_min=salary_min, salary_max=salary_max))
+            # Bulk UPDATE ... WHERE id = :id, one executemany per batch
+            db.session.execute(update(Job), updates)
+            db.session.commit()
+            
+            count += len(rows)
+            last_id = rows[-1][0]
+        print(f"Backfilled {count} jobs")
+
+if __name__ == '__main__':
+    backfill_job_attributes()
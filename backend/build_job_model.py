@@ -0,0 +1,36 @@
+import sys
+import os
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from utils.job_model import MATCHER_AVAILABLE, build_job_model, update_job_model
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or incrementally update the TF-IDF job model')
+    parser.add_argument('--full', action='store_true', help='refit from scratch instead of updating')
+    parser.add_argument('--job-id', type=int, action='append', dest='job_ids',
+                        help='re-vectorize an edited job (repeatable)')
+    args = parser.parse_args()
+
+    if not MATCHER_AVAILABLE:
+        print("Job matcher not available - ML dependencies may be missing")
+        sys.exit(1)
+
+    with app.app_context():
+        if args.full:
+            build_job_model()
+        else:
+            update_job_model(job_ids=args.job_ids)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import sys
+import os
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory (input and output paths stay relative to the caller's)
+cwd = os.getcwd()
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from utils.bulk_resume_parse import Checkpoint, DatabaseSink, JsonlSink, bulk_parse
+from utils.parse_queue import extraction_limits, extractor_config
+
+def log(message):
+    # stdout may be carrying the JSONL output
+    print(message, file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse a directory of PDF/DOCX resumes with all cores')
+    parser.add_argument('directory', help='directory searched recursively for .pdf and .docx files')
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--output', help="JSONL file the parsed resumes are appended to, or '-' for stdout")
+    output.add_argument('--user-id', type=int, help='insert the parsed resumes into resumes under this user')
+    parser.add_argument('--checkpoint', help='file of already processed paths '
+                                             '(default: OUTPUT.checkpoint, or bulk_parse.checkpoint with --user-id)')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--batch-size', type=int, default=32, help='files per worker task and nlp.pipe call')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='parse every file even if its content is in the parse cache')
+    args = parser.parse_args()
+
+    if args.batch_size < 1 or (args.processes is not None and args.processes < 1):
+        parser.error('--batch-size and --processes must be positive')
+
+    directory = os.path.join(cwd, args.directory)
+    checkpoint_path = args.checkpoint or (
+        f'{args.output}.checkpoint' if args.output and args.output != '-' else 'bulk_parse.checkpoint')
+    checkpoint = Checkpoint(os.path.join(cwd, checkpoint_path))
+
+    with app.app_context():
+        if args.output == '-':
+            sink = JsonlSink(sys.stdout)
+        elif args.output:
+            sink = JsonlSink(open(os.path.join(cwd, args.output), 'a', encoding='utf-8'))
+        else:
+            sink = DatabaseSink(args.user_id)
+
+        log(f"Parsing resumes under {args.directory} ({len(checkpoint.done)} already done)...")
+        limits, max_memory = extraction_limits()
+        stats = bulk_parse(directory, sink, checkpoint, processes=args.processes, batch_size=args.batch_size,
+                           model=app.config['NLP_MODEL'], profile=app.config['NLP_PROFILE'],
+                           limits=limits, max_memory=max_memory, extractors=extractor_config(),
+                           use_cache=not args.no_cache, log=log)
+        log(f"Parsed {stats['parsed']} resumes ({stats['failed']} failed, {stats['cached']} cached, "
+            f"{stats['skipped']} skipped) "
+            f"in {stats['seconds']:.2f}s ({stats['files_per_second']:.1f} files/s); stage throughput: "
+            f"extract {stats['extract_files_per_second']:.1f}, nlp {stats['nlp_files_per_second']:.1f}, "
+            f"write {stats['write_files_per_second']:.1f} files/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import sys
+import os
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from utils.job_neighbors import refresh_neighbors
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh the precomputed similar jobs of each active job')
+    parser.add_argument('--full', action='store_true',
+                        help='recompute every job instead of only those affected by changes since the last run')
+    parser.add_argument('--top-k', type=int, default=None,
+                        help='neighbors to keep per job (default: NEIGHBORS_PER_JOB)')
+    args = parser.parse_args()
+
+    if args.top_k is not None and args.top_k < 1:
+        parser.error('--top-k must be positive')
+
+    with app.app_context():
+        print("Refreshing similar jobs...")
+        stats = refresh_neighbors(full=args.full, top_k=args.top_k)
+        print(f"Wrote {stats['neighbors']} neighbors for {stats['refreshed']} of {stats['jobs']} active jobs "
+              f"in {stats['seconds']:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import sys
+import os
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from models.db import db
+from utils.job_dedup import dedupe_catalog
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-sign every job and collapse near-duplicate postings')
+    parser.add_argument('--batch-size', type=int, default=1000, help='jobs signed per batch')
+    args = parser.parse_args()
+
+    if args.batch_size < 1:
+        parser.error('--batch-size must be positive')
+
+    with app.app_context():
+        print("Deduplicating jobs...")
+        # Assignments are computed for the whole catalog and written in one commit
+        stats = dedupe_catalog(batch_size=args.batch_size)
+        db.session.commit()
+
+        print(f"Marked {stats['duplicates']} of {stats['jobs']} jobs as near-duplicates "
+              f"({stats['changed']} changed)")
+
+if __name__ == '__main__':
+    main()
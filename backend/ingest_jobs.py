@@ -0,0 +1,44 @@
+import sys
+import os
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory (feed paths stay relative to the caller's)
+cwd = os.getcwd()
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from utils.job_ingest import FORMATS, feed_format, ingest_jobs
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk load a JSONL or CSV feed of job postings')
+    parser.add_argument('feed', help="path of the feed, or '-' for stdin")
+    parser.add_argument('--format', choices=FORMATS, help='feed format (default: from the file extension)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='rows per INSERT and commit (default: INGEST_BATCH_SIZE)')
+    args = parser.parse_args()
+
+    if args.batch_size is not None and args.batch_size < 1:
+        parser.error('--batch-size must be positive')
+    fmt = args.format or feed_format(args.feed)
+
+    with app.app_context():
+        batch_size = args.batch_size or app.config['INGEST_BATCH_SIZE']
+        print(f"Ingesting {args.feed} ({fmt})...")
+        if args.feed == '-':
+            stats = ingest_jobs(sys.stdin, fmt=fmt, batch_size=batch_size)
+        else:
+            with open(os.path.join(cwd, args.feed), encoding='utf-8', newline='') as feed:
+                stats = ingest_jobs(feed, fmt=fmt, batch_size=batch_size)
+        print(f"Inserted {stats['inserted']} of {stats['read']} jobs ({stats['duplicates']} duplicates, "
+              f"{stats['near_duplicates']} near-duplicates, {stats['rejected']} rejected) "
+              f"in {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s)")
+
+if __name__ == '__main__':
+    main()
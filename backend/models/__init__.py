@@ -4,5 +4,14 @@ from models.user import User
 from models.job import Job
 from models.resume import Resume
 from models.user_job_match import UserJobMatch
+from models.skill import Skill
+from models.user_skill import UserSkill
+from models.job_skill import JobSkill
+from models.job_lsh_band import JobLshBand
+from models.job_neighbor import JobNeighbor
+from models.job_neighbor_run import JobNeighborRun
+from models.job_list_version import JobListVersion
+from models.parse_job import ParseJob
+from models.parse_cache_entry import ParseCacheEntry
 
-__all__ = ['db', 'User', 'Job', 'Resume', 'UserJobMatch']
\ No newline at end of file
+__all__ = ['db', 'User', 'Job', 'Resume', 'UserJobMatch', 'Skill', 'UserSkill', 'JobSkill', 'JobLshBand', 'JobNeighbor', 'JobNeighborRun', 'JobListVersion', 'ParseJob', 'ParseCacheEntry']
\ No newline at end of file
@@ -1,8 +1,23 @@
 from models.db import db
+from sqlalchemy.orm import validates
 from datetime import datetime
+from utils.job_attributes import parse_location, parse_salary_range
 
 class Job(db.Model):
     __tablename__ = 'jobs'
+    __table_args__ = (
+        # Keyset pagination of active jobs, newest first
+        db.Index('ix_jobs_active_posted_at', 'active', 'posted_at', 'id'),
+        # Version of the job listing for conditional requests
+        db.Index('ix_jobs_updated_at', 'updated_at'),
+        # Salary and location filters of the job listing
+        db.Index('ix_jobs_salary_max', 'salary_max'),
+        db.Index('ix_jobs_salary_min', 'salary_min'),
+        db.Index('ix_jobs_region', 'region'),
+        db.Index('ix_jobs_country', 'country'),
+        db.Index('ix_jobs_remote', 'remote'),
+        db.Index('ix_jobs_canonical_job_id', 'canonical_job_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -11,12 +26,38 @@ class Job(db.Model):
     requirements = db.Column(db.Text)  # JSON string of required skills
     location = db.Column(db.String(100))
     salary_range = db.Column(db.String(50))
+    
+    # Parsed from salary_range and location whenever those are set
+    salary_min = db.Column(db.Integer)  # Annual amount
+    salary_max = db.Column(db.Integer)
+    city = db.Column(db.String(100))
+    region = db.Column(db.String(100))  # Two-letter code for US states
+    country = db.Column(db.String(2))  # ISO 3166-1 alpha-2
+    remote = db.Column(db.Boolean, default=False)
+    
     posted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     active = db.Column(db.Boolean, default=True)
     
+    # Near-duplicate detection (see utils/job_dedup.py): MinHash signature of
+    # the description, and the job this one duplicates (duplicates are inactive)
+    minhash = db.Column(db.LargeBinary)
+    canonical_job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'))
+    
     # Relationship with user-job matches
     matches = db.relationship('UserJobMatch', backref='job', lazy=True)
     
+    @validates('salary_range')
+    def _parse_salary_range(self, key, salary_range):
+        self.salary_min, self.salary_max = parse_salary_range(salary_range)
+        return salary_range
+    
+    @validates('location')
+    def _parse_location(self, key, location):
+        for field, value in parse_location(location).items():
+            setattr(self, field, value)
+        return location
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -25,5 +66,12 @@ class Job(db.Model):
             'description': self.description,
             'location': self.location,
             'salary_range': self.salary_range,
+            'salary_min': self.salary_min,
+            'salary_max': self.salary_max,
+            'city': self.city,
+            'region': self.region,
+            'country': self.country,
+            'remote': self.remote,
+            'canonical_job_id': self.canonical_job_id,
             'posted_at': self.posted_at.isoformat() if self.posted_at else None
         }
\ No newline at end of file
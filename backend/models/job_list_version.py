@@ -0,0 +1,16 @@
+from models.db import db
+
+class JobListVersion(db.Model):
+    """Counter of writes to the jobs table, in a single row (see utils/job_version.py)"""
+    __tablename__ = 'job_list_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)  # Bumped by every transaction writing jobs
+    changed_at = db.Column(db.DateTime)  # Time of the last bump (Last-Modified of the job listing)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'version': self.version,
+            'changed_at': self.changed_at.isoformat() if self.changed_at else None
+        }
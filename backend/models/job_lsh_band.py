@@ -0,0 +1,24 @@
+from models.db import db
+
+class JobLshBand(db.Model):
+    """One LSH band bucket of a canonical job's MinHash signature"""
+    __tablename__ = 'job_lsh_bands'
+    __table_args__ = (
+        # Candidate lookup: jobs sharing a bucket (buckets are hashes, so
+        # the band is checked after the index lookup)
+        db.Index('ix_job_lsh_bands_bucket', 'bucket', 'band', 'job_id'),
+        db.Index('ix_job_lsh_bands_job', 'job_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    band = db.Column(db.SmallInteger, nullable=False)
+    bucket = db.Column(db.BigInteger, nullable=False)  # 63-bit hash of the band's rows
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'band': self.band,
+            'bucket': self.bucket
+        }
@@ -0,0 +1,34 @@
+from models.db import db
+from datetime import datetime
+
+class JobNeighbor(db.Model):
+    """One of the most similar active jobs of a job (see compute_job_neighbors.py)"""
+    __tablename__ = 'job_neighbors'
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'neighbor_id', name='uq_job_neighbors_job_neighbor'),
+        # Serves /api/jobs/<id>/similar in rank order
+        db.Index('ix_job_neighbors_job_rank', 'job_id', 'rank'),
+        # Jobs listing a changed job as a neighbor
+        db.Index('ix_job_neighbors_neighbor', 'neighbor_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    neighbor_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    rank = db.Column(db.Integer, nullable=False)  # 1 = most similar
+    score = db.Column(db.Float, nullable=False)
+    skill_score = db.Column(db.Float)  # Jaccard similarity of the required skills
+    text_score = db.Column(db.Float)  # Cosine similarity of the TF-IDF vectors
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'neighbor_id': self.neighbor_id,
+            'rank': self.rank,
+            'score': self.score,
+            'skill_score': self.skill_score,
+            'text_score': self.text_score,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
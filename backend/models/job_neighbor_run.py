@@ -0,0 +1,27 @@
+from models.db import db
+from datetime import datetime
+
+class JobNeighborRun(db.Model):
+    """A completed refresh of job_neighbors; the latest one is the incremental watermark"""
+    __tablename__ = 'job_neighbor_runs'
+    __table_args__ = (
+        # Latest run (the watermark of the next incremental refresh)
+        db.Index('ix_job_neighbor_runs_started', 'started_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    started_at = db.Column(db.DateTime, nullable=False)  # Jobs written after this are refreshed by the next run
+    finished_at = db.Column(db.DateTime, default=datetime.utcnow)
+    full = db.Column(db.Boolean, default=False)
+    refreshed = db.Column(db.Integer, default=0)  # Jobs recomputed
+    neighbors = db.Column(db.Integer, default=0)  # Rows written
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'full': self.full,
+            'refreshed': self.refreshed,
+            'neighbors': self.neighbors
+        }
@@ -0,0 +1,24 @@
+from models.db import db
+
+class JobSkill(db.Model):
+    __tablename__ = 'job_skills'
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'skill_id', name='uq_job_skills_job_skill'),
+        db.Index('ix_job_skills_skill_job', 'skill_id', 'job_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False)
+    importance_level = db.Column(db.Integer)  # 1-5 scale
+    
+    skill = db.relationship('Skill', lazy='joined')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'skill_id': self.skill_id,
+            'skill': self.skill.name if self.skill else None,
+            'importance_level': self.importance_level
+        }
@@ -0,0 +1,33 @@
+from models.db import db
+from datetime import datetime
+
+class ParseCacheEntry(db.Model):
+    """A cached resume parse or analysis, keyed by content hash and producer version"""
+    __tablename__ = 'parse_cache'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'content_hash', 'version', name='uq_parse_cache_key'),
+        # Least recently used entries are evicted first
+        db.Index('ix_parse_cache_last_used', 'last_used_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'parse' or 'analysis'
+    content_hash = db.Column(db.String(64), nullable=False)  # SHA-256 hex of the input
+    version = db.Column(db.String(200), nullable=False)  # parser/model/taxonomy or analyzer version
+    result = db.Column(db.Text, nullable=False)  # JSON
+    size = db.Column(db.Integer, nullable=False)  # bytes of result
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'content_hash': self.content_hash,
+            'version': self.version,
+            'size': self.size,
+            'hits': self.hits,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None
+        }
@@ -0,0 +1,41 @@
+from models.db import db
+from datetime import datetime
+
+class ParseJob(db.Model):
+    """A queued resume parse, worked off by parse_worker.py"""
+    __tablename__ = 'parse_jobs'
+    __table_args__ = (
+        # Claiming: oldest queued jobs, and running jobs whose lease has expired
+        db.Index('ix_parse_jobs_status_visible', 'status', 'visible_at', 'id'),
+        db.Index('ix_parse_jobs_resume', 'resume_id'),
+    )
+    
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=QUEUED)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Not claimable before this time: the retry backoff of a queued job, or
+    # the lease (visibility timeout) of a running one
+    visible_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    worker = db.Column(db.String(100))  # host:pid holding the lease
+    error = db.Column(db.Text)  # Last failure
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'resume_id': self.resume_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -8,9 +8,12 @@ class Resume(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     file_path = db.Column(db.String(200), nullable=False)
     original_filename = db.Column(db.String(100), nullable=False)
-    parsed_data = db.Column(db.Text)  # JSON string of parsed resume data
+    parsed_data = db.Column(db.Text)  # full parse result (see utils/parsed_resume.py)
     skills = db.Column(db.Text)  # JSON string of extracted skills
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 hex of the uploaded file
+    parse_truncated = db.Column(db.Boolean)  # text extraction stopped at a page, size or time budget
+    parser_version = db.Column(db.Integer, index=True)  # PARSER_VERSION of parsed_data; stale rows are reparsed
     
     # Parsed resume fields
     full_name = db.Column(db.String(100))
@@ -27,5 +30,8 @@ class Resume(db.Model):
             'full_name': self.full_name,
             'email': self.email,
             'phone': self.phone,
-            'skills': self.skills
+            'summary': self.summary,
+            'skills': self.skills,
+            'parse_truncated': self.parse_truncated,
+            'parser_version': self.parser_version
         }
\ No newline at end of file
@@ -1,4 +1,5 @@
 from models.db import db
+from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(db.Model):
@@ -20,6 +21,7 @@ class User(db.Model):
     profile_picture = db.Column(db.String(255))
     
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship with resumes
     resumes = db.relationship('Resume', backref='user', lazy=True)
@@ -3,6 +3,12 @@ from datetime import datetime
 
 class UserJobMatch(db.Model):
     __tablename__ = 'user_job_matches'
+    __table_args__ = (
+        # Serves /api/jobs/matches/<user_id> keyset pages of precomputed matches
+        db.Index('ix_user_job_matches_user_score', 'user_id', 'match_score', 'id'),
+        # Latest match per (user, job)
+        db.Index('ix_user_job_matches_user_job', 'user_id', 'job_id', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
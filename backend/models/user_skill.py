@@ -0,0 +1,26 @@
+from models.db import db
+
+class UserSkill(db.Model):
+    __tablename__ = 'user_skills'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'skill_id', name='uq_user_skills_user_skill'),
+        db.Index('ix_user_skills_skill_user', 'skill_id', 'user_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False)
+    proficiency_level = db.Column(db.Integer)  # 1-5 scale
+    years_of_experience = db.Column(db.Float)
+    
+    skill = db.relationship('Skill', lazy='joined')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'skill_id': self.skill_id,
+            'skill': self.skill.name if self.skill else None,
+            'proficiency_level': self.proficiency_level,
+            'years_of_experience': self.years_of_experience
+        }
@@ -0,0 +1,120 @@
+import sys
+import os
+import argparse
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from utils.parse_queue import (PARSER_AVAILABLE, claim_jobs, complete_job, extend_leases, fail_job,
+                               extraction_limits, extractor_config, init_parser_process, parse_resume_file,
+                               worker_name)
+from utils.parse_cache import PARSE, cache_get, cache_put, cacheable, parse_version
+
+if PARSER_AVAILABLE:
+    from nlp_registry import nlp_registry
+    from text_extraction import configure_extractors
+
+def _new_pool(concurrency, nice):
+    initargs = (app.config['NLP_MODEL'], app.config['NLP_PROFILE'], nice, extractor_config())
+    return ProcessPoolExecutor(max_workers=concurrency, initializer=init_parser_process, initargs=initargs)
+
+def run(concurrency, poll_interval, nice, once):
+    worker = worker_name()
+    if PARSER_AVAILABLE:
+        # Fails here rather than in every parser process when a backend is not installed
+        configure_extractors(**extractor_config())
+        # Load the spaCy pipeline once, before the parser processes are forked
+        nlp_registry.configure(app.config['NLP_MODEL'], app.config['NLP_PROFILE'])
+        nlp_registry.preload()
+    else:
+        print("Warning: Resume parser not available - jobs will fail until ML dependencies are installed")
+
+    version = parse_version()
+    limits, max_memory = extraction_limits()
+    pool = _new_pool(concurrency, nice)
+    in_flight = {}  # future -> (parse job id, content hash)
+    try:
+        while True:
+            if len(in_flight) < concurrency:
+                for job_id, file_path, content_hash in claim_jobs(concurrency - len(in_flight), worker):
+                    # The same file may have been parsed since it was queued
+                    cached = cache_get(PARSE, content_hash, version)
+                    if cached is not None:
+                        complete_job(job_id, worker, cached)
+                        print(f"Parse job {job_id} done from cache")
+                        continue
+                    future = pool.submit(parse_resume_file, file_path, limits, max_memory, content_hash)
+                    in_flight[future] = (job_id, content_hash)
+            if not in_flight:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                job_id, content_hash = in_flight.pop(future)
+                try:
+                    parsed = future.result()
+                except BrokenProcessPool as e:
+                    # A parser process died (e.g. out of memory); its jobs are retried
+                    broken = True
+                    fail_job(job_id, worker, f'Parser process died: {e}')
+                    print(f"Parse job {job_id} failed: parser process died")
+                except Exception as e:
+                    fail_job(job_id, worker, e)
+                    print(f"Parse job {job_id} failed: {e}")
+                else:
+                    if cacheable(parsed):
+                        cache_put(PARSE, content_hash, version, parsed)
+                    complete_job(job_id, worker, parsed)
+                    print(f"Parse job {job_id} done: {len(parsed.get('skills', []))} skills")
+
+            if broken:
+                for job_id, _ in in_flight.values():
+                    fail_job(job_id, worker, 'Parser process died')
+                in_flight.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = _new_pool(concurrency, nice)
+            extend_leases([job_id for job_id, _ in in_flight.values()], worker)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse queued resume uploads in a pool of worker processes')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='parser processes (default: RESUME_PARSE_CONCURRENCY)')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds between queue polls')
+    parser.add_argument('--nice', type=int, default=10,
+                        help='niceness added to the parser processes so they yield to the API')
+    parser.add_argument('--once', action='store_true', help='exit once the queue is empty')
+    args = parser.parse_args()
+
+    if args.concurrency is not None and args.concurrency < 1:
+        parser.error('--concurrency must be positive')
+    if args.poll_interval <= 0:
+        parser.error('--poll-interval must be positive')
+
+    with app.app_context():
+        concurrency = args.concurrency or app.config['RESUME_PARSE_CONCURRENCY']
+        print(f"Parsing queued resumes with {concurrency} processes...")
+        try:
+            run(concurrency, args.poll_interval, args.nice, args.once)
+        except KeyboardInterrupt:
+            # Unfinished jobs become visible again when their lease expires
+            print("Stopped")
+
+if __name__ == '__main__':
+    main()
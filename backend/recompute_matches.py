@@ -0,0 +1,37 @@
+import sys
+import os
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from utils.match_batch import recompute_matches
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute stored user-job matches for all users')
+    parser.add_argument('--top-n', type=int, default=10, help='matches to keep per user')
+    parser.add_argument('--chunk-size', type=int, default=500, help='users scored per sparse product')
+    parser.add_argument('--user-id', type=int, action='append', dest='user_ids',
+                        help='only recompute these users (repeatable)')
+    args = parser.parse_args()
+
+    if args.top_n < 1 or args.chunk_size < 1:
+        parser.error('--top-n and --chunk-size must be positive')
+
+    with app.app_context():
+        print("Recomputing job matches...")
+        stats = recompute_matches(top_n=args.top_n, chunk_size=args.chunk_size, user_ids=args.user_ids)
+        rate = stats['users'] / stats['seconds'] if stats['seconds'] else 0
+        print(f"Wrote {stats['matches']} matches for {stats['users']} users against {stats['jobs']} jobs "
+              f"in {stats['seconds']:.2f}s ({rate:.0f} users/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import sys
+import os
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from utils.parse_queue import PARSER_AVAILABLE, count_stale, enqueue_stale
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Queue a reparse of the resumes parsed by an older parser version (run parse_worker.py to work it off)')
+    parser.add_argument('--limit', type=int, default=None, help='most resumes to queue')
+    parser.add_argument('--batch-size', type=int, default=1000, help='jobs inserted per commit')
+    parser.add_argument('--dry-run', action='store_true', help='only count the stale resumes')
+    args = parser.parse_args()
+
+    if args.limit is not None and args.limit < 1:
+        parser.error('--limit must be positive')
+    if args.batch_size < 1:
+        parser.error('--batch-size must be positive')
+    if not PARSER_AVAILABLE:
+        parser.error('Resume parser not available - ML dependencies may be missing')
+
+    with app.app_context():
+        if args.dry_run:
+            print(f"{count_stale()} resumes are stale")
+            return
+        print("Queueing stale resumes...")
+        queued = enqueue_stale(limit=args.limit, batch_size=args.batch_size)
+        print(f"Queued {queued} resumes for reparsing")
+
+if __name__ == '__main__':
+    main()
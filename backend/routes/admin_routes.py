@@ -0,0 +1,42 @@
+from flask import Blueprint, request, jsonify, current_app
+from utils.job_ingest import FORMATS, feed_format, ingest_jobs, text_stream
+import hmac
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+@bp.before_request
+def require_admin_token():
+    # Admin endpoints are disabled unless ADMIN_TOKEN is configured
+    token = current_app.config.get('ADMIN_TOKEN')
+    if not token:
+        return jsonify({'error': 'Admin endpoints are disabled'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        return jsonify({'error': 'Invalid admin token'}), 401
+
+@bp.route('/jobs/ingest', methods=['POST'])
+def ingest_job_feed():
+    """
+    Bulk load a feed of job postings.
+    Send the feed as a multipart 'file' upload or as the raw request body;
+    ?format=jsonl|csv overrides the format guessed from the file name.
+    """
+    if 'file' in request.files:
+        upload = request.files['file']
+        stream = upload.stream
+        fmt = request.args.get('format') or feed_format(upload.filename)
+    else:
+        stream = request.stream
+        fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'jsonl')
+    
+    if fmt not in FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(FORMATS)}"}), 400
+    
+    try:
+        batch_size = int(request.args.get('batch_size', current_app.config['INGEST_BATCH_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'batch_size must be an integer'}), 400
+    if batch_size < 1:
+        return jsonify({'error': 'batch_size must be positive'}), 400
+    
+    stats = ingest_jobs(text_stream(stream), fmt=fmt, batch_size=batch_size, log=current_app.logger.info)
+    return jsonify({'message': 'Feed ingested', 'stats': stats}), 200
@@ -1,19 +1,41 @@
 from flask import Blueprint, request, jsonify
 from models.job import Job
 from models.user_job_match import UserJobMatch
+from models.job_neighbor import JobNeighbor
 from models.user import User
-from models.resume import Resume
-from models.portfolio import Portfolio
 from models.db import db
+from utils.skills import load_user_skills, parse_job_skills, skill_ids, skill_registry
+from utils.skill_store import sync_job_skills
+from utils.job_ranker import rank_jobs
+from utils.pagination import InvalidCursor, keyset_page
+from utils.job_search import search_jobs
+from utils.http_cache import conditional_response, job_list_version
+from utils.job_dedup import dedupe_job
+from utils.job_attributes import normalize_country, normalize_region
+from utils.projection import SUMMARY_FIELDS, InvalidFields, project_job, projection_columns, requested_fields
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
+from datetime import datetime
 import json
 
 bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
 
 @bp.route('/', methods=['GET'])
 def get_jobs():
+    version, last_modified = job_list_version()
+    return conditional_response(version, _jobs_page, last_modified=last_modified)
+
+def _jobs_page():
     # Get query parameters for filtering
     location = request.args.get('location')
     title = request.args.get('title')
+    q = request.args.get('q', '').strip()
+    
+    # Sparse representation (?fields= or ?view=summary), None for full jobs
+    try:
+        fields = requested_fields(request.args)
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     
     # Build query
     query = Job.query.filter_by(active=True)
@@ -24,18 +46,168 @@ def get_jobs():
     if title:
         query = query.filter(Job.title.contains(title))
     
-    jobs = query.all()
+    # Structured filters on the parsed salary/location columns
+    try:
+        query = _apply_attribute_filters(query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Full-text search: best match first, with highlighted fragments
+    if q:
+        try:
+            results, next_cursor = search_jobs(query, q, request.args)
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        jobs = []
+        for job, score, title_highlight, snippet in results:
+            job_data = project_job(job, fields) if fields else job.to_dict()
+            job_data['search_score'] = score
+            job_data['highlight'] = {'title': title_highlight, 'description': snippet}
+            jobs.append(job_data)
+        return jsonify({'jobs': jobs, 'next_cursor': next_cursor}), 200
+    
+    # Only the requested columns are selected; rows are not ORM objects
+    if fields:
+        query = query.with_entities(*projection_columns(fields, Job.posted_at, Job.id))
     
-    return jsonify({'jobs': [job.to_dict() for job in jobs]}), 200
+    # Newest first, one bounded page at a time
+    try:
+        jobs, next_cursor = keyset_page(query, (Job.posted_at, Job.id), request.args, (datetime, int))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    jobs = [project_job(job, fields) for job in jobs] if fields else [job.to_dict() for job in jobs]
+    return jsonify({'jobs': jobs, 'next_cursor': next_cursor}), 200
+
+def _apply_attribute_filters(query, args):
+    # A job matches min_salary if it can pay that much, max_salary if it starts at or below it
+    for arg, condition in (('min_salary', lambda v: Job.salary_max >= v),
+                           ('max_salary', lambda v: Job.salary_min <= v)):
+        if args.get(arg):
+            try:
+                query = query.filter(condition(int(args[arg])))
+            except ValueError:
+                raise ValueError(f'{arg} must be an integer')
+    
+    remote = args.get('remote')
+    if remote:
+        if remote.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError('remote must be true or false')
+        query = query.filter(Job.remote.is_(remote.lower() in ('true', '1')))
+    
+    # An unrecognized value must not turn into a match of the jobs without one (IS NULL)
+    for arg, column, normalize, expected in (
+            ('region', Job.region, normalize_region, 'a region name or code'),
+            ('country', Job.country, normalize_country, 'a known country name or code')):
+        if args.get(arg):
+            value = normalize(args[arg])
+            if not value:
+                raise ValueError(f'{arg} must be {expected}')
+            query = query.filter(column == value)
+    return query
 
 @bp.route('/<int:job_id>', methods=['GET'])
 def get_job(job_id):
-    job = Job.query.get_or_404(job_id)
-    return jsonify({'job': job.to_dict()}), 200
+    # Only the version is read unless the client's copy is stale
+    row = db.session.query(Job.id, Job.updated_at).filter_by(id=job_id).first()
+    if not row:
+        return jsonify({'error': 'Job not found'}), 404
+    return conditional_response((row.updated_at,), lambda: jsonify({'job': Job.query.get(job_id).to_dict()}),
+                                last_modified=row.updated_at)
+
+@bp.route('/<int:job_id>/similar', methods=['GET'])
+def get_similar_jobs(job_id):
+    try:
+        fields = requested_fields(request.args) or SUMMARY_FIELDS
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Neighbors are precomputed by compute_job_neighbors.py; one read in rank order
+    rows = (db.session.query(JobNeighbor.score, JobNeighbor.skill_score, JobNeighbor.text_score,
+                             *projection_columns(fields))
+            .join(Job, Job.id == JobNeighbor.neighbor_id)
+            .filter(JobNeighbor.job_id == job_id, Job.active.is_(True))
+            .order_by(JobNeighbor.rank)
+            .all())
+    if not rows and not db.session.query(Job.id).filter_by(id=job_id).first():
+        return jsonify({'error': 'Job not found'}), 404
+    
+    similar = []
+    for row in rows:
+        job = project_job(row, fields)
+        job.update(score=row.score, skill_score=row.skill_score, text_score=row.text_score)
+        similar.append(job)
+    return jsonify({'job_id': job_id, 'similar': similar}), 200
+
+JOB_FIELDS = ('title', 'company', 'description', 'location', 'salary_range', 'active')
+
+def _apply_job_fields(job, data):
+    for field in JOB_FIELDS:
+        if field in data:
+            setattr(job, field, data[field])
+    if 'requirements' in data:
+        requirements = data['requirements']
+        # Accept a bare skills list as shorthand for {"skills": [...]}
+        if isinstance(requirements, list):
+            requirements = {'skills': requirements}
+        job.requirements = json.dumps(requirements) if isinstance(requirements, dict) else requirements
+
+@bp.route('/', methods=['POST'])
+def create_job():
+    data = request.get_json()
+    
+    if not data or not all(data.get(k) for k in ('title', 'company', 'description')):
+        return jsonify({'error': 'title, company and description are required'}), 400
+    
+    job = Job()
+    _apply_job_fields(job, data)
+    db.session.add(job)
+    db.session.flush()
+    
+    # Keep the normalized job_skills table in step with the requirements JSON
+    sync_job_skills(job)
+    # Reposts of an existing job are kept, inactive, under its canonical_job_id
+    dedupe_job(job)
+    db.session.commit()
+    
+    return jsonify({'message': 'Job created successfully', 'job': job.to_dict()}), 201
+
+@bp.route('/<int:job_id>', methods=['PUT'])
+def update_job(job_id):
+    job = Job.query.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    data = request.get_json() or {}
+    _apply_job_fields(job, data)
+    if 'requirements' in data:
+        sync_job_skills(job)
+    if 'description' in data:
+        dedupe_job(job)
+    db.session.commit()
+    
+    return jsonify({'message': 'Job updated successfully', 'job': job.to_dict()}), 200
 
 @bp.route('/matches/<int:user_id>', methods=['GET'])
 def get_user_job_matches(user_id):
-    matches = UserJobMatch.query.filter_by(user_id=user_id).join(Job).all()
+    # Only the latest match for each job; older rows are superseded
+    latest = (db.session.query(func.max(UserJobMatch.id))
+              .filter(UserJobMatch.user_id == user_id)
+              .group_by(UserJobMatch.job_id))
+    
+    # The job is loaded by the same query rather than per row
+    query = (UserJobMatch.query
+             .join(UserJobMatch.job)
+             .options(contains_eager(UserJobMatch.job))
+             .filter(UserJobMatch.id.in_(latest)))
+    
+    # Best matches first, one bounded page at a time
+    try:
+        matches, next_cursor = keyset_page(query, (UserJobMatch.match_score, UserJobMatch.id),
+                                           request.args, (float, int))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     
     result = []
     for match in matches:
@@ -43,7 +215,7 @@ def get_user_job_matches(user_id):
         match_data['job'] = match.job.to_dict()
         result.append(match_data)
     
-    return jsonify({'matches': result}), 200
+    return jsonify({'matches': result, 'next_cursor': next_cursor}), 200
 
 @bp.route('/recommendations/<int:user_id>', methods=['GET'])
 def get_job_recommendations(user_id):
@@ -53,29 +225,7 @@ def get_job_recommendations(user_id):
         return jsonify({'error': 'User not found'}), 404
     
     # Get user skills from Portfolio or Resume
-    user_skills = []
-    
-    # Try Portfolio first
-    portfolio = Portfolio.query.filter_by(user_id=user_id).first()
-    if portfolio and portfolio.skills:
-        try:
-            skills_data = json.loads(portfolio.skills)
-            # Combine technical and soft skills if structured, or use as list if flat
-            if isinstance(skills_data, dict):
-                user_skills = (skills_data.get('technical', []) + skills_data.get('soft', []))
-            elif isinstance(skills_data, list):
-                user_skills = skills_data
-        except json.JSONDecodeError:
-            pass
-
-    # If no skills from Portfolio, try Resume
-    if not user_skills:
-        resume = Resume.query.filter_by(user_id=user_id).first()
-        if resume and resume.skills:
-            try:
-                user_skills = json.loads(resume.skills)
-            except json.JSONDecodeError:
-                pass
+    user_skills = load_user_skills(user_id)
     
     # If still no skills, return general job listings
     if not user_skills:
@@ -91,51 +241,34 @@ def get_job_recommendations(user_id):
             })
         return jsonify({'recommendations': recommendations}), 200
     
-    # Get all active jobs
-    jobs = Job.query.filter_by(active=True).all()
+    # Skill-overlap candidates reranked by profile/description similarity
+    ranked = rank_jobs(user, user_skills, limit=10)
+    job_ids = [job_id for job_id, _, _, _, _ in ranked]
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_(job_ids)).all()}
     
-    # Calculate match scores for each job
     recommendations = []
-    for job in jobs:
-        # Get job requirements
-        job_skills = []
-        if job.requirements:
-            try:
-                job_requirements = json.loads(job.requirements)
-                job_skills = job_requirements.get('skills', [])
-            except json.JSONDecodeError:
-                job_skills = []
+    for job_id, match_score, matched_skills, skill_score, text_score in ranked:
+        job = jobs.get(job_id)
+        if job is None:
+            continue
         
-        # Calculate match score based on skills
-        if job_skills:
-            # Normalize skills for comparison (lowercase)
-            user_skills_norm = {s.lower() for s in user_skills}
-            job_skills_norm = {s.lower() for s in job_skills}
-            
-            matched_skills = user_skills_norm & job_skills_norm
-            match_score = len(matched_skills) / len(job_skills_norm) if len(job_skills_norm) > 0 else 0
-            
-            # Convert back to original case for display (best effort)
-            matched_display = [s for s in user_skills if s.lower() in matched_skills]
-            missing_display = [s for s in job_skills if s.lower() not in matched_skills]
-        else:
-            match_score = 0.5  # Default match score if no requirements specified
-            matched_display = []
-            missing_display = []
+        # Show the skills as the user and the posting spell them
+        job_skills = parse_job_skills(job.requirements)
+        matched_skills = matched_skills & set(skill_ids(job_skills))
+        matched_display = [s for s in user_skills if matched_skills.intersection(skill_ids([s]))]
+        missing_display = [s for s in job_skills if not matched_skills.issuperset(skill_ids([s]))]
         
         recommendations.append({
             'job_id': job.id,
             'job': job.to_dict(),
             'match_score': match_score,
+            'skill_score': skill_score,
+            'text_score': text_score,
             'matched_skills': matched_display,
             'missing_skills': missing_display
         })
     
-    # Sort by match score (descending)
-    recommendations.sort(key=lambda x: x['match_score'], reverse=True)
-    
-    # Return top 10 recommendations
-    return jsonify({'recommendations': recommendations[:10]}), 200
+    return jsonify({'recommendations': recommendations}), 200
 
 @bp.route('/match', methods=['POST'])
 def calculate_job_match():
@@ -159,49 +292,22 @@ def calculate_job_match():
         return jsonify({'error': 'Job not found'}), 404
     
     # Get user skills from Portfolio or Resume
-    user_skills = []
-    
-    # Try Portfolio first
-    portfolio = Portfolio.query.filter_by(user_id=user_id).first()
-    if portfolio and portfolio.skills:
-        try:
-            skills_data = json.loads(portfolio.skills)
-            if isinstance(skills_data, dict):
-                user_skills = (skills_data.get('technical', []) + skills_data.get('soft', []))
-            elif isinstance(skills_data, list):
-                user_skills = skills_data
-        except json.JSONDecodeError:
-            pass
-
-    # If no skills from Portfolio, try Resume
-    if not user_skills:
-        resume = Resume.query.filter_by(user_id=user_id).first()
-        if resume and resume.skills:
-            try:
-                user_skills = json.loads(resume.skills)
-            except json.JSONDecodeError:
-                pass
+    user_skills = load_user_skills(user_id)
     
     # Get job requirements
-    job_skills = []
-    if job.requirements:
-        try:
-            job_requirements = json.loads(job.requirements)
-            job_skills = job_requirements.get('skills', [])
-        except json.JSONDecodeError:
-            job_skills = []
-    
-    # Calculate match score
-    if job_skills:
-        user_skills_norm = {s.lower() for s in user_skills}
-        job_skills_norm = {s.lower() for s in job_skills}
+    job_skills = parse_job_skills(job.requirements)
+    
+    # Calculate match score on canonical skill ids
+    job_skill_ids = skill_ids(job_skills)
+    if job_skill_ids:
+        user_skill_ids = set(skill_ids(user_skills))
         
-        matched_skills = user_skills_norm & job_skills_norm
-        missing_skills = job_skills_norm - user_skills_norm
-        match_score = len(matched_skills) / len(job_skills_norm)
+        matched_skills = skill_registry.names(skill_id for skill_id in job_skill_ids if skill_id in user_skill_ids)
+        missing_skills = skill_registry.names(skill_id for skill_id in job_skill_ids if skill_id not in user_skill_ids)
+        match_score = len(matched_skills) / len(job_skill_ids)
     else:
-        matched_skills = set()
-        missing_skills = set()
+        matched_skills = []
+        missing_skills = []
         match_score = 0.5  # Default match score if no requirements specified
     
     # Save match to database
@@ -209,8 +315,8 @@ def calculate_job_match():
         user_id=user_id,
         job_id=job_id,
         match_score=match_score,
-        matched_skills=json.dumps(list(matched_skills)),
-        missing_skills=json.dumps(list(missing_skills))
+        matched_skills=json.dumps(matched_skills),
+        missing_skills=json.dumps(missing_skills)
     )
     
     db.session.add(user_job_match)
@@ -219,6 +325,6 @@ def calculate_job_match():
     return jsonify({
         'match_id': user_job_match.id,
         'match_score': match_score,
-        'matched_skills': list(matched_skills),
-        'missing_skills': list(missing_skills)
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills
     }), 201
\ No newline at end of file
@@ -1,12 +1,21 @@
 from flask import Blueprint, request, jsonify
 from models.portfolio import Portfolio
 from models.db import db
+from utils.skills import load_user_skills
+from utils.skill_store import sync_user_skills
+from utils.http_cache import conditional_response
 import json
 
 bp = Blueprint('portfolio', __name__, url_prefix='/api/portfolio')
 
 @bp.route('/<int:user_id>', methods=['GET'])
 def get_portfolio(user_id):
+    row = db.session.query(Portfolio.id, Portfolio.updated_at).filter_by(user_id=user_id).first()
+    version = (row.id, row.updated_at) if row else (None, None)
+    return conditional_response(version, lambda: _portfolio_body(user_id),
+                                last_modified=row.updated_at if row else None, private=True)
+
+def _portfolio_body(user_id):
     portfolio = Portfolio.query.filter_by(user_id=user_id).first()
     
     if not portfolio:
@@ -45,6 +54,11 @@ def update_portfolio(user_id):
         portfolio.certifications = json.dumps(data['certifications']) if isinstance(data['certifications'], list) else data['certifications']
     if 'preferences' in data:
         portfolio.preferences = json.dumps(data['preferences']) if isinstance(data['preferences'], dict) else data['preferences']
+    
+    # Keep the normalized user_skills table in step with the portfolio
+    if 'skills' in data:
+        db.session.flush()
+        sync_user_skills(user_id, load_user_skills(user_id))
         
     db.session.commit()
     
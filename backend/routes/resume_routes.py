@@ -1,21 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from models.resume import Resume
 from models.db import db
 import os
-import json
+import uuid
 from werkzeug.utils import secure_filename
-from utils.resume_analyzer import ResumeAnalyzer
-
-# Try to import resume parser, but don't fail if ML dependencies are missing
-try:
-    import sys
-    import os as sys_os
-    sys.path.append(sys_os.path.join(sys_os.path.dirname(__file__), '..', '..', 'ml', 'scripts'))
-    from resume_parser import ResumeParser
-    PARSER_AVAILABLE = True
-except ImportError:
-    PARSER_AVAILABLE = False
-    print("Warning: Resume parser not available - ML dependencies may be missing")
+from utils.resume_analyzer import analyze_batch, resume_analyzer
+from utils.parse_queue import enqueue_parse, store_parse
+from utils.parse_cache import (ANALYSIS, PARSE, analysis_version, cache_get, cache_get_many, cache_put,
+                               cache_put_many, data_sha256,
+                               parse_version, save_upload)
+from models.parse_job import ParseJob
 
 bp = Blueprint('resumes', __name__, url_prefix='/api/resumes')
 
@@ -41,13 +35,73 @@ def analyze_resume():
         return jsonify({'error': 'No data provided'}), 400
     
     try:
-        analyzer = ResumeAnalyzer()
-        analysis_result = analyzer.analyze(data)
+        # Resubmitting the same content is served from the cache
+        content_hash, version = data_sha256(data), analysis_version()
+        analysis_result = cache_get(ANALYSIS, content_hash, version)
+        if analysis_result is None:
+            analysis_result = resume_analyzer.analyze(data)
+            cache_put(ANALYSIS, content_hash, version, analysis_result)
+        db.session.commit()
         return jsonify(analysis_result), 200
     except Exception as e:
         print(f"Analysis error: {str(e)}")
         return jsonify({'error': 'Failed to analyze resume'}), 500
 
+@bp.route('/analyze/batch', methods=['POST'])
+def analyze_resumes_batch():
+    """
+    Analyze many resumes in one request.
+    Expected JSON: {"resumes": [{resume as for /analyze}, ...]} (or the bare list)
+
+    Responds with newline-delimited JSON, one line per resume in request
+    order as it is scored: {"index": i, "score": ..., "feedback": {...}},
+    or {"index": i, "error": "..."} for an entry that is not a resume or cannot be analyzed.
+    """
+    data = request.get_json(silent=True)
+    resumes = data.get('resumes') if isinstance(data, dict) else data
+    if not isinstance(resumes, list) or not resumes:
+        return jsonify({'error': 'No resumes provided'}), 400
+    if len(resumes) > current_app.config['ANALYZE_BATCH_MAX']:
+        return jsonify({'error': f"At most {current_app.config['ANALYZE_BATCH_MAX']} resumes per request"}), 400
+
+    # Cached analyses are streamed as they are; the rest are scored in the pool
+    version = analysis_version()
+    content_hashes = [data_sha256(resume) if isinstance(resume, dict) else None for resume in resumes]
+    cached = cache_get_many(ANALYSIS, content_hashes, version)
+    db.session.commit()
+    # First occurrence of each uncached resume; repeats within the request reuse its result
+    pending, seen = [], set(cached)
+    for index, content_hash in enumerate(content_hashes):
+        if content_hash and content_hash not in seen:
+            seen.add(content_hash)
+            pending.append(index)
+    processes = current_app.config['ANALYZE_BATCH_PROCESSES']
+
+    def generate():
+        scored = analyze_batch([resumes[index] for index in pending], processes)
+        fresh = {}
+        for index, content_hash in enumerate(content_hashes):
+            if content_hash is None:
+                line = {'index': index, 'error': 'Resume must be an object'}
+            elif content_hash in cached or content_hash in fresh:
+                line = {'index': index, **(cached.get(content_hash) or fresh[content_hash])}
+            else:
+                fresh[content_hash] = next(scored)
+                line = {'index': index, **fresh[content_hash]}
+            yield current_app.json.dumps(line) + '\n'
+
+        # Errors are not cached
+        fresh = {content_hash: result for content_hash, result in fresh.items() if 'error' not in result}
+        if fresh:
+            try:
+                cache_put_many(ANALYSIS, fresh, version)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Analysis cache error: {str(e)}")
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @bp.route('/upload', methods=['POST'])
 def upload_resume():
     # Check if file is present in request
@@ -70,54 +124,61 @@ def upload_resume():
         return jsonify({'error': 'User ID is required'}), 400
     
     try:
-        # Secure the filename
+        # Secure the filename; it is only kept for display
         filename = secure_filename(file.filename)
         
         # Create upload directory if it doesn't exist
-        upload_dir = '../uploads'
+        upload_dir = current_app.config['UPLOAD_FOLDER']
         if not os.path.exists(upload_dir):
             os.makedirs(upload_dir)
         
-        # Save file
-        file_path = os.path.join(upload_dir, filename)
-        file.save(file_path)
+        # Save file under a name of its own, hashing it as it is written. It is
+        # parsed later by parse_worker.py, so another upload of the same name
+        # must not replace it in between.
+        extension = file.filename.rsplit('.', 1)[1].lower()
+        file_path = os.path.join(upload_dir, f'{uuid.uuid4().hex}.{extension}')
+        content_hash = save_upload(file, file_path)
         
-        # Parse resume to extract skills
-        skills = []
-        try:
-            if PARSER_AVAILABLE:
-                parser = ResumeParser()
-                if filename.endswith('.pdf'):
-                    parsed_data = parser.parse_pdf(file_path)
-                elif filename.endswith('.docx'):
-                    parsed_data = parser.parse_docx(file_path)
-                else:
-                    parsed_data = parser.extract_info(open(file_path, 'r').read())
-                
-                skills = parsed_data.get('skills', [])
-            else:
-                print("Resume parser not available - skipping skill extraction")
-        except Exception as e:
-            print(f"Error parsing resume: {str(e)}")
-            # Continue with empty skills if parsing fails
-        
-        # Create resume record
+        # Create resume record; skills are filled in once it has been parsed
         resume = Resume(
             user_id=user_id,
             file_path=file_path,
             original_filename=filename,
-            skills=json.dumps(skills) if skills else None
+            content_hash=content_hash
         )
-        
-        # Save to database
         db.session.add(resume)
+        db.session.flush()
+        
+        # A file parsed before (by anyone) with the current parser is not parsed again
+        parsed_data = cache_get(PARSE, content_hash, parse_version())
+        if parsed_data is not None:
+            store_parse(resume, parsed_data)
+            db.session.commit()
+            return jsonify({'message': 'Resume uploaded and parsed', 'resume': resume.to_dict()}), 201
+        
+        # Parsing runs in parse_worker.py, not in the request
+        parse_job = enqueue_parse(resume)
         db.session.commit()
         
-        return jsonify({'message': 'Resume uploaded successfully', 'resume': resume.to_dict()}), 201
+        response = jsonify({'message': 'Resume uploaded, parsing queued',
+                            'resume': resume.to_dict(), 'job': parse_job.to_dict()})
+        response.headers['Location'] = f'/api/resumes/jobs/{parse_job.id}'
+        return response, 202
     
     except Exception as e:
         return jsonify({'error': f'Failed to upload resume: {str(e)}'}), 500
 
+@bp.route('/jobs/<int:job_id>', methods=['GET'])
+def get_parse_job(job_id):
+    parse_job = db.session.get(ParseJob, job_id)
+    if not parse_job:
+        return jsonify({'error': 'Parse job not found'}), 404
+    
+    data = {'job': parse_job.to_dict()}
+    if parse_job.status == ParseJob.DONE:
+        data['resume'] = db.session.get(Resume, parse_job.resume_id).to_dict()
+    return jsonify(data), 200
+
 @bp.route('/<int:user_id>', methods=['GET'])
 def get_user_resumes(user_id):
     resumes = Resume.query.filter_by(user_id=user_id).all()
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
 from models.user import User
 from models.db import db
+from utils.http_cache import conditional_response
 import os
 from werkzeug.utils import secure_filename
 
@@ -8,11 +9,12 @@ bp = Blueprint('users', __name__, url_prefix='/api/users')
 
 @bp.route('/<int:user_id>', methods=['GET'])
 def get_user_profile(user_id):
-    user = User.query.get(user_id)
-    if not user:
+    row = db.session.query(User.id, User.updated_at).filter_by(id=user_id).first()
+    if not row:
         return jsonify({'error': 'User not found'}), 404
     
-    return jsonify({'user': user.to_dict()}), 200
+    return conditional_response((row.updated_at,), lambda: jsonify({'user': User.query.get(user_id).to_dict()}),
+                                last_modified=row.updated_at, private=True)
 
 @bp.route('/<int:user_id>', methods=['PUT'])
 def update_user_profile(user_id):
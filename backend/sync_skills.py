@@ -0,0 +1,48 @@
+import sys
+import os
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# Change to the backend directory
+os.chdir(backend_dir)
+
+# Set the PYTHONPATH environment variable
+os.environ['PYTHONPATH'] = backend_dir
+
+from app import app
+from models.db import db
+from models.job import Job
+from models.portfolio import Portfolio
+from models.resume import Resume
+from utils.skills import load_user_skills
+from utils.skill_store import sync_job_skills, sync_user_skills
+
+BATCH_SIZE = 500
+
+def sync_skills():
+    """Backfill the skills/job_skills/user_skills tables from the JSON skill columns"""
+    with app.app_context():
+        print("Syncing job skills...")
+        count = 0
+        for job in Job.query.order_by(Job.id).yield_per(BATCH_SIZE):
+            sync_job_skills(job)
+            count += 1
+            if count % BATCH_SIZE == 0:
+                db.session.commit()
+        db.session.commit()
+        print(f"Synced skills for {count} jobs")
+        
+        print("Syncing user skills...")
+        user_ids = {uid for (uid,) in db.session.query(Portfolio.user_id)}
+        user_ids.update(uid for (uid,) in db.session.query(Resume.user_id))
+        for i, user_id in enumerate(sorted(user_ids), 1):
+            sync_user_skills(user_id, load_user_skills(user_id))
+            if i % BATCH_SIZE == 0:
+                db.session.commit()
+        db.session.commit()
+        print(f"Synced skills for {len(user_ids)} users")
+
+if __name__ == '__main__':
+    sync_skills()
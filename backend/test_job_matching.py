@@ -2,10 +2,19 @@ import unittest
 import json
 import sys
 import os
+import tempfile
+import io
+import hashlib
+import time
+from datetime import datetime
+from decimal import Decimal
 
 # Add the backend directory to the path so we can import models directly
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
+# Test against an in-memory database; app.py creates its engine on import
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
 from app import app
 from models.db import db
 from models.user import User
@@ -13,6 +22,33 @@ from models.job import Job
 from models.resume import Resume
 from models.user_job_match import UserJobMatch
 from models.portfolio import Portfolio
+from models.user_skill import UserSkill
+from models.job_skill import JobSkill
+from models.skill import Skill
+from utils.match_batch import recompute_matches
+from utils.skill_store import get_or_create_skills, top_jobs_for_user
+from utils.job_model import build_job_model, update_job_model
+from utils.query_counter import assert_max_queries
+from utils.job_neighbors import refresh_neighbors
+from utils.projection import SUMMARY_FIELDS
+from utils.job_attributes import parse_salary_range
+from utils.parse_queue import (claim_jobs, complete_job, enqueue_parse, enqueue_stale, fail_job,
+                               parse_resume_file)
+from utils.parsed_resume import decode_parsed, experience_sections
+from utils.resume_analyzer import analyze_batch, resume_analyzer
+from utils.skill_index import skill_index
+from utils.job_version import current_job_version
+from utils.job_dedup import dedupe_catalog
+from utils.skills import skill_ids
+from resume_parser import PARSER_VERSION
+from models.parse_job import ParseJob
+from utils.bulk_resume_parse import Checkpoint, DatabaseSink, JsonlSink, bulk_parse
+from utils.parse_cache import PARSE, cache_get, cache_put, parse_version
+from models.parse_cache_entry import ParseCacheEntry
+from text_extraction import ExtractionLimits
+from PyPDF2 import PdfWriter
+from sqlalchemy import event, insert, update
+from flask.json.provider import DefaultJSONProvider
 
 class TestJobMatching(unittest.TestCase):
     def setUp(self):
@@ -22,10 +58,6 @@ class TestJobMatching(unittest.TestCase):
         
         # Create all tables
         with app.app_context():
-            # Configure test database
-            app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-            app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-            
             # Create all tables
             db.create_all()
             
@@ -181,5 +213,877 @@ class TestJobMatching(unittest.TestCase):
             # Should match python and sql
             self.assertGreater(recommendation['match_score'], 0)
 
+    def test_recommendations_follow_job_writes(self):
+        """Test that the skill index picks up inserted, edited and deactivated jobs"""
+        with app.app_context():
+            # Prime the index before writing
+            self.app.get('/api/jobs/recommendations/1')
+
+            job = Job(
+                title='SQL Analyst',
+                company='Data Inc',
+                description='Reporting and dashboards',
+                requirements=json.dumps({'skills': ['SQL', 'Python']})
+            )
+            db.session.add(job)
+            db.session.commit()
+
+            data = json.loads(self.app.get('/api/jobs/recommendations/1').data)
+            top = data['recommendations'][0]
+            self.assertEqual(top['job_id'], job.id)
+            self.assertEqual(top['match_score'], 1.0)
+            self.assertEqual(sorted(top['matched_skills']), ['python', 'sql'])
+
+            job.requirements = json.dumps({'skills': ['SQL', 'Tableau']})
+            db.session.commit()
+
+            data = json.loads(self.app.get('/api/jobs/recommendations/1').data)
+            scores = {r['job_id']: r for r in data['recommendations']}
+            self.assertEqual(scores[job.id]['match_score'], 0.5)
+            self.assertEqual(scores[job.id]['missing_skills'], ['Tableau'])
+
+            job.active = False
+            db.session.commit()
+
+            data = json.loads(self.app.get('/api/jobs/recommendations/1').data)
+            self.assertNotIn(job.id, [r['job_id'] for r in data['recommendations']])
+            # This process's commits were applied in place, not by a rebuild
+            self.assertEqual(skill_index._version, current_job_version()[0])
+
+            # Statements skip the ORM hooks (as do other processes' writes); the counter still moves
+            db.session.execute(update(Job).where(Job.id == job.id).values(active=True))
+            db.session.commit()
+            data = json.loads(self.app.get('/api/jobs/recommendations/1').data)
+            self.assertIn(job.id, [r['job_id'] for r in data['recommendations']])
+
+    def test_recompute_matches(self):
+        """Test batch recomputation of stored matches"""
+        with app.app_context():
+            job = Job(
+                title='Backend Engineer',
+                company='Web Co',
+                description='APIs and services',
+                requirements=json.dumps({'skills': ['Python', 'Go']})
+            )
+            db.session.add(job)
+            db.session.commit()
+
+            stats = recompute_matches(top_n=1, log=lambda msg: None)
+            self.assertEqual(stats['users'], 1)
+            self.assertEqual(stats['matches'], 1)
+
+            matches = UserJobMatch.query.filter_by(user_id=1).all()
+            self.assertEqual(len(matches), 1)
+            self.assertEqual(matches[0].job_id, 1)
+            self.assertAlmostEqual(matches[0].match_score, 2 / 3)
+            self.assertEqual(sorted(json.loads(matches[0].matched_skills)), ['python', 'sql'])
+            self.assertEqual(json.loads(matches[0].missing_skills), ['machine learning'])
+
+            # A second run replaces rather than appends
+            recompute_matches(top_n=2, log=lambda msg: None)
+            self.assertEqual(UserJobMatch.query.filter_by(user_id=1).count(), 2)
+
+    def test_sql_recommendations_from_skill_tables(self):
+        """Test that job and portfolio writes populate the skill tables used by SQL scoring"""
+        with app.app_context():
+            response = self.app.post('/api/jobs/', data=json.dumps({
+                'title': 'Analytics Engineer',
+                'company': 'Metrics Ltd',
+                'description': 'Build data models',
+                'requirements': {'skills': ['SQL', 'dbt'], 'importance': {'SQL': 3, 'dbt': 1}}
+            }), content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+            job_id = json.loads(response.data)['job']['id']
+            self.assertEqual(JobSkill.query.filter_by(job_id=job_id).count(), 2)
+
+            response = self.app.put('/api/portfolio/1', data=json.dumps({
+                'skills': {'technical': ['sql', 'Python'], 'soft': []}
+            }), content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(UserSkill.query.filter_by(user_id=1).count(), 2)
+
+            # Only the new job has job_skills rows: 3 of its 4 importance points match
+            self.assertEqual(top_jobs_for_user(1), [(job_id, 0.75)])
+
+            app.config['RECOMMENDATION_SOURCE'] = 'sql'
+            try:
+                data = json.loads(self.app.get('/api/jobs/recommendations/1').data)
+            finally:
+                app.config['RECOMMENDATION_SOURCE'] = 'index'
+            top = data['recommendations'][0]
+            self.assertEqual(top['job_id'], job_id)
+            self.assertEqual(top['matched_skills'], ['sql'])
+            self.assertEqual(top['missing_skills'], ['dbt'])
+
+    def test_job_model_incremental_update(self):
+        """Test that the persisted TF-IDF job model follows new and deactivated jobs"""
+        with app.app_context(), tempfile.TemporaryDirectory() as model_dir:
+            build_job_model(model_dir, log=lambda msg: None)
+
+            job = Job(
+                title='Frontend Developer',
+                company='Web Co',
+                description='React and TypeScript user interfaces',
+                requirements=json.dumps({'skills': ['React']})
+            )
+            db.session.add(job)
+            db.session.commit()
+
+            matcher = update_job_model(model_dir, log=lambda msg: None)
+            self.assertEqual(matcher.top_jobs('react typescript', limit=1)[0][0], job.id)
+
+            job.active = False
+            db.session.commit()
+            matcher = update_job_model(model_dir, log=lambda msg: None)
+            self.assertEqual(list(matcher.job_ids), [1])
+
+    def test_hybrid_recommendations_rerank_by_text(self):
+        """Test that skill-overlap candidates are reranked by profile text similarity"""
+        with app.app_context(), tempfile.TemporaryDirectory() as model_dir:
+            build_job_model(model_dir, log=lambda msg: None)
+
+            user = User.query.get(1)
+            user.headline = 'Machine learning research'
+            # Same 2/3 skill overlap as the seeded job, but a closer description;
+            # added after the model was built so it is vectorized on the fly
+            job = Job(
+                title='Research Engineer',
+                company='Lab Co',
+                description='Machine learning research on language models',
+                requirements=json.dumps({'skills': ['python', 'sql', 'r']})
+            )
+            db.session.add(job)
+            db.session.commit()
+
+            def recommendations():
+                return json.loads(self.app.get('/api/jobs/recommendations/1').data)['recommendations']
+
+            app.config['JOB_MODEL_DIR'], default_dir = model_dir, app.config['JOB_MODEL_DIR']
+            try:
+                ranked = recommendations()
+                self.assertEqual(ranked[0]['job_id'], job.id)
+                self.assertGreater(ranked[0]['text_score'], ranked[1]['text_score'])
+                self.assertEqual(ranked[0]['skill_score'], ranked[1]['skill_score'])
+
+                # Without text weight the skill ranking (lowest id on ties) is kept
+                app.config['RANKER_TEXT_WEIGHT'] = 0
+                self.assertEqual(recommendations()[0]['job_id'], 1)
+            finally:
+                app.config['JOB_MODEL_DIR'] = default_dir
+                app.config['RANKER_TEXT_WEIGHT'] = 0.3
+
+    def test_get_jobs_keyset_pagination(self):
+        """Test that job listings are paged with a cursor and a capped page size"""
+        with app.app_context():
+            for i in range(4):
+                db.session.add(Job(title=f'Job {i}', company='Paging Co', description='Paged',
+                                   posted_at=datetime(2024, 1, i + 1)))
+            db.session.commit()
+            # Undated postings sort last and must not end the paging
+            db.session.execute(update(Job).where(Job.id.in_([3, 5])).values(posted_at=None))
+            db.session.commit()
+
+            seen = []
+            cursor = None
+            while True:
+                url = '/api/jobs/?limit=2' + (f'&cursor={cursor}' if cursor else '')
+                data = json.loads(self.app.get(url).data)
+                self.assertLessEqual(len(data['jobs']), 2)
+                seen.extend(job['id'] for job in data['jobs'])
+                cursor = data['next_cursor']
+                if not cursor:
+                    break
+            self.assertEqual(sorted(seen), [1, 2, 3, 4, 5])
+            self.assertEqual(len(set(seen)), 5)
+            self.assertEqual(seen[-2:], [5, 3])
+
+            app.config['MAX_PAGE_SIZE'], default_max = 3, app.config['MAX_PAGE_SIZE']
+            try:
+                data = json.loads(self.app.get('/api/jobs/?limit=1000').data)
+                self.assertEqual(len(data['jobs']), 3)
+            finally:
+                app.config['MAX_PAGE_SIZE'] = default_max
+
+            response = self.app.get('/api/jobs/?cursor=not-a-cursor')
+            self.assertEqual(response.status_code, 400)
+
+    def test_get_user_job_matches_pagination(self):
+        """Test that stored matches are paged best first"""
+        with app.app_context():
+            for score in (0.2, 0.9, None, 0.5, None):
+                job = Job(title='Matched Job', company='Match Co', description='Matched')
+                db.session.add(job)
+                db.session.flush()
+                db.session.add(UserJobMatch(user_id=1, job_id=job.id, match_score=score))
+            db.session.commit()
+
+            data = json.loads(self.app.get('/api/jobs/matches/1?limit=2').data)
+            self.assertEqual([m['match_score'] for m in data['matches']], [0.9, 0.5])
+            data = json.loads(self.app.get(f"/api/jobs/matches/1?limit=2&cursor={data['next_cursor']}").data)
+            self.assertEqual([m['match_score'] for m in data['matches']], [0.2, None])
+            # The cursor of a page ending on an unscored match is still valid
+            data = json.loads(self.app.get(f"/api/jobs/matches/1?limit=2&cursor={data['next_cursor']}").data)
+            self.assertEqual([m['match_score'] for m in data['matches']], [None])
+            self.assertIsNone(data['next_cursor'])
+
+    def test_get_user_job_matches_latest_per_job_without_n_plus_one(self):
+        """Test that only the latest match per job is returned, with jobs loaded in one query"""
+        with app.app_context():
+            for i in range(20):
+                job = Job(title=f'Job {i}', company='Match Co', description='Matched')
+                db.session.add(job)
+                db.session.flush()
+                # An older, superseded match and the current one
+                db.session.add(UserJobMatch(user_id=1, job_id=job.id, match_score=0.99))
+                db.session.add(UserJobMatch(user_id=1, job_id=job.id, match_score=i / 100))
+            db.session.commit()
+
+            with assert_max_queries(1):
+                data = json.loads(self.app.get('/api/jobs/matches/1?limit=50').data)
+
+            self.assertEqual(len(data['matches']), 20)
+            self.assertEqual(len({m['job_id'] for m in data['matches']}), 20)
+            self.assertEqual([m['match_score'] for m in data['matches']], [i / 100 for i in reversed(range(20))])
+            self.assertEqual(data['matches'][0]['job']['title'], 'Job 19')
+
+    def test_full_text_job_search(self):
+        """Test that ?q= ranks jobs by text relevance and follows job writes"""
+        with app.app_context():
+            db.session.add(Job(title='Backend Engineer', company='Web Co',
+                               description='Build APIs with Django; some data science exposure'))
+            db.session.add(Job(title='Data Engineer', company='Pipes Inc', description='Pipelines', active=False))
+            db.session.commit()
+
+            data = json.loads(self.app.get('/api/jobs/?q=data scien').data)
+            self.assertEqual([job['id'] for job in data['jobs']], [1, 2])
+            self.assertIn('<mark>Data</mark>', data['jobs'][0]['highlight']['title'])
+            self.assertGreater(data['jobs'][0]['search_score'], data['jobs'][1]['search_score'])
+
+            # Skills from the requirements JSON are searchable too
+            data = json.loads(self.app.get('/api/jobs/?q=machine learning').data)
+            self.assertEqual([job['id'] for job in data['jobs']], [1])
+
+            data = json.loads(self.app.get('/api/jobs/?q=data&limit=1').data)
+            self.assertEqual([job['id'] for job in data['jobs']], [1])
+            data = json.loads(self.app.get(f"/api/jobs/?q=data&limit=1&cursor={data['next_cursor']}").data)
+            self.assertEqual([job['id'] for job in data['jobs']], [2])
+            self.assertIsNone(data['next_cursor'])
+
+            response = self.app.put('/api/jobs/2', json={'description': 'Build APIs with Flask'})
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(self.app.get('/api/jobs/?q=django').data)
+            self.assertEqual(data['jobs'], [])
+
+    def test_conditional_get_requests(self):
+        """Test that GETs carry validators and answer If-None-Match with 304 until the data changes"""
+        with app.app_context():
+            for url in ('/api/jobs/', '/api/jobs/1', '/api/users/1', '/api/portfolio/1'):
+                response = self.app.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response.headers['ETag']
+                self.assertIn('max-age', response.headers['Cache-Control'])
+
+                response = self.app.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.data, b'')
+
+            etag = self.app.get('/api/jobs/1').headers['ETag']
+            list_etag = self.app.get('/api/jobs/').headers['ETag']
+            self.app.put('/api/jobs/1', json={'title': 'Senior Data Scientist'})
+            response = self.app.get('/api/jobs/1', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.data)['job']['title'], 'Senior Data Scientist')
+            self.assertEqual(self.app.get('/api/jobs/', headers={'If-None-Match': list_etag}).status_code, 200)
+
+            # Each page and filter has its own ETag
+            self.assertNotEqual(self.app.get('/api/jobs/?limit=1').headers['ETag'],
+                                self.app.get('/api/jobs/').headers['ETag'])
+
+            etag = self.app.get('/api/portfolio/1').headers['ETag']
+            self.app.put('/api/portfolio/1', json={'skills': {'technical': ['go'], 'soft': []}})
+            self.assertEqual(self.app.get('/api/portfolio/1', headers={'If-None-Match': etag}).status_code, 200)
+
+            self.assertEqual(self.app.get('/api/jobs/999').status_code, 404)
+
+            # The list version is one counter row, moved by statements and deletions too
+            list_etag = self.app.get('/api/jobs/').headers['ETag']
+            db.session.execute(update(Job).where(Job.id == 1).values(title='Staff Data Scientist'))
+            db.session.rollback()
+            with assert_max_queries(1):
+                self.assertEqual(self.app.get('/api/jobs/', headers={'If-None-Match': list_etag}).status_code, 304)
+            db.session.execute(update(Job).where(Job.id == 1).values(title='Staff Data Scientist'))
+            db.session.commit()
+            self.assertEqual(self.app.get('/api/jobs/', headers={'If-None-Match': list_etag}).status_code, 200)
+
+            response = self.app.get('/api/jobs/')
+            last_modified = response.headers['Last-Modified']
+            self.assertEqual(self.app.get('/api/jobs/', headers={'If-Modified-Since': last_modified}).status_code,
+                             304)
+            time.sleep(1)
+            extra = Job(title='Temp', company='Temp Co', description='Removed soon')
+            db.session.add(extra)
+            db.session.commit()
+            db.session.delete(extra)
+            db.session.commit()
+            self.assertEqual(self.app.get('/api/jobs/', headers={'If-Modified-Since': last_modified}).status_code,
+                             200)
+
+    def test_job_list_projection(self):
+        """Test the summary view and ?fields= projections of the job list"""
+        with app.app_context():
+            data = json.loads(self.app.get('/api/jobs/?view=summary').data)
+            self.assertIsNotNone(data['jobs'][0].pop('posted_at'))
+            self.assertEqual(data['jobs'], [{
+                'id': 1,
+                'title': 'Data Scientist',
+                'company': 'Tech Corp',
+                'location': 'San Francisco, CA',
+                'salary_range': '$100k - $150k',
+                'skills': ['python', 'machine learning', 'sql'],
+            }])
+
+            data = json.loads(self.app.get('/api/jobs/?fields=title,posted_at').data)
+            self.assertEqual(set(data['jobs'][0]), {'id', 'title', 'posted_at'})
+
+            data = json.loads(self.app.get('/api/jobs/?q=data&view=summary').data)
+            self.assertNotIn('description', data['jobs'][0])
+            self.assertIn('highlight', data['jobs'][0])
+
+            response = self.app.get('/api/jobs/?fields=title,password')
+            self.assertEqual(response.status_code, 400)
+
+    def test_json_provider_matches_default(self):
+        """Test that the orjson provider encodes like Flask's default provider"""
+        with app.app_context():
+            job = db.session.get(Job, 1)
+            obj = {'job': job.to_dict(), 'posted_at': job.posted_at, 'posted_on': job.posted_at.date(),
+                   'salary': Decimal('100000.50')}
+            default = DefaultJSONProvider(app)
+            self.assertEqual(json.loads(app.json.dumps(obj)), json.loads(default.dumps(obj)))
+            self.assertEqual(json.loads(app.json.response(obj).data), json.loads(default.response(obj).data))
+            self.assertIn('GMT', json.loads(app.json.dumps(obj))['posted_at'])
+
+    def test_ingest_job_feed(self):
+        """Test bulk loading JSONL and CSV feeds through the admin endpoint"""
+        with app.app_context():
+            feed = '\n'.join([
+                json.dumps({'title': 'ML Engineer', 'company': 'Feed Co', 'description': 'Models',
+                            'location': 'Remote', 'skills': ['Python', ' PyTorch ', 'python']}),
+                json.dumps({'title': 'ml engineer', 'company': 'FEED CO', 'description': 'Duplicate',
+                            'location': 'remote'}),
+                # Already in the database
+                json.dumps({'title': 'Data Scientist', 'company': 'Tech Corp', 'description': 'Again',
+                            'location': 'San Francisco, CA'}),
+                json.dumps({'title': 'No description', 'company': 'Feed Co'}),
+                'not json',
+                # Non-text fields are rejected, not a failed request
+                json.dumps({'title': 123, 'company': 'Feed Co', 'description': 'Numbers'}),
+                json.dumps({'title': 'Analyst', 'company': 'Feed Co', 'description': 'Reports',
+                            'requirements': {'skills': ['SQL']}}),
+            ])
+
+            self.assertEqual(self.app.post('/api/admin/jobs/ingest', data=feed).status_code, 403)
+            app.config['ADMIN_TOKEN'] = 'secret'
+            try:
+                response = self.app.post('/api/admin/jobs/ingest?batch_size=1', data=feed,
+                                         headers={'X-Admin-Token': 'wrong'})
+                self.assertEqual(response.status_code, 401)
+
+                response = self.app.post('/api/admin/jobs/ingest?batch_size=1', data=feed,
+                                         headers={'X-Admin-Token': 'secret'})
+                self.assertEqual(response.status_code, 200)
+                stats = json.loads(response.data)['stats']
+                # Every line counts as read, including the ones that do not parse
+                self.assertEqual((stats['read'], stats['inserted'], stats['duplicates'], stats['rejected']),
+                                 (7, 2, 2, 3))
+
+                # Spellings of one skill outside the taxonomy share one skills row
+                csv_feed = ('title,company,description,location,skills\nDBA,Feed Co,Databases,Austin,sql;postgres\n'
+                            'Welder,Feed Co,Metal,Austin,Foo Bar\nFitter,Feed Co,Metal,Boston,foo-bar\n')
+                response = self.app.post('/api/admin/jobs/ingest', headers={'X-Admin-Token': 'secret'},
+                                         data={'file': (io.BytesIO(csv_feed.encode()), 'feed.csv')})
+                self.assertEqual(json.loads(response.data)['stats']['inserted'], 3)
+                [foo_bar] = Skill.query.filter(Skill.name.in_(['foo bar', 'foo-bar'])).all()
+                self.assertEqual(JobSkill.query.filter_by(skill_id=foo_bar.id).count(), 2)
+            finally:
+                app.config['ADMIN_TOKEN'] = None
+
+            job = Job.query.filter_by(title='ML Engineer').one()
+            self.assertEqual(json.loads(job.requirements), {'skills': ['python', 'pytorch']})
+            self.assertEqual(JobSkill.query.filter_by(job_id=job.id).count(), 2)
+            dba = Job.query.filter_by(title='DBA').one()
+            self.assertEqual(json.loads(dba.requirements), {'skills': ['sql', 'postgresql']})
+
+            # Ingested jobs are searchable and recommendable right away
+            data = json.loads(self.app.get('/api/jobs/?q=pytorch').data)
+            self.assertEqual([j['id'] for j in data['jobs']], [job.id])
+
+    def test_job_salary_and_location_filters(self):
+        """Test that salary/location are parsed on write and filterable"""
+        with app.app_context():
+            job = Job.query.get(1)
+            self.assertEqual((job.salary_min, job.salary_max), (100000, 150000))
+            self.assertEqual((job.city, job.region, job.country, job.remote), ('San Francisco', 'CA', 'US', False))
+
+            # Only amounts with a currency sign, range ends or a bare amount are salaries
+            self.assertEqual(parse_salary_range('Competitive + 401k'), (None, None))
+            self.assertEqual(parse_salary_range('401k matching, $90k'), (90000, 90000))
+            self.assertEqual(parse_salary_range('2-5 years, $90k'), (90000, 90000))
+            self.assertEqual(parse_salary_range('90000 - 120000'), (90000, 120000))
+            # '.' and ',' followed by three digits group thousands
+            self.assertEqual(parse_salary_range('€100.000 - €120.000'), (100000, 120000))
+            self.assertEqual(parse_salary_range('$45.50/hr'), (94640, 94640))
+
+            response = self.app.post('/api/jobs/', json={
+                'title': 'Remote Analyst', 'company': 'Anywhere Inc', 'description': 'Analysis',
+                'location': 'Remote (US)', 'salary_range': '60-80k'})
+            remote_id = json.loads(response.data)['job']['id']
+            self.app.post('/api/jobs/', json={
+                'title': 'Austin Dev', 'company': 'Tex Co', 'description': 'Code',
+                'location': 'Austin, Texas', 'salary_range': '$120,000 - $160,000'})
+
+            def ids(query):
+                return sorted(j['id'] for j in json.loads(self.app.get('/api/jobs/?' + query).data)['jobs'])
+
+            self.assertEqual(ids('min_salary=90000'), [1, 3])
+            self.assertEqual(ids('min_salary=155000'), [3])
+            self.assertEqual(ids('max_salary=90000'), [remote_id])
+            self.assertEqual(ids('remote=true'), [remote_id])
+            self.assertEqual(ids('remote=false&region=california'), [1])
+            self.assertEqual(ids('region=TX'), [3])
+            self.assertEqual(ids('country=usa'), [1, 2, 3])
+            self.assertEqual(self.app.get('/api/jobs/?min_salary=lots').status_code, 400)
+            # Unknown places are an error, not a match of the jobs without one
+            self.assertEqual(self.app.get('/api/jobs/?country=Narnia').status_code, 400)
+            self.assertEqual(self.app.get('/api/jobs/?region=%20').status_code, 400)
+
+            # Edits re-parse the structured columns
+            self.app.put(f'/api/jobs/{remote_id}', json={'location': 'London, UK'})
+            self.assertEqual(ids('country=GB'), [remote_id])
+            self.assertEqual(ids('remote=true'), [])
+
+    def test_near_duplicate_jobs_collapse(self):
+        """Test that reposted descriptions are deactivated under the original job"""
+        description = ('We are hiring a backend engineer to design, build and operate the payment APIs '
+                       'that power checkout for millions of customers. You will work with Python, '
+                       'PostgreSQL and Kafka, own services end to end, and mentor junior engineers.')
+        with app.app_context():
+            response = self.app.post('/api/jobs/', json={
+                'title': 'Backend Engineer', 'company': 'Pay Co', 'description': description})
+            original = json.loads(response.data)['job']
+            self.assertIsNone(original['canonical_job_id'])
+
+            response = self.app.post('/api/jobs/', json={
+                'title': 'Backend Engineer (Payments)', 'company': 'Pay Co',
+                'description': description.replace('millions of', 'many')})
+            repost = json.loads(response.data)['job']
+            self.assertEqual(repost['canonical_job_id'], original['id'])
+            self.assertFalse(Job.query.get(repost['id']).active)
+
+            # Unrelated postings are left alone
+            response = self.app.post('/api/jobs/', json={
+                'title': 'Designer', 'company': 'Pay Co', 'description': 'Design our checkout flows in Figma.'})
+            self.assertIsNone(json.loads(response.data)['job']['canonical_job_id'])
+
+            # Feed rows are checked against stored jobs and each other
+            app.config['ADMIN_TOKEN'] = 'secret'
+            try:
+                feed = '\n'.join(json.dumps({'title': f'Engineer {i}', 'company': f'Agency {i}',
+                                             'description': description + suffix})
+                                  for i, suffix in enumerate(['', ' Apply today.']))
+                response = self.app.post('/api/admin/jobs/ingest', data=feed, headers={'X-Admin-Token': 'secret'})
+            finally:
+                app.config['ADMIN_TOKEN'] = None
+            self.assertEqual(json.loads(response.data)['stats']['near_duplicates'], 2)
+
+            ids = [j['id'] for j in json.loads(self.app.get('/api/jobs/?limit=100').data)['jobs']]
+            self.assertEqual(sorted(ids), [1, original['id'], original['id'] + 2])
+
+            # Editing a duplicate into a distinct posting reactivates it
+            self.app.put(f"/api/jobs/{repost['id']}", json={'description': 'Maintain the legacy COBOL ledger.'})
+            job = Job.query.get(repost['id'])
+            self.assertTrue(job.active)
+            self.assertIsNone(job.canonical_job_id)
+
+            # The full-catalog pass collapses stale rows again and leaves settled ones alone
+            feed_ids = [original['id'] + 3, original['id'] + 4]
+            db.session.execute(update(Job).where(Job.id == feed_ids[0]).values(canonical_job_id=None, active=True))
+            db.session.commit()
+            stats = dedupe_catalog(batch_size=2, log=lambda msg: None)
+            db.session.commit()
+            self.assertEqual((stats['duplicates'], stats['changed']), (2, 1))
+            self.assertEqual([(j.canonical_job_id, j.active) for j in Job.query.filter(Job.id.in_(feed_ids))],
+                             [(original['id'], False)] * 2)
+
+            version = current_job_version()[0]
+            stats = dedupe_catalog(log=lambda msg: None)
+            db.session.commit()
+            self.assertEqual(stats['changed'], 0)
+            self.assertEqual(current_job_version()[0], version)
+
+    def test_similar_jobs(self):
+        """Test that precomputed job neighbors are served and refreshed incrementally"""
+        def add_job(title, description, skills):
+            job = Job(title=title, company='Co', description=description,
+                      requirements=json.dumps({'skills': skills}))
+            db.session.add(job)
+            db.session.commit()
+            return job.id
+
+        def similar(job_id):
+            return json.loads(self.app.get(f'/api/jobs/{job_id}/similar').data)['similar']
+
+        with app.app_context(), tempfile.TemporaryDirectory() as model_dir:
+            app.config['JOB_MODEL_DIR'], default_dir = model_dir, app.config['JOB_MODEL_DIR']
+            try:
+                ml_id = add_job('ML Engineer', 'Experienced machine learning engineer', ['python', 'machine learning'])
+                web_id = add_job('Web Developer', 'React user interfaces', ['javascript', 'react'])
+                analyst_id = add_job('Data Analyst', 'Reporting dashboards', ['sql', 'excel'])
+
+                stats = refresh_neighbors(full=True, log=lambda msg: None)
+                self.assertEqual(stats['refreshed'], 4)
+
+                # Jobs sharing no skill are never candidates
+                with assert_max_queries(1):
+                    neighbors = similar(1)
+                self.assertEqual([n['id'] for n in neighbors], [ml_id, analyst_id])
+                self.assertAlmostEqual(neighbors[0]['skill_score'], 2 / 3)
+                self.assertGreater(neighbors[0]['text_score'], 0)
+                self.assertEqual(set(neighbors[0]), set(SUMMARY_FIELDS) | {'score', 'skill_score', 'text_score'})
+                self.assertEqual(similar(web_id), [])
+
+                # Only the edited job and the jobs it now enters or leaves are refreshed
+                self.app.put(f'/api/jobs/{web_id}', json={'requirements': ['python', 'machine learning', 'sql']})
+                stats = refresh_neighbors(log=lambda msg: None)
+                self.assertEqual(stats['refreshed'], 4)
+                self.assertEqual(similar(1)[0]['id'], web_id)
+                self.assertEqual(refresh_neighbors(log=lambda msg: None)['refreshed'], 0)
+
+                # Deactivated jobs drop out of their neighbors' lists
+                self.app.put(f'/api/jobs/{web_id}', json={'active': False})
+                refresh_neighbors(log=lambda msg: None)
+                self.assertNotIn(web_id, [n['id'] for n in similar(1)])
+
+                # A run that writes no neighbors still moves the watermark
+                chef_id = add_job('Chef', 'Kitchen', ['cooking'])
+                stats = refresh_neighbors(log=lambda msg: None)
+                self.assertEqual((stats['refreshed'], stats['neighbors']), (1, 0))
+                self.assertEqual(similar(chef_id), [])
+                self.assertEqual(refresh_neighbors(log=lambda msg: None)['refreshed'], 0)
+                self.assertEqual(self.app.get('/api/jobs/999/similar').status_code, 404)
+            finally:
+                app.config['JOB_MODEL_DIR'] = default_dir
+
+    def test_resume_parse_queue(self):
+        """Test that uploads queue a parse job that workers lease, retry and complete"""
+        with app.app_context(), tempfile.TemporaryDirectory() as upload_dir:
+            app.config['UPLOAD_FOLDER'], default_dir = upload_dir, app.config['UPLOAD_FOLDER']
+            try:
+                response = self.app.post('/api/resumes/upload', data={
+                    'user_id': '1', 'file': (io.BytesIO(b'%PDF-1.4'), 'cv.pdf')})
+            finally:
+                app.config['UPLOAD_FOLDER'] = default_dir
+            self.assertEqual(response.status_code, 202)
+            job_id = json.loads(response.data)['job']['id']
+            self.assertEqual(response.headers['Location'], f'/api/resumes/jobs/{job_id}')
+
+            def status():
+                return json.loads(self.app.get(f'/api/resumes/jobs/{job_id}').data)['job']['status']
+            self.assertEqual(status(), 'queued')
+
+            # A leased job is invisible to other workers until its lease expires
+            self.assertEqual([j for j, _, _ in claim_jobs(5, 'worker-a')], [job_id])
+            self.assertEqual(claim_jobs(5, 'worker-b'), [])
+            self.assertEqual(status(), 'running')
+
+            # Failures are requeued with a backoff
+            self.assertTrue(fail_job(job_id, 'worker-a', 'bad PDF'))
+            job = db.session.get(ParseJob, job_id)
+            self.assertEqual((job.status, job.attempts, job.error), ('queued', 1, 'bad PDF'))
+            self.assertEqual(claim_jobs(5, 'worker-b'), [])
+
+            job.visible_at = datetime.utcnow()
+            db.session.commit()
+            claim_jobs(5, 'worker-a')
+            # worker-a stalled: its lease expires and worker-b takes over
+            job = db.session.get(ParseJob, job_id)
+            job.visible_at = datetime.utcnow()
+            db.session.commit()
+            self.assertEqual(len(claim_jobs(5, 'worker-b')), 1)
+            self.assertFalse(complete_job(job_id, 'worker-a', {'skills': ['go']}))
+
+            self.assertTrue(complete_job(job_id, 'worker-b', {'skills': ['rust', 'go']}))
+            data = json.loads(self.app.get(f'/api/resumes/jobs/{job_id}').data)
+            self.assertEqual(data['job']['status'], 'done')
+            self.assertEqual(data['job']['attempts'], 3)
+            self.assertEqual(json.loads(data['resume']['skills']), ['rust', 'go'])
+            self.assertFalse(data['resume']['parse_truncated'])
+            self.assertEqual(self.app.get('/api/resumes/jobs/999').status_code, 404)
+
+    def test_uploads_with_the_same_name_are_kept_apart(self):
+        """Test that uploads sharing a file name are stored under their own paths"""
+        with app.app_context(), tempfile.TemporaryDirectory() as upload_dir:
+            app.config['UPLOAD_FOLDER'], default_dir = upload_dir, app.config['UPLOAD_FOLDER']
+            try:
+                resumes = []
+                for user_id, content in (('1', b'%PDF-1.4 first'), ('2', b'%PDF-1.4 second')):
+                    response = self.app.post('/api/resumes/upload', data={
+                        'user_id': user_id, 'file': (io.BytesIO(content), 'cv.pdf')})
+                    self.assertEqual(response.status_code, 202)
+                    resumes.append(db.session.get(Resume, json.loads(response.data)['resume']['id']))
+            finally:
+                app.config['UPLOAD_FOLDER'] = default_dir
+
+            first, second = resumes
+            self.assertNotEqual(first.file_path, second.file_path)
+            self.assertEqual((first.original_filename, second.original_filename), ('cv.pdf', 'cv.pdf'))
+            for resume, content in ((first, b'%PDF-1.4 first'), (second, b'%PDF-1.4 second')):
+                with open(resume.file_path, 'rb') as f:
+                    self.assertEqual(f.read(), content)
+
+    def test_bulk_resume_parse_checkpoints(self):
+        """Test that a bulk parse writes every resume once and skips checkpointed files on rerun"""
+        import docx
+        with app.app_context(), tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, 'batch'))
+            for i, skill in enumerate(['Python', 'Java', 'SQL']):
+                document = docx.Document()
+                document.add_paragraph(f'Engineer {i} with {skill} experience')
+                document.save(os.path.join(directory, 'batch', f'cv{i}.docx'))
+            with open(os.path.join(directory, 'broken.pdf'), 'wb') as f:
+                f.write(b'not a pdf')
+
+            checkpoint_path = os.path.join(directory, 'run.checkpoint')
+            output = io.StringIO()
+            stats = bulk_parse(directory, JsonlSink(output), Checkpoint(checkpoint_path),
+                               processes=2, batch_size=2, log=lambda msg: None)
+            self.assertEqual((stats['files'], stats['parsed'], stats['failed']), (4, 3, 1))
+            records = sorted((json.loads(line) for line in output.getvalue().splitlines()),
+                             key=lambda r: r['filename'])
+            self.assertEqual([r['filename'] for r in records], ['broken.pdf', 'cv0.docx', 'cv1.docx', 'cv2.docx'])
+            self.assertIn('error', records[0])
+
+            # A rerun only picks up files missing from the checkpoint; a copy of
+            # a file parsed before comes from the cache
+            with open(os.path.join(directory, 'batch', 'cv2.docx'), 'rb') as f:
+                with open(os.path.join(directory, 'batch', 'cv3.docx'), 'wb') as copy:
+                    copy.write(f.read())
+            stats = bulk_parse(directory, DatabaseSink(1), Checkpoint(checkpoint_path),
+                               processes=2, batch_size=2, log=lambda msg: None)
+            self.assertEqual((stats['files'], stats['skipped'], stats['cached']), (1, 4, 1))
+            self.assertEqual(Resume.query.filter_by(original_filename='cv3.docx').count(), 1)
+
+            # Text past the extraction budget is cut off and the resume flagged
+            with open(os.path.join(directory, 'long.pdf'), 'wb') as f:
+                writer = PdfWriter()
+                for _ in range(3):
+                    writer.add_blank_page(width=612, height=792)
+                writer.write(f)
+            stats = bulk_parse(directory, DatabaseSink(1), Checkpoint(checkpoint_path), processes=1,
+                               limits=ExtractionLimits(max_pages=2), log=lambda msg: None)
+            self.assertEqual((stats['parsed'], stats['failed']), (1, 0))
+            resume = Resume.query.filter_by(original_filename='long.pdf').one()
+            self.assertTrue(resume.parse_truncated)
+            self.assertEqual(decode_parsed(resume.parsed_data)['pages'], 2)
+
+    def test_parse_cache(self):
+        """Test that re-uploads and repeated analyses are served from the content-hash cache"""
+        with app.app_context(), tempfile.TemporaryDirectory() as upload_dir:
+            app.config['UPLOAD_FOLDER'], default_dir = upload_dir, app.config['UPLOAD_FOLDER']
+            try:
+                def upload(name):
+                    return self.app.post('/api/resumes/upload', data={
+                        'user_id': '1', 'file': (io.BytesIO(b'%PDF-1.4 same bytes'), name)})
+                response = upload('cv.pdf')
+                self.assertEqual(response.status_code, 202)
+                content_hash = db.session.get(Resume, json.loads(response.data)['resume']['id']).content_hash
+                self.assertEqual(content_hash, hashlib.sha256(b'%PDF-1.4 same bytes').hexdigest())
+
+                cache_put(PARSE, content_hash, parse_version(), {'skills': ['rust']})
+                db.session.commit()
+                # The same content under another name is filled in without a parse job
+                response = upload('copy.pdf')
+                self.assertEqual(response.status_code, 201)
+                self.assertNotIn('job', json.loads(response.data))
+                self.assertEqual(json.loads(json.loads(response.data)['resume']['skills']), ['rust'])
+                self.assertEqual(ParseJob.query.count(), 1)
+
+                # Another parser version misses
+                self.assertIsNone(cache_get(PARSE, content_hash, 'parser-0'))
+            finally:
+                app.config['UPLOAD_FOLDER'] = default_dir
+
+            resume = {'summary': 'Developed and launched a platform', 'skills': ['python']}
+            first = self.app.post('/api/resumes/analyze', json=resume)
+            second = self.app.post('/api/resumes/analyze', json=dict(reversed(list(resume.items()))))
+            self.assertEqual(json.loads(first.data), json.loads(second.data))
+            entry = ParseCacheEntry.query.filter_by(kind='analysis').one()
+            self.assertEqual(entry.hits, 1)
+
+            # Least recently used entries go first once the cache is over its bounds
+            app.config['PARSE_CACHE_MAX_ENTRIES'], default_max = 2, app.config['PARSE_CACHE_MAX_ENTRIES']
+            try:
+                for i in range(3):
+                    cache_put(PARSE, f'hash{i}', 'v1', {'skills': [i]})
+                db.session.commit()
+            finally:
+                app.config['PARSE_CACHE_MAX_ENTRIES'] = default_max
+            self.assertLessEqual(ParseCacheEntry.query.count(), 2)
+            self.assertEqual(ParseCacheEntry.query.filter_by(content_hash='hash2').count(), 1)
+
+    def test_parse_rejects_files_changed_since_upload(self):
+        """Test that a file replaced after upload is not parsed under the upload's hash"""
+        import docx
+        with app.app_context(), tempfile.TemporaryDirectory() as upload_dir:
+            def docx_bytes(text):
+                document = docx.Document()
+                document.add_paragraph(text)
+                buffer = io.BytesIO()
+                document.save(buffer)
+                return buffer.getvalue()
+
+            app.config['UPLOAD_FOLDER'], default_dir = upload_dir, app.config['UPLOAD_FOLDER']
+            try:
+                response = self.app.post('/api/resumes/upload', data={
+                    'user_id': '1', 'file': (io.BytesIO(docx_bytes('Jane Roe\nPython')), 'cv.docx')})
+            finally:
+                app.config['UPLOAD_FOLDER'] = default_dir
+            resume = db.session.get(Resume, json.loads(response.data)['resume']['id'])
+            self.assertIn('python', parse_resume_file(resume.file_path, content_hash=resume.content_hash)['skills'])
+
+            with open(resume.file_path, 'wb') as f:
+                f.write(docx_bytes('John Doe\nRust'))
+            with self.assertRaises(ValueError):
+                parse_resume_file(resume.file_path, content_hash=resume.content_hash)
+
+    def test_parsed_data_storage_and_reparse(self):
+        """Test that the full parse result is stored compactly and stale resumes are requeued"""
+        with app.app_context():
+            resume = Resume.query.filter_by(user_id=1).first()
+            text = ("Jane Roe\njane@example.com\n\nSummary\nData engineer.\n\nExperience\nEngineer, Acme\n\n"
+                    "Skills\n" + "Python, SQL\n" * 500)
+            parsed = {'parser_version': PARSER_VERSION, 'text': text, 'skills': ['python', 'sql'],
+                      'contact': {'name': 'Jane Roe', 'email': 'jane@example.com', 'phone': None},
+                      'sections': [{'name': 'summary', 'header_start': text.index('Summary'),
+                                    'start': text.index('Data'), 'end': text.index('Experience')},
+                                   {'name': 'experience', 'header_start': text.index('Experience'),
+                                    'start': text.index('Engineer,'), 'end': text.index('Skills')}]}
+            job = enqueue_parse(resume)
+            db.session.commit()
+            claim_jobs(1, 'worker-a')
+            self.assertTrue(complete_job(job.id, 'worker-a', parsed))
+
+            resume = db.session.get(Resume, resume.id)
+            self.assertEqual((resume.full_name, resume.email, resume.summary, resume.parser_version),
+                             ('Jane Roe', 'jane@example.com', 'Data engineer.', PARSER_VERSION))
+            # Large results are stored compressed and decode to the same data
+            self.assertLess(len(resume.parsed_data), len(text) // 4)
+            self.assertEqual(decode_parsed(resume.parsed_data), parsed)
+            # Experience is sliced from the stored offsets
+            self.assertEqual(experience_sections(decode_parsed(resume.parsed_data)), ['Experience\nEngineer, Acme'])
+
+            # Only resumes parsed by an older parser (or never) are requeued, once
+            other = Resume(user_id=1, file_path='old.pdf', original_filename='old.pdf',
+                           parser_version=PARSER_VERSION - 1)
+            db.session.add(other)
+            db.session.commit()
+            self.assertEqual(enqueue_stale(), 1)
+            self.assertEqual(enqueue_stale(), 0)
+            self.assertEqual(ParseJob.query.filter_by(resume_id=other.id, status='queued').count(), 1)
+
+    def test_analyze_resumes_batch(self):
+        """Test that batch analysis streams one result per resume, in order, matching /analyze"""
+        strong = {'summary': 'Backend engineer', 'skills': ['python'], 'education': ['BSc'],
+                  'experience': [{'details': ['Led a team of 5 team members', 'Reduced costs by 20%']}]}
+        weak = {'experience': [{'details': 'Handled tickets and helped the team'}]}
+
+        # Word boundaries: 'handled' is not 'led'
+        result = resume_analyzer.analyze(weak)
+        self.assertIn("Rewrite bullet points", " ".join(result['feedback']['suggestions']))
+        self.assertIn("Avoid passive phrases", " ".join(result['feedback']['suggestions']))
+
+        with app.app_context():
+            expected = self.app.post('/api/resumes/analyze', json=strong).get_json()
+            response = self.app.post('/api/resumes/analyze/batch', json={'resumes': [strong, weak, 'text', weak]})
+            self.assertEqual(response.mimetype, 'application/x-ndjson')
+            lines = [json.loads(line) for line in response.data.decode().splitlines()]
+            self.assertEqual([line['index'] for line in lines], [0, 1, 2, 3])
+            self.assertEqual({k: lines[0][k] for k in expected}, expected)
+            self.assertEqual(lines[1], {'index': 1, **result})
+            self.assertIn('error', lines[2])
+            self.assertEqual(lines[3], lines[1] | {'index': 3})
+            # The strong resume was cached by /analyze, the weak one by the batch
+            self.assertEqual(ParseCacheEntry.query.filter_by(kind='analysis').count(), 2)
+
+            self.assertEqual(self.app.post('/api/resumes/analyze/batch', json={'resumes': []}).status_code, 400)
+
+            # A malformed resume gets an error line; the rest of the batch is still scored
+            malformed = [{'experience': ['Led x']}, {'summary': 5}]
+            response = self.app.post('/api/resumes/analyze/batch', json={'resumes': malformed + [strong]})
+            lines = [json.loads(line) for line in response.data.decode().splitlines()]
+            self.assertEqual([line['index'] for line in lines], [0, 1, 2])
+            self.assertIn('error', lines[0])
+            self.assertIn('error', lines[1])
+            self.assertEqual(lines[2]['score'], expected['score'])
+            self.assertEqual(ParseCacheEntry.query.filter_by(kind='analysis').count(), 2)
+
+        # Batches over a chunk are scored in the process pool, in order
+        resumes = [strong, weak] * 3
+        self.assertEqual(list(analyze_batch(resumes, processes=2, chunk_size=2)),
+                         [resume_analyzer.analyze(resume) for resume in resumes])
+        pooled = list(analyze_batch([strong, {'summary': 5}, weak], processes=2, chunk_size=2))
+        self.assertEqual([('error' in result) for result in pooled], [False, True, False])
+
+    def test_skill_spellings_match_by_canonical_id(self):
+        """Test that spellings of one skill match across the matcher, the index and batch scoring"""
+        self.assertEqual(skill_ids(['Node.js', 'nodejs', 'node js']), skill_ids(['NODE.JS']))
+        self.assertEqual(skill_ids(['JS']), skill_ids(['JavaScript']))
+        self.assertEqual(skill_ids(['HTML/CSS']), skill_ids(['HTML', 'CSS']))
+        # Composites are only split into taxonomy skills
+        self.assertEqual(len(skill_ids(['R&D'])), 1)
+
+        with app.app_context():
+            resume = Resume.query.filter_by(user_id=1).first()
+            resume.skills = json.dumps(['nodejs', 'JS', 'HTML/CSS'])
+            job = Job(title='Frontend Engineer', company='Web Co', description='Web apps',
+                      requirements=json.dumps({'skills': ['Node.js', 'JavaScript', 'HTML']}))
+            db.session.add(job)
+            db.session.commit()
+
+            response = self.app.post('/api/jobs/match', json={'user_id': 1, 'job_id': job.id})
+            data = json.loads(response.data)
+            self.assertEqual(data['match_score'], 1.0)
+            self.assertEqual(data['matched_skills'], ['node.js', 'javascript', 'html'])
+
+            skill_index.reset()
+            self.assertEqual(skill_index.top_matches(['nodejs', 'JS', 'HTML/CSS'], limit=1)[0][:2], (job.id, 1.0))
+
+            recompute_matches(top_n=1, log=lambda msg: None)
+            match = UserJobMatch.query.filter_by(user_id=1).one()
+            self.assertEqual((match.job_id, match.match_score), (job.id, 1.0))
+
+    def test_get_or_create_skills_with_concurrent_insert(self):
+        """Test that a skill created by another writer after the lookup is reused"""
+        with app.app_context():
+            lookups = []
+
+            def create_first(orm_execute_state):
+                # Another request inserts the skill between the lookup and the insert
+                if orm_execute_state.is_select and not lookups:
+                    lookups.append(orm_execute_state.invoke_statement().freeze())
+                    db.session.execute(insert(Skill).values(name='rust'))
+                    return lookups[0]()
+
+            event.listen(db.session, 'do_orm_execute', create_first)
+            try:
+                skill_rows = get_or_create_skills(['Rust', 'Haskell'])
+            finally:
+                event.remove(db.session, 'do_orm_execute', create_first)
+            db.session.commit()
+
+            self.assertEqual(Skill.query.filter_by(name='rust').count(), 1)
+            self.assertEqual(set(skill_rows.values()),
+                             {Skill.query.filter_by(name=name).one().id for name in ('rust', 'haskell')})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,263 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from sqlalchemy import insert
+from models.db import db
+from models.resume import Resume
+from utils.skills import load_user_skills
+from utils.skill_store import sync_user_skills
+from utils.job_ingest import batched
+from utils.parsed_resume import encode_parsed, resume_fields
+from utils.parse_queue import PARSER_AVAILABLE, init_parser_process
+from utils.parse_cache import PARSE, cache_get_many, cache_put_many, cacheable, file_sha256, parse_version
+
+if PARSER_AVAILABLE:
+    from resume_parser import ResumeParser
+    from text_extraction import configure_extractors, extract_sandboxed
+    from nlp_registry import nlp_registry
+
+# Bulk parsing of a directory of resumes. Files are sent in batches to a
+# process pool; each worker extracts the batch's text (every file in a
+# sandboxed child, within the extraction budgets) and runs it through
+# nlp.pipe with its own copy of the spaCy pipeline (loaded before the pool
+# forks), so both stages use every core. The parent writes each batch's
+# results to a sink and then appends its paths to a checkpoint file, so a
+# rerun after a crash skips what was already written. Files are hashed in the
+# parent before they are sent out, and files already in the parse cache (the
+# same content uploaded or bulk-parsed before) are written without parsing.
+
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+
+def find_resumes(directory):
+    """Paths of the PDF/DOCX files under a directory, in a stable order"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+class Checkpoint:
+    """Paths already written, one per line in an append-only file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.done = {line.rstrip('\n') for line in f if line.strip()}
+
+    def __contains__(self, file_path):
+        return file_path in self.done
+
+    def add(self, file_paths):
+        self.done.update(file_paths)
+        if not self.path:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(f'{file_path}\n' for file_path in file_paths)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class JsonlSink:
+    """Writes one JSON object per resume to a text stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, results, content_hashes):
+        for file_path, parsed_data, error in results:
+            record = {'file_path': file_path, 'filename': os.path.basename(file_path),
+                      'content_hash': content_hashes.get(file_path)}
+            if error:
+                record['error'] = error
+            else:
+                record.update(parsed_data)
+            self.stream.write(json.dumps(record) + '\n')
+        # Results must be durable before their paths are checkpointed
+        self.stream.flush()
+        try:
+            os.fsync(self.stream.fileno())
+        except (AttributeError, OSError):
+            pass  # stdout or a pipe
+
+    def close(self):
+        pass
+
+
+class DatabaseSink:
+    """Inserts the parsed resumes into resumes under one user, one commit per batch"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def write(self, results, content_hashes):
+        rows = [{'user_id': self.user_id,
+                 'file_path': file_path,
+                 'original_filename': os.path.basename(file_path),
+                 'content_hash': content_hashes.get(file_path),
+                 'parsed_data': encode_parsed(parsed_data),
+                 'skills': json.dumps(parsed_data['skills']) if parsed_data.get('skills') else None,
+                 'parse_truncated': bool(parsed_data.get('truncated')),
+                 'parser_version': parsed_data.get('parser_version'),
+                 'uploaded_at': datetime.utcnow(),
+                 **resume_fields(parsed_data)}
+                for file_path, parsed_data, error in results if not error]
+        if rows:
+            db.session.execute(insert(Resume), rows)
+        db.session.commit()
+
+    def close(self):
+        # Keep the normalized user_skills table in step with the user's skills
+        sync_user_skills(self.user_id, load_user_skills(self.user_id))
+        db.session.commit()
+
+
+def _parse_batch(file_paths, limits=None, max_memory=None):
+    """
+    Worker process: extract the text of a batch of files (each in a
+    sandboxed child, within the budgets), then parse the texts with one
+    nlp.pipe pass
+
+    Returns:
+        tuple: ([(path, parsed data or None, error or None)], extract seconds, nlp seconds)
+    """
+    started = time.perf_counter()
+    extracted, errors = {}, {}
+    for file_path in file_paths:
+        try:
+            extracted[file_path] = extract_sandboxed(file_path, limits, max_memory)
+        except Exception as e:
+            errors[file_path] = f'{type(e).__name__}: {e}'
+    extraction_done = time.perf_counter()
+
+    texts = [result.text for result in extracted.values()]
+    infos = ResumeParser().extract_info_batch(texts, batch_size=len(file_paths),
+                                              sections=[result.sections for result in extracted.values()])
+    parsed = {file_path: ResumeParser.with_extraction(info, result)
+              for (file_path, result), info in zip(extracted.items(), infos)}
+    results = [(file_path, parsed.get(file_path), errors.get(file_path)) for file_path in file_paths]
+    return results, extraction_done - started, time.perf_counter() - extraction_done
+
+
+def _hash_files(file_paths):
+    content_hashes = {}
+    for file_path in file_paths:
+        try:
+            content_hashes[file_path] = file_sha256(file_path)
+        except OSError:
+            content_hashes[file_path] = None  # reported by the parser process
+    return content_hashes
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds else 0
+
+
+def bulk_parse(directory, sink, checkpoint, processes=None, batch_size=32, model=None, profile=None,
+               limits=None, max_memory=None, extractors=None, use_cache=True, log=print):
+    """
+    Parse every resume under a directory that is not in the checkpoint.
+
+    Args:
+        directory (str): Directory walked for PDF/DOCX files
+        sink: JsonlSink or DatabaseSink the results are written to
+        checkpoint (Checkpoint): Paths already written; extended after each batch
+        processes (int): Worker processes (default: all cores)
+        batch_size (int): Files per worker task and nlp.pipe call
+        limits (ExtractionLimits): Text extraction budgets of each file
+        max_memory (int): Bytes of memory of each file's sandboxed extraction
+        extractors (dict): configure_extractors() arguments of the workers
+        use_cache (bool): Reuse and fill the parse cache
+
+    Returns:
+        dict: files, parsed, failed, cached and skipped counts; seconds spent
+            in each stage (extract and nlp summed over the workers) and files/s
+            overall and per stage
+    """
+    if not PARSER_AVAILABLE:
+        raise RuntimeError('Resume parser not available - ML dependencies may be missing')
+
+    started = time.perf_counter()
+    processes = processes or os.cpu_count() or 1
+    version = parse_version(model, profile, limits, extractors) if use_cache else None
+    stats = {'files': 0, 'parsed': 0, 'failed': 0, 'cached': 0, 'skipped': 0,
+             'extract_seconds': 0.0, 'nlp_seconds': 0.0, 'write_seconds': 0.0}
+
+    def pending():
+        for file_path in find_resumes(directory):
+            if file_path in checkpoint:
+                stats['skipped'] += 1
+            else:
+                yield file_path
+
+    def write(results, content_hashes):
+        write_started = time.perf_counter()
+        sink.write(results, content_hashes)
+        db.session.commit()  # cache hits and new entries
+        checkpoint.add([file_path for file_path, _, _ in results])
+        stats['write_seconds'] += time.perf_counter() - write_started
+        stats['files'] += len(results)
+        stats['failed'] += sum(1 for _, _, error in results if error)
+        stats['parsed'] = stats['files'] - stats['failed']
+
+        elapsed = time.perf_counter() - started
+        log(f"Parsed {stats['files']} files ({stats['failed']} failed, {stats['cached']} cached, "
+            f"{stats['skipped']} skipped), {_rate(stats['files'], elapsed):.1f} files/s; extract "
+            f"{_rate(stats['files'] * processes, stats['extract_seconds']):.1f}/s, nlp "
+            f"{_rate(stats['files'] * processes, stats['nlp_seconds']):.1f}/s, write "
+            f"{_rate(stats['files'], stats['write_seconds']):.1f}/s")
+
+    # Fails here rather than in every worker when a backend is not installed
+    configure_extractors(**(extractors or {}))
+    # Loaded once here so the forked workers share the pipeline's pages
+    nlp_registry.configure(model, profile)
+    nlp_registry.preload()
+
+    batches = batched(pending(), batch_size)
+    in_flight = {}  # future -> content hashes of its batch
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_parser_process,
+                             initargs=(model, profile, 0, extractors)) as pool:
+        while True:
+            # Batches are looked up in the cache as they are submitted, so a
+            # file repeated later in the run is a hit
+            while len(in_flight) < processes * 2:
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                content_hashes = _hash_files(batch)
+                cached = cache_get_many(PARSE, content_hashes.values(), version) if version else {}
+                hits = [(file_path, cached[content_hashes[file_path]], None)
+                        for file_path in batch if content_hashes[file_path] in cached]
+                misses = [file_path for file_path in batch if content_hashes[file_path] not in cached]
+                if hits:
+                    stats['cached'] += len(hits)
+                    write(hits, content_hashes)
+                if misses:
+                    in_flight[pool.submit(_parse_batch, misses, limits, max_memory)] = content_hashes
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                content_hashes = in_flight.pop(future)
+                results, extract_seconds, nlp_seconds = future.result()
+                stats['extract_seconds'] += extract_seconds
+                stats['nlp_seconds'] += nlp_seconds
+                cache_put_many(PARSE, {content_hashes[file_path]: parsed_data
+                                       for file_path, parsed_data, error in results
+                                       if not error and cacheable(parsed_data)}, version)
+                write(results, content_hashes)
+    sink.close()
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['files_per_second'] = _rate(stats['files'], stats['seconds'])
+    # Stage throughput with all workers busy on that stage
+    stats['extract_files_per_second'] = _rate(stats['files'] * processes, stats['extract_seconds'])
+    stats['nlp_files_per_second'] = _rate(stats['files'] * processes, stats['nlp_seconds'])
+    stats['write_files_per_second'] = _rate(stats['files'], stats['write_seconds'])
+    return stats
@@ -0,0 +1,68 @@
+import hashlib
+from flask import current_app, make_response, request
+from utils.job_version import current_job_version
+
+# Conditional GET support: endpoints compute a cheap version of what they
+# would return and only query and serialize the body when the client's copy
+# (If-None-Match / If-Modified-Since) is out of date.
+
+
+def make_etag(*version):
+    """Strong ETag for the current URL (path and query string) at a version"""
+    key = '\x1f'.join(str(part) for part in (request.full_path,) + version)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified and request.if_modified_since:
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def conditional_response(version, build, last_modified=None, private=False):
+    """
+    Answer a GET with 304 Not Modified if the client already has this version,
+    otherwise with build()'s response carrying validators.
+
+    Args:
+        version (tuple): Values that change whenever the response would
+        build (callable): Returns the full response (body, or (body, status))
+        last_modified (datetime): Naive UTC time of the last change, if known
+        private (bool): Per-user data that shared caches must not store
+
+    Returns:
+        Response
+    """
+    etag = make_etag(*version)
+    if _not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.max_age = current_app.config['HTTP_CACHE_MAX_AGE']
+    if private:
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    return response
+
+
+def job_list_version():
+    """
+    Write counter of the jobs table (see utils/job_version.py); any job
+    write, including deactivations and deletions, moves it. One primary
+    key lookup, whatever the size of the table.
+
+    Returns:
+        tuple: (version, last_modified)
+    """
+    version, changed_at = current_job_version()
+    return (version,), changed_at
@@ -0,0 +1,140 @@
+import re
+
+# Structured job attributes parsed from the free-text salary_range and
+# location fields, stored in their own (indexed) columns at write time.
+
+# An amount: '.' or ',' followed by exactly three digits groups thousands
+# ('100.000', '120,000'), otherwise it is a decimal point ('45.50', '1,5k')
+_AMOUNT = re.compile(r'(?P<before>[$€£¥])?\s*\b(?P<whole>\d{1,3}(?:[.,]\d{3})+(?!\d)|\d+)'
+                     r'(?:[.,](?P<fraction>\d{1,2})(?!\d))?\s*(?P<suffix>[km]\b)?(?:\s*(?P<after>[$€£¥]))?',
+                     re.IGNORECASE)
+# What separates the two amounts of a range
+_RANGE_SEPARATOR = re.compile(r'\s*(?:-|–|—|to)\s*', re.IGNORECASE)
+_HOURLY = re.compile(r'/\s*(?:hr|hour)|per\s+hour|hourly', re.IGNORECASE)
+_REMOTE = re.compile(r'\bremote\b', re.IGNORECASE)
+
+# Working hours in a year, to compare hourly rates with annual salaries
+HOURS_PER_YEAR = 2080
+
+US_STATES = {
+    'AL': 'alabama', 'AK': 'alaska', 'AZ': 'arizona', 'AR': 'arkansas', 'CA': 'california',
+    'CO': 'colorado', 'CT': 'connecticut', 'DE': 'delaware', 'DC': 'district of columbia',
+    'FL': 'florida', 'GA': 'georgia', 'HI': 'hawaii', 'ID': 'idaho', 'IL': 'illinois',
+    'IN': 'indiana', 'IA': 'iowa', 'KS': 'kansas', 'KY': 'kentucky', 'LA': 'louisiana',
+    'ME': 'maine', 'MD': 'maryland', 'MA': 'massachusetts', 'MI': 'michigan', 'MN': 'minnesota',
+    'MS': 'mississippi', 'MO': 'missouri', 'MT': 'montana', 'NE': 'nebraska', 'NV': 'nevada',
+    'NH': 'new hampshire', 'NJ': 'new jersey', 'NM': 'new mexico', 'NY': 'new york',
+    'NC': 'north carolina', 'ND': 'north dakota', 'OH': 'ohio', 'OK': 'oklahoma', 'OR': 'oregon',
+    'PA': 'pennsylvania', 'RI': 'rhode island', 'SC': 'south carolina', 'SD': 'south dakota',
+    'TN': 'tennessee', 'TX': 'texas', 'UT': 'utah', 'VT': 'vermont', 'VA': 'virginia',
+    'WA': 'washington', 'WV': 'west virginia', 'WI': 'wisconsin', 'WY': 'wyoming',
+}
+_US_STATE_CODES = {name: code for code, name in US_STATES.items()}
+
+# Country names and common aliases -> ISO 3166-1 alpha-2 code
+COUNTRIES = {
+    'us': 'US', 'usa': 'US', 'united states': 'US', 'united states of america': 'US',
+    'uk': 'GB', 'gb': 'GB', 'united kingdom': 'GB', 'england': 'GB', 'great britain': 'GB',
+    'canada': 'CA', 'germany': 'DE', 'france': 'FR', 'spain': 'ES', 'italy': 'IT',
+    'netherlands': 'NL', 'ireland': 'IE', 'india': 'IN', 'australia': 'AU', 'singapore': 'SG',
+    'japan': 'JP', 'brazil': 'BR', 'mexico': 'MX', 'poland': 'PL', 'sweden': 'SE',
+    'switzerland': 'CH', 'portugal': 'PT', 'israel': 'IL', 'china': 'CN',
+}
+
+
+def parse_salary_range(salary_range):
+    """
+    Parse a free-text salary into annual amounts, e.g. '$100k - $150k',
+    '$120,000 - $150,000', '€100.000 - €120.000', '60-80k', '90000' or
+    '$45/hr'. Only numbers next to a currency sign, the two ends of a range
+    or a bare amount count, so 'Competitive + 401k' has no salary; ranges
+    without a currency sign or k/m suffix come after currency amounts.
+
+    Returns:
+        tuple: (salary_min, salary_max) as ints, or (None, None)
+    """
+    if not salary_range:
+        return None, None
+
+    matches = list(_AMOUNT.finditer(salary_range))
+    ranges = [(first, second) for first, second in zip(matches, matches[1:])
+              if _RANGE_SEPARATOR.fullmatch(salary_range, first.end(), second.start())]
+    # A range marked by a currency sign or a k/m suffix, then currency
+    # amounts, and only then a bare range: '2-5 years, $90k' pays $90k
+    marked = [pair for pair in ranges if any(m['before'] or m['after'] or m['suffix'] for m in pair)]
+    if marked:
+        amounts = [_amount_value(match) for match in marked[0]]
+    else:
+        amounts = [_amount_value(match) for match in matches if match['before'] or match['after']][:2]
+    if not amounts and ranges:
+        amounts = [_amount_value(match) for match in ranges[0]]
+    if not amounts and len(matches) == 1 and matches[0].group().strip() == salary_range.strip():
+        amounts = [_amount_value(matches[0])]
+    if not amounts:
+        return None, None
+
+    # '100-150k': the suffix of the upper bound applies to both
+    if len(amounts) > 1 and amounts[0] * 1000 <= amounts[1] and amounts[0] < 1000:
+        amounts[0] *= 1000
+    if _HOURLY.search(salary_range):
+        amounts = [value * HOURS_PER_YEAR for value in amounts]
+
+    low, high = amounts[0], amounts[1] if len(amounts) > 1 else amounts[0]
+    return int(min(low, high)), int(max(low, high))
+
+
+def _amount_value(match):
+    value = float(re.sub(r'[.,]', '', match['whole']) + '.' + (match['fraction'] or '0'))
+    if match['suffix']:
+        value *= 1000 if match['suffix'].lower() == 'k' else 1000000
+    return value
+
+
+def normalize_region(region):
+    """US state names and codes -> two-letter code; other regions title-cased"""
+    if not region:
+        return None
+    region = region.strip()
+    if region.upper() in US_STATES:
+        return region.upper()
+    return _US_STATE_CODES.get(region.lower(), region.title())
+
+
+def normalize_country(country):
+    """Country names and aliases -> ISO alpha-2 code (None if unknown)"""
+    if not country:
+        return None
+    country = country.strip()
+    return COUNTRIES.get(country.lower(), country.upper() if len(country) == 2 else None)
+
+
+def parse_location(location):
+    """
+    Parse a free-text location like 'San Francisco, CA', 'London, UK',
+    'Austin, Texas, USA' or 'Remote (US)'
+
+    Returns:
+        dict: city, region, country and remote
+    """
+    parsed = {'city': None, 'region': None, 'country': None, 'remote': False}
+    if not location:
+        return parsed
+
+    parsed['remote'] = bool(_REMOTE.search(location))
+    text = _REMOTE.sub(' ', location.replace('(', ',').replace(')', ','))
+    parts = [part.strip(' -/') for part in text.split(',')]
+    parts = [part for part in parts if part and part.lower() not in ('hybrid', 'onsite', 'on-site')]
+
+    # Read from the end: country, then region, then city
+    if parts and parts[-1].lower() in COUNTRIES:
+        parsed['country'] = COUNTRIES[parts.pop().lower()]
+    if parts and (parts[-1].upper() in US_STATES or parts[-1].lower() in _US_STATE_CODES):
+        parsed['region'] = normalize_region(parts.pop())
+        parsed['country'] = parsed['country'] or 'US'
+    # 'Remote - Europe': what is left of a remote location is an area, not a city
+    if len(parts) > 1 or (parsed['remote'] and parts and not parsed['region']):
+        parsed['region'] = parsed['region'] or normalize_region(parts.pop())
+    if parts:
+        parsed['city'] = parts[0].title() if parts[0].islower() else parts[0]
+    return parsed
+
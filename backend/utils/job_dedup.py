@@ -0,0 +1,250 @@
+import hashlib
+import re
+import zlib
+import numpy as np
+from flask import current_app
+from sqlalchemy import bindparam, delete, insert, or_
+from models.db import db
+from models.job import Job
+from models.job_lsh_band import JobLshBand
+
+# Near-duplicate postings. Each description is reduced to a MinHash
+# signature of its word shingles; the signature is cut into bands, and
+# canonical jobs are indexed by the hash of each band in job_lsh_bands. Two
+# descriptions with Jaccard similarity s share at least one bucket with
+# probability 1 - (1 - s^ROWS)^BANDS, so candidates are found with a few
+# indexed lookups and then verified on the full signatures.
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Universal hashing (a * x + b) mod p; fixed seed so stored signatures stay comparable
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, _PRIME, size=(NUM_PERM, 1)).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=(NUM_PERM, 1)).astype(np.uint64)
+
+# Buckets per candidate query
+_LOOKUP_CHUNK = 900
+
+
+def shingles(text):
+    """Set of word n-grams of a text"""
+    words = re.findall(r'\w+', (text or '').lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """
+    MinHash signature of a text's shingles
+
+    Returns:
+        np.ndarray: NUM_PERM uint32 values, or None for an empty text
+    """
+    shingle_set = shingles(text)
+    if not shingle_set:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode()) % _PRIME for s in shingle_set),
+                         dtype=np.uint64, count=len(shingle_set))
+    return ((_A * hashes + _B) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def signature_similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return float(np.mean(a == b))
+
+
+def band_buckets(signature):
+    """(band, bucket) pairs of a signature"""
+    pairs = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        pairs.append((band, int.from_bytes(digest, 'big') >> 1))
+    return pairs
+
+
+def _indexed_buckets(pairs):
+    """(band, bucket) -> ids of the active canonical jobs indexed under it"""
+    wanted = set(pairs)
+    buckets = sorted({bucket for _, bucket in wanted})
+    found = {}
+    for start in range(0, len(buckets), _LOOKUP_CHUNK):
+        rows = (db.session.query(JobLshBand.band, JobLshBand.bucket, JobLshBand.job_id)
+                .join(Job, Job.id == JobLshBand.job_id)
+                .filter(Job.active.is_(True),
+                        JobLshBand.bucket.in_(buckets[start:start + _LOOKUP_CHUNK])))
+        for band, bucket, job_id in rows:
+            if (band, bucket) in wanted:
+                found.setdefault((band, bucket), set()).add(job_id)
+    return found
+
+
+def _resolve(entries, threshold, index=None, signatures=None):
+    """
+    Sign jobs and find the canonical job each one duplicates.
+
+    Args:
+        entries: (job_id, description) pairs in id order; earlier entries can
+            be the canonical jobs of later ones
+        index, signatures: (band, bucket) -> job ids and job id -> signature of
+            the canonical jobs resolved so far, looked up instead of
+            job_lsh_bands and extended in place
+
+    Returns:
+        list: (job_id, signature or None, canonical job id or None)
+    """
+    signed = [(job_id, minhash_signature(description)) for job_id, description in entries]
+    buckets = {job_id: band_buckets(sig) for job_id, sig in signed if sig is not None}
+
+    if index is None:
+        entry_ids = {job_id for job_id, _ in entries}
+        index = _indexed_buckets({pair for pairs in buckets.values() for pair in pairs})
+        candidate_ids = {job_id for ids in index.values() for job_id in ids} - entry_ids
+        signatures = {job_id: np.frombuffer(minhash, dtype=np.uint32)
+                      for job_id, minhash in db.session.query(Job.id, Job.minhash).filter(Job.id.in_(candidate_ids))
+                      if minhash}
+
+    decisions = []
+    for job_id, signature in signed:
+        if signature is None:
+            decisions.append((job_id, None, None))
+            continue
+
+        # Only signed canonical jobs: older rows, or entries already resolved as originals
+        candidates = {c for pair in buckets[job_id] for c in index.get(pair, ()) if c in signatures}
+        # Most similar candidate over the threshold; ties go to the oldest job
+        best_id, best_score = None, threshold
+        for candidate in sorted(candidates):
+            score = signature_similarity(signature, signatures[candidate])
+            if score > best_score or (best_id is None and score == best_score):
+                best_id, best_score = candidate, score
+
+        if best_id is None:
+            # A new canonical job: later entries of this run can match it
+            signatures[job_id] = signature
+            for pair in buckets[job_id]:
+                index.setdefault(pair, set()).add(job_id)
+        decisions.append((job_id, signature, best_id))
+    return decisions
+
+
+def _write_bands(decisions):
+    job_ids = [job_id for job_id, _, _ in decisions]
+    db.session.execute(delete(JobLshBand).where(JobLshBand.job_id.in_(job_ids)))
+    rows = [{'job_id': job_id, 'band': band, 'bucket': bucket}
+            for job_id, signature, canonical_id in decisions
+            if signature is not None and canonical_id is None
+            for band, bucket in band_buckets(signature)]
+    if rows:
+        db.session.execute(insert(JobLshBand), rows)
+
+
+def dedupe_job(job):
+    """
+    Sign a (flushed) job and collapse it into the job it duplicates, if any,
+    by deactivating it under canonical_job_id. Changes are left in the session.
+
+    Returns:
+        int: canonical job id, or None if the job is not a duplicate
+    """
+    [(job_id, signature, canonical_id)] = _resolve([(job.id, job.description)],
+                                                   current_app.config['DUPLICATE_THRESHOLD'])
+    job.minhash = signature.tobytes() if signature is not None else None
+    if canonical_id:
+        job.canonical_job_id = canonical_id
+        job.active = False
+    elif job.canonical_job_id:
+        # No longer a duplicate after an edit
+        job.canonical_job_id = None
+        job.active = True
+    _write_bands([(job_id, signature, canonical_id)])
+    return canonical_id
+
+
+def dedupe_jobs(entries):
+    """
+    Bulk variant of dedupe_job for freshly inserted jobs, written with
+    executemany statements; the caller commits.
+
+    Args:
+        entries: (job_id, description) pairs in id order
+
+    Returns:
+        dict: duplicate job id -> canonical job id
+    """
+    decisions = _resolve(entries, current_app.config['DUPLICATE_THRESHOLD'])
+    jobs = Job.__table__
+    signed = [{'job_id': job_id, 'minhash': signature.tobytes()}
+              for job_id, signature, _ in decisions if signature is not None]
+    duplicates = [{'job_id': job_id, 'canonical_id': canonical_id}
+                  for job_id, _, canonical_id in decisions if canonical_id]
+    if signed:
+        db.session.execute(jobs.update().where(jobs.c.id == bindparam('job_id'))
+                           .values(minhash=bindparam('minhash')), signed)
+    if duplicates:
+        db.session.execute(jobs.update().where(jobs.c.id == bindparam('job_id'))
+                           .values(canonical_job_id=bindparam('canonical_id'), active=False), duplicates)
+    _write_bands(decisions)
+    return {row['job_id']: row['canonical_id'] for row in duplicates}
+
+
+def dedupe_catalog(batch_size=1000, log=print):
+    """
+    Re-sign every listed or collapsed job and recompute from scratch which
+    older job each one duplicates; the caller commits.
+
+    All assignments are resolved in memory before anything is written, and
+    only rows whose signature or canonical job changed are updated, so known
+    duplicates are never listed again while the pass runs. job_lsh_bands is
+    rebuilt from the resulting canonical jobs in the same transaction.
+
+    Returns:
+        dict: counts of the run
+    """
+    threshold = current_app.config['DUPLICATE_THRESHOLD']
+    index, signatures = {}, {}
+    signed, assigned = [], []
+    count = duplicates = 0
+    last_id = 0
+    while True:
+        rows = (db.session.query(Job.id, Job.description, Job.minhash, Job.canonical_job_id)
+                .filter(or_(Job.active.is_(True), Job.canonical_job_id.isnot(None)), Job.id > last_id)
+                .order_by(Job.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            break
+        stored = {job_id: (minhash, canonical_id) for job_id, _, minhash, canonical_id in rows}
+        decisions = _resolve([(job_id, description) for job_id, description, _, _ in rows],
+                             threshold, index, signatures)
+        for job_id, signature, canonical_id in decisions:
+            minhash = signature.tobytes() if signature is not None else None
+            if minhash != stored[job_id][0]:
+                signed.append({'job_id': job_id, 'minhash': minhash})
+            if canonical_id != stored[job_id][1]:
+                assigned.append({'job_id': job_id, 'canonical_id': canonical_id, 'listed': canonical_id is None})
+            duplicates += canonical_id is not None
+        count += len(rows)
+        last_id = rows[-1][0]
+        log(f"Signed {count} jobs, {duplicates} near-duplicates")
+
+    jobs = Job.__table__
+    if signed:
+        db.session.execute(jobs.update().where(jobs.c.id == bindparam('job_id'))
+                           .values(minhash=bindparam('minhash')), signed)
+    if assigned:
+        db.session.execute(jobs.update().where(jobs.c.id == bindparam('job_id'))
+                           .values(canonical_job_id=bindparam('canonical_id'), active=bindparam('listed')),
+                           assigned)
+    # signatures now holds exactly the canonical jobs
+    db.session.execute(delete(JobLshBand))
+    bands = [{'job_id': job_id, 'band': band, 'bucket': bucket}
+             for job_id, signature in signatures.items()
+             for band, bucket in band_buckets(signature)]
+    if bands:
+        db.session.execute(insert(JobLshBand), bands)
+    return {'jobs': count, 'duplicates': duplicates, 'changed': len(assigned)}
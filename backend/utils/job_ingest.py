@@ -0,0 +1,218 @@
+import csv
+import io
+import json
+import re
+import time
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import insert
+from models.db import db
+from models.job import Job
+from models.job_skill import JobSkill
+from utils.skills import skill_ids, skill_names
+from utils.job_attributes import parse_location, parse_salary_range
+from utils.skill_store import DEFAULT_IMPORTANCE, get_or_create_skills
+from utils.job_dedup import dedupe_jobs
+
+# Bulk loading of job feeds. A feed is streamed through a chain of
+# generators (parse -> normalize -> dedupe -> batch) so memory stays flat
+# however large it is, and each batch is written with one executemany
+# INSERT and committed on its own.
+
+FORMATS = ('jsonl', 'csv')
+
+# Separators of the skills column of CSV feeds
+_SKILL_SEPARATORS = re.compile(r'[;|,]')
+
+
+def feed_format(filename, default='jsonl'):
+    """Guess a feed's format from its file extension"""
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension in ('jsonl', 'ndjson', 'json'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    return default
+
+
+# Text columns of a feed record; a record with any other type in them is rejected
+_TEXT_FIELDS = ('title', 'company', 'description', 'location', 'salary_range', 'salary')
+
+
+def parse_records(lines, fmt, stats):
+    """Decode a text stream of a JSONL or CSV feed into dicts; every record or line is counted as read"""
+    if fmt == 'csv':
+        for record in csv.DictReader(lines):
+            stats['read'] += 1
+            yield record
+        return
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        stats['read'] += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            stats['rejected'] += 1
+            continue
+        if isinstance(record, dict):
+            yield record
+        else:
+            stats['rejected'] += 1
+
+
+def _record_skills(record):
+    skills = record.get('skills')
+    if skills is None:
+        requirements = record.get('requirements')
+        if isinstance(requirements, dict):
+            skills = requirements.get('skills')
+        elif isinstance(requirements, list):
+            skills = requirements
+    if isinstance(skills, str):
+        skills = _SKILL_SEPARATORS.split(skills)
+    if not isinstance(skills, list):
+        return []
+    return skill_names(skills)
+
+
+def _posted_at(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def normalize_records(records, stats):
+    """Map feed records to jobs table rows, dropping ones missing required fields or with non-text fields"""
+    for record in records:
+        if any(not isinstance(record.get(field), (str, type(None))) for field in _TEXT_FIELDS):
+            stats['rejected'] += 1
+            continue
+        row = {
+            'title': (record.get('title') or '').strip(),
+            'company': (record.get('company') or '').strip(),
+            'description': (record.get('description') or '').strip(),
+            'location': (record.get('location') or '').strip() or None,
+            'salary_range': (record.get('salary_range') or record.get('salary') or '').strip() or None,
+            'requirements': json.dumps({'skills': _record_skills(record)}),
+            'active': True,
+        }
+        if not (row['title'] and row['company'] and row['description']):
+            stats['rejected'] += 1
+            continue
+
+        # Core inserts skip Job's validators, so parse the structured columns here
+        row['salary_min'], row['salary_max'] = parse_salary_range(row['salary_range'])
+        row.update(parse_location(row['location']))
+
+        posted_at = _posted_at(record.get('posted_at'))
+        if posted_at:
+            row['posted_at'] = posted_at
+        yield row
+
+
+def dedupe_key(company, title, location):
+    return (company or '').strip().lower(), (title or '').strip().lower(), (location or '').strip().lower()
+
+
+def existing_job_keys():
+    """Dedupe keys of the jobs already in the database"""
+    rows = db.session.query(Job.company, Job.title, Job.location).yield_per(10000)
+    return {dedupe_key(*row) for row in rows}
+
+
+def dedupe_rows(rows, seen, stats):
+    """Drop postings whose (company, title, location) was already seen"""
+    for row in rows:
+        key = dedupe_key(row['company'], row['title'], row['location'])
+        if key in seen:
+            stats['duplicates'] += 1
+            continue
+        seen.add(key)
+        yield row
+
+
+def batched(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _insert_batch(batch):
+    """Insert one batch of jobs and their job_skills rows, then commit"""
+    # posted_at must be present in every row of an executemany
+    now = datetime.utcnow()
+    for row in batch:
+        row.setdefault('posted_at', now)
+
+    # Rows are unique on the dedupe key, which maps the returned ids back to
+    # them without forcing a row-at-a-time ordered RETURNING
+    inserted = db.session.execute(insert(Job).returning(Job.id, Job.company, Job.title, Job.location), batch)
+    rows_by_key = {dedupe_key(row['company'], row['title'], row['location']): row for row in batch}
+    jobs = sorted((job_id, rows_by_key[dedupe_key(company, title, location)])
+                  for job_id, company, title, location in inserted)
+
+    # Spellings of one skill ('Foo Bar', 'foo-bar') share its registry id and its skills row
+    skills_by_job = {job_id: json.loads(row['requirements'])['skills'] for job_id, row in jobs}
+    skill_rows = get_or_create_skills({s for skills in skills_by_job.values() for s in skills})
+    job_skills = [{'job_id': job_id, 'skill_id': skill_rows[skill_id], 'importance_level': DEFAULT_IMPORTANCE}
+                  for job_id, skills in skills_by_job.items() for skill_id in skill_ids(skills)]
+    if job_skills:
+        db.session.execute(insert(JobSkill), job_skills)
+
+    # Near-duplicates of stored (or earlier) postings are kept inactive
+    duplicates = dedupe_jobs([(job_id, row['description']) for job_id, row in jobs])
+    # The inserts bump the jobs write counter, so the skill index rebuilds on its next lookup
+    db.session.commit()
+    return len(jobs), len(duplicates)
+
+
+def ingest_jobs(lines, fmt='jsonl', batch_size=1000, log=print):
+    """
+    Load a feed of job postings.
+
+    Args:
+        lines: Text stream (or any iterable of lines) of the feed
+        fmt (str): 'jsonl' (one JSON object per line) or 'csv' (header row;
+            skills separated by ';', '|' or ',')
+        batch_size (int): Rows per INSERT and per commit
+        log: Progress callback
+
+    Returns:
+        dict: read, inserted, duplicates (same company, title and location;
+            skipped), near_duplicates (inserted inactive under a canonical
+            job) and rejected counts, seconds and rows_per_second
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported feed format: {fmt}")
+
+    started = time.perf_counter()
+    stats = {'read': 0, 'inserted': 0, 'duplicates': 0, 'near_duplicates': 0, 'rejected': 0}
+
+    rows = normalize_records(parse_records(lines, fmt, stats), stats)
+    rows = dedupe_rows(rows, existing_job_keys(), stats)
+    for batch in batched(rows, batch_size):
+        inserted, near_duplicates = _insert_batch(batch)
+        stats['inserted'] += inserted
+        stats['near_duplicates'] += near_duplicates
+        elapsed = time.perf_counter() - started
+        log(f"Inserted {stats['inserted']} jobs ({stats['read']} read, {stats['duplicates']} duplicates, "
+            f"{stats['near_duplicates']} near-duplicates, {stats['rejected']} rejected), "
+            f"{stats['read'] / elapsed:.0f} rows/s")
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['rows_per_second'] = stats['read'] / stats['seconds'] if stats['seconds'] else 0
+    return stats
+
+
+def text_stream(binary):
+    """Decode a binary upload/file stream line by line"""
+    return io.TextIOWrapper(binary, encoding='utf-8', errors='replace', newline='')
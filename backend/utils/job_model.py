@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import numpy as np
+from scipy import sparse
+from flask import current_app
+from models.db import db
+from models.job import Job
+from utils.skills import parse_job_skills
+
+# Try to import the job matcher, but don't fail if ML dependencies are missing
+try:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'ml', 'scripts'))
+    from job_matcher import JobMatcher
+    MATCHER_AVAILABLE = True
+except ImportError:
+    MATCHER_AVAILABLE = False
+
+BATCH_SIZE = 1000
+
+
+def job_document(title, description, requirements):
+    """Text a job is represented by in the TF-IDF corpus model"""
+    return ' '.join([title or '', description or ''] + parse_job_skills(requirements))
+
+
+def _active_job_documents(job_ids=None):
+    query = (db.session.query(Job.id, Job.title, Job.description, Job.requirements)
+             .filter_by(active=True).order_by(Job.id))
+    if job_ids is not None:
+        query = query.filter(Job.id.in_(job_ids))
+    for job_id, title, description, requirements in query.yield_per(BATCH_SIZE):
+        yield job_id, job_document(title, description, requirements)
+
+
+def model_dir():
+    return current_app.config['JOB_MODEL_DIR']
+
+
+def build_job_model(path=None, log=print):
+    """Fit the corpus model over every active job and persist it"""
+    path = path or model_dir()
+    started = time.perf_counter()
+    matcher = JobMatcher()
+    matcher.fit_jobs(_active_job_documents())
+    if not matcher.is_fitted:
+        log("No active jobs to fit the job model on")
+        return None
+    matcher.save(path)
+    log(f"Fitted job model on {len(matcher.job_ids)} jobs in {time.perf_counter() - started:.2f}s")
+    return matcher
+
+
+def update_job_model(path=None, job_ids=None, log=print):
+    """
+    Bring a persisted corpus model up to date without refitting.
+
+    Active jobs missing from the model are added, inactive or deleted ones
+    are dropped, and job_ids (e.g. edited postings) are re-vectorized. When
+    the IDF drift passes the model's threshold a full refit runs instead.
+    """
+    path = path or model_dir()
+    if not os.path.exists(os.path.join(path, JobMatcher.STATE_FILE)):
+        return build_job_model(path, log)
+
+    started = time.perf_counter()
+    matcher = JobMatcher.load(path)
+    modeled = {int(job_id) for job_id in matcher.job_ids if job_id >= 0}
+    active = {job_id for (job_id,) in db.session.query(Job.id).filter_by(active=True)}
+
+    matcher.remove_jobs(modeled - active)
+    changed = (active - modeled) | (set(job_ids or ()) & active)
+    matcher.update_jobs(_active_job_documents(sorted(changed)))
+
+    drift = matcher.idf_drift()
+    if matcher.needs_refit():
+        log(f"IDF drift {drift:.3f} exceeds {matcher.drift_threshold:.3f}, refitting")
+        return build_job_model(path, log)
+
+    matcher.save(path)
+    log(f"Updated job model: {len(changed)} jobs added or changed, {len(modeled - active)} removed, "
+        f"drift {drift:.3f}, in {time.perf_counter() - started:.2f}s")
+    return matcher
+
+
+def job_text_matrix(job_ids, path=None):
+    """
+    L2-normalized TF-IDF vectors of active jobs, one row per job id.
+
+    Uses the persisted corpus model (jobs added since its last update are
+    vectorized with its vocabulary), or a model fitted on the fly if none
+    has been built. None if the job matcher is unavailable.
+    """
+    if not MATCHER_AVAILABLE:
+        return None
+
+    path = path or model_dir()
+    if os.path.exists(os.path.join(path, JobMatcher.STATE_FILE)):
+        matcher = JobMatcher.load(path)
+    else:
+        matcher = JobMatcher()
+        matcher.fit_jobs(_active_job_documents())
+        if not matcher.is_fitted:
+            return None
+
+    job_ids = [int(job_id) for job_id in job_ids]
+    matrix = matcher.job_vectors(job_ids)
+    missing = [i for i, job_id in enumerate(job_ids) if not matcher.has_job(job_id)]
+    if missing:
+        texts = dict(_active_job_documents([job_ids[i] for i in missing]))
+        vectors = matcher.text_vectors([texts.get(job_ids[i], '') for i in missing])
+        # Scatter the new rows into the (all zero) rows of the unknown jobs
+        placement = sparse.csr_matrix((np.ones(len(missing), dtype=np.float32), (missing, range(len(missing)))),
+                                      shape=(len(job_ids), len(missing)))
+        matrix = matrix + placement @ vectors
+    return matrix.tocsr()
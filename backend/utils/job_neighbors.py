@@ -0,0 +1,187 @@
+import time
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from sqlalchemy import delete, func, insert, or_, select
+from models.db import db
+from models.job import Job
+from models.job_neighbor import JobNeighbor
+from models.job_neighbor_run import JobNeighborRun
+from utils.match_batch import load_job_matrix
+from utils.job_model import job_text_matrix
+
+# "Similar jobs": the top-K active jobs of each active job, precomputed into
+# job_neighbors so GET /api/jobs/<id>/similar is one indexed read. The score
+# blends the Jaccard similarity of the required skills with the cosine
+# similarity of the TF-IDF job vectors. Candidates are only the jobs sharing
+# a skill (through the skill posting lists, i.e. a sparse job x skill
+# product), so the work grows with the overlap, not with n^2; skills required
+# by more than NEIGHBOR_MAX_POSTING jobs are too common to make two jobs
+# candidates on their own, though they still count towards the Jaccard score.
+
+CHUNK_SIZE = 500
+_INSERT_CHUNK = 5000
+_LOOKUP_CHUNK = 900
+
+
+class _JobSimilarity:
+    """Skill and text matrices of the active jobs, and pair scoring over them"""
+
+    def __init__(self):
+        config = current_app.config
+        self.job_ids, self.skills, _ = load_job_matrix()
+        self.positions = {int(job_id): i for i, job_id in enumerate(self.job_ids)}
+        self.skill_counts = self.skills.getnnz(axis=1)
+        self.skill_weight = config['NEIGHBOR_SKILL_WEIGHT']
+        self.text_weight = config['NEIGHBOR_TEXT_WEIGHT']
+
+        posting_lengths = self.skills.getnnz(axis=0)
+        blocking = np.flatnonzero(posting_lengths <= config['NEIGHBOR_MAX_POSTING'])
+        self.blocking = self.skills[:, blocking].tocsr()
+        self.blocking_t = self.blocking.T.tocsr()
+        self.text = job_text_matrix(self.job_ids) if len(self.job_ids) else None
+
+    def candidate_pairs(self, positions):
+        """(row, column) positions of the jobs sharing a blocking skill, without self pairs"""
+        shared = (self.blocking[positions] @ self.blocking_t).tocsr()
+        rows = np.repeat(np.asarray(positions), np.diff(shared.indptr))
+        columns = shared.indices
+        keep = rows != columns
+        return rows[keep], columns[keep]
+
+    def score(self, rows, columns):
+        """Blended, skill and text scores of job pairs given by position"""
+        if not len(rows):
+            empty = np.zeros(0)
+            return empty, empty, empty
+        shared = np.asarray(self.skills[rows].multiply(self.skills[columns]).sum(axis=1)).ravel()
+        union = self.skill_counts[rows] + self.skill_counts[columns] - shared
+        skill_scores = np.divide(shared, union, out=np.zeros(len(rows)), where=union > 0)
+        if self.text is not None:
+            text_scores = np.asarray(self.text[rows].multiply(self.text[columns]).sum(axis=1)).ravel()
+        else:
+            text_scores = np.zeros(len(rows))
+        scores = self.skill_weight * skill_scores + self.text_weight * text_scores
+        return scores, skill_scores, text_scores
+
+    def neighbors(self, positions, top_k):
+        """Yield (job position, [(neighbor position, score, skill score, text score)]) best first"""
+        rows, columns = self.candidate_pairs(positions)
+        scores, skill_scores, text_scores = self.score(rows, columns)
+        # Pairs are grouped by row; sort each group by score, lowest job id on ties
+        order = np.lexsort((columns, -scores, rows))
+        rows, columns = rows[order], columns[order]
+        scores, skill_scores, text_scores = scores[order], skill_scores[order], text_scores[order]
+        bounds = np.searchsorted(rows, positions, side='left'), np.searchsorted(rows, positions, side='right')
+        for position, start, end in zip(positions, *bounds):
+            end = min(end, start + top_k)
+            yield position, list(zip(columns[start:end], scores[start:end],
+                                     skill_scores[start:end], text_scores[start:end]))
+
+
+def _kth_scores(job_ids, top_k):
+    """job id -> its lowest stored neighbor score, for jobs with a full list of top_k neighbors"""
+    job_ids = sorted(job_ids)
+    kth = {}
+    for start in range(0, len(job_ids), _LOOKUP_CHUNK):
+        rows = (db.session.query(JobNeighbor.job_id, func.count(JobNeighbor.id), func.min(JobNeighbor.score))
+                .filter(JobNeighbor.job_id.in_(job_ids[start:start + _LOOKUP_CHUNK]))
+                .group_by(JobNeighbor.job_id))
+        kth.update({job_id: low for job_id, count, low in rows if count >= top_k})
+    return kth
+
+
+def _remove_inactive():
+    """Delete rows of or pointing at jobs that are no longer active; returns the jobs that lost a neighbor"""
+    active = select(Job.id).where(Job.active.is_(True))
+    orphaned = {job_id for (job_id,) in (db.session.query(JobNeighbor.job_id)
+                                         .filter(JobNeighbor.neighbor_id.not_in(active)).distinct())}
+    db.session.execute(delete(JobNeighbor).where(or_(JobNeighbor.job_id.not_in(active),
+                                                     JobNeighbor.neighbor_id.not_in(active))))
+    return orphaned
+
+
+def _changed_jobs(similarity, since, top_k):
+    """
+    Positions of the jobs whose neighbor lists may differ from the stored ones:
+    jobs written since the last run, the jobs listing them, and the jobs a
+    changed job now scores high enough for to enter their top_k.
+    """
+    dirty = [similarity.positions[job_id] for (job_id,) in
+             db.session.query(Job.id).filter(Job.active.is_(True), Job.updated_at > since)
+             if job_id in similarity.positions]
+    dirty_ids = [int(similarity.job_ids[p]) for p in dirty]
+    changed = set(dirty)
+
+    for start in range(0, len(dirty_ids), _LOOKUP_CHUNK):
+        listing = (db.session.query(JobNeighbor.job_id).distinct()
+                   .filter(JobNeighbor.neighbor_id.in_(dirty_ids[start:start + _LOOKUP_CHUNK])))
+        changed.update(similarity.positions[job_id] for (job_id,) in listing if job_id in similarity.positions)
+
+    for start in range(0, len(dirty), CHUNK_SIZE):
+        rows, columns = similarity.candidate_pairs(dirty[start:start + CHUNK_SIZE])
+        # Similarity is symmetric: the pair's score is also the dirty job's score as the candidate's neighbor
+        scores, _, _ = similarity.score(rows, columns)
+        best = {}
+        for column, score in zip(columns, scores):
+            best[column] = max(best.get(column, 0.0), score)
+        kth = _kth_scores({int(similarity.job_ids[c]) for c in best}, top_k)
+        changed.update(c for c, score in best.items()
+                       if score > kth.get(int(similarity.job_ids[c]), -1.0))
+    return sorted(changed)
+
+
+def refresh_neighbors(full=False, top_k=None, log=print):
+    """
+    Bring job_neighbors up to date.
+
+    Args:
+        full (bool): Recompute every active job instead of only the jobs
+            affected by writes since the last run
+        top_k (int): Neighbors kept per job (defaults to NEIGHBORS_PER_JOB)
+        log: Progress callback
+
+    Returns:
+        dict: jobs, refreshed, neighbors (rows written) and seconds
+    """
+    started = time.perf_counter()
+    computed_at = datetime.utcnow()
+    top_k = top_k or current_app.config['NEIGHBORS_PER_JOB']
+
+    # The start of the last completed run, whether or not it wrote any rows
+    since = None if full else db.session.query(func.max(JobNeighborRun.started_at)).scalar()
+    orphaned = _remove_inactive()
+    similarity = _JobSimilarity()
+    log(f"Loaded {len(similarity.job_ids)} jobs in {time.perf_counter() - started:.2f}s")
+
+    if since is None:
+        targets = list(range(len(similarity.job_ids)))
+    else:
+        targets = set(_changed_jobs(similarity, since, top_k))
+        targets.update(similarity.positions[job_id] for job_id in orphaned if job_id in similarity.positions)
+        targets = sorted(targets)
+
+    written = 0
+    for start in range(0, len(targets), CHUNK_SIZE):
+        chunk = targets[start:start + CHUNK_SIZE]
+        rows = []
+        for position, neighbors in similarity.neighbors(chunk, top_k):
+            job_id = int(similarity.job_ids[position])
+            rows.extend({'job_id': job_id, 'neighbor_id': int(similarity.job_ids[neighbor]), 'rank': rank,
+                         'score': float(score), 'skill_score': float(skill_score),
+                         'text_score': float(text_score), 'computed_at': computed_at}
+                        for rank, (neighbor, score, skill_score, text_score) in enumerate(neighbors, 1))
+
+        chunk_ids = [int(similarity.job_ids[p]) for p in chunk]
+        db.session.execute(delete(JobNeighbor).where(JobNeighbor.job_id.in_(chunk_ids)))
+        for offset in range(0, len(rows), _INSERT_CHUNK):
+            db.session.execute(insert(JobNeighbor), rows[offset:offset + _INSERT_CHUNK])
+        db.session.commit()
+        written += len(rows)
+        log(f"Refreshed jobs {start + 1}-{start + len(chunk)} of {len(targets)}, {written} neighbors written")
+    db.session.add(JobNeighborRun(started_at=computed_at, finished_at=datetime.utcnow(), full=since is None,
+                                  refreshed=len(targets), neighbors=written))
+    db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    return {'jobs': len(similarity.job_ids), 'refreshed': len(targets), 'neighbors': written, 'seconds': elapsed}
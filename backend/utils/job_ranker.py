@@ -0,0 +1,113 @@
+import os
+import threading
+from flask import current_app
+from models.db import db
+from models.job import Job
+from models.resume import Resume
+from utils.skills import skill_ids
+from utils.skill_index import skill_index
+from utils.skill_store import top_jobs_for_user
+from utils.job_model import MATCHER_AVAILABLE, job_document
+
+if MATCHER_AVAILABLE:
+    from job_matcher import JobMatcher
+
+_model_lock = threading.Lock()
+_model = None
+_model_version = None  # (path, mtime) the cached model was loaded from
+
+
+def get_job_model():
+    """
+    The persisted TF-IDF job model, loaded once per process and reloaded
+    when build_job_model.py writes a new version. None if there is none.
+    """
+    global _model, _model_version
+    if not MATCHER_AVAILABLE:
+        return None
+
+    model_dir = current_app.config['JOB_MODEL_DIR']
+    try:
+        version = (model_dir, os.path.getmtime(os.path.join(model_dir, JobMatcher.STATE_FILE)))
+    except OSError:
+        return None
+
+    with _model_lock:
+        if version != _model_version:
+            try:
+                _model = JobMatcher.load(model_dir)
+                _model_version = version
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error loading job model: {str(e)}")
+                return None
+        return _model
+
+
+def user_profile_text(user, user_skills):
+    """Free text describing a user, compared against job descriptions"""
+    parts = [user.headline, user.profession, user.summary]
+    resume = Resume.query.filter_by(user_id=user.id).order_by(Resume.uploaded_at.desc()).first()
+    if resume:
+        parts.append(resume.summary)
+    parts.extend(user_skills)
+    return ' '.join(part for part in parts if part)
+
+
+def _skill_candidates(user_id, user_skills, limit):
+    """Stage one: cheap skill-overlap scoring over the whole catalog"""
+    if current_app.config.get('RECOMMENDATION_SOURCE') == 'sql':
+        user_skill_ids = frozenset(skill_ids(user_skills))
+        return [(job_id, match_score, user_skill_ids)
+                for job_id, match_score in top_jobs_for_user(user_id, limit=limit)]
+    return skill_index.top_matches(user_skills, limit=limit)
+
+
+def _text_scores(model, profile_text, job_ids):
+    """Stage two: cosine similarity against precomputed job vectors"""
+    scores = dict(zip(job_ids, model.score_jobs(profile_text, job_ids).tolist()))
+
+    # Jobs posted since the model was last updated are vectorized on the fly
+    missing = [job_id for job_id in job_ids if not model.has_job(job_id)]
+    if missing:
+        rows = (db.session.query(Job.id, Job.title, Job.description, Job.requirements)
+                .filter(Job.id.in_(missing)).all())
+        texts = [job_document(title, description, requirements) for _, title, description, requirements in rows]
+        scores.update(zip([row[0] for row in rows], model.score_texts(profile_text, texts).tolist()))
+    return scores
+
+
+def rank_jobs(user, user_skills, limit=10):
+    """
+    Two-stage job ranking for a user.
+
+    The top RANKER_CANDIDATES jobs by skill overlap are reranked with a blend
+    of that skill score and the text similarity between the user's profile
+    and each job, weighted by RANKER_SKILL_WEIGHT and RANKER_TEXT_WEIGHT.
+    Without a job model the skill ranking is returned unchanged.
+
+    Returns:
+        list: (job_id, match_score, matched_skills, skill_score, text_score)
+            tuples, best first
+    """
+    config = current_app.config
+    text_weight = config['RANKER_TEXT_WEIGHT']
+    model = get_job_model() if text_weight > 0 else None
+    num_candidates = max(limit, config['RANKER_CANDIDATES']) if model else limit
+
+    candidates = _skill_candidates(user.id, user_skills, num_candidates)
+    if not model or not candidates:
+        return [(job_id, score, matched, score, None) for job_id, score, matched in candidates]
+
+    skill_weight = config['RANKER_SKILL_WEIGHT']
+    total_weight = (skill_weight + text_weight) or 1
+    text_scores = _text_scores(model, user_profile_text(user, user_skills),
+                               [job_id for job_id, _, _ in candidates])
+
+    ranked = []
+    for job_id, skill_score, matched in candidates:
+        text_score = text_scores.get(job_id, 0.0)
+        score = (skill_weight * skill_score + text_weight * text_score) / total_weight
+        ranked.append((job_id, score, matched, skill_score, text_score))
+
+    ranked.sort(key=lambda r: (-r[1], r[0]))
+    return ranked[:limit]
@@ -0,0 +1,137 @@
+import re
+from sqlalchemy import event, func, literal, literal_column, or_, table, column, text, tuple_
+from models.db import db
+from models.job import Job
+from utils.pagination import decode_cursor, encode_cursor, page_size
+
+# Full-text search over title, company, description and required skills.
+# SQLite keeps a separate FTS5 table in sync through triggers; Postgres keeps
+# a generated tsvector column with a GIN index. Either way every writer of the
+# jobs table (routes, seed scripts, bulk loads) updates the index.
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+_SQLITE_SKILLS = ("CASE WHEN json_valid({row}.requirements) "
+                  "THEN coalesce(json_extract({row}.requirements, '$.skills'), '') ELSE '' END")
+
+_SQLITE_INSERT = ("INSERT INTO jobs_fts(rowid, title, company, description, skills) "
+                  "VALUES (new.id, new.title, new.company, new.description, " + _SQLITE_SKILLS.format(row='new') + ");")
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts "
+    "USING fts5(title, company, description, skills, tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN " + _SQLITE_INSERT + " END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, description, requirements "
+    "ON jobs BEGIN DELETE FROM jobs_fts WHERE rowid = old.id; " + _SQLITE_INSERT + " END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN "
+    "DELETE FROM jobs_fts WHERE rowid = old.id; END",
+    # Index rows written before the triggers existed
+    "INSERT INTO jobs_fts(rowid, title, company, description, skills) "
+    "SELECT id, title, company, description, " + _SQLITE_SKILLS.format(row='jobs') + " FROM jobs "
+    "WHERE id NOT IN (SELECT rowid FROM jobs_fts)",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(requirements, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+
+def ensure_search_index(connection):
+    """Create the search index for the connection's database if it is missing"""
+    statements = {'sqlite': SQLITE_DDL, 'postgresql': POSTGRES_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+@event.listens_for(Job.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    ensure_search_index(connection)
+
+
+@event.listens_for(Job.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text("DROP TABLE IF EXISTS jobs_fts"))
+
+
+def _fts5_query(q):
+    """Turn free text into a safe FTS5 query: all terms, last one as a prefix"""
+    terms = re.findall(r'\w+', q.lower())
+    if not terms:
+        return None
+    return ' '.join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+
+
+def _search_columns(q, dialect):
+    """(filter, score, title highlight, description snippet) expressions for a dialect"""
+    if dialect == 'sqlite':
+        match = _fts5_query(q)
+        if match is None:
+            return None
+        fts = literal_column('jobs_fts')
+        return (
+            fts.op('MATCH')(match),
+            # bm25 is lower-is-better; weights follow the FTS column order
+            -func.bm25(fts, 10.0, 5.0, 1.0, 5.0),
+            func.highlight(fts, 0, HIGHLIGHT_START, HIGHLIGHT_END),
+            func.snippet(fts, 2, HIGHLIGHT_START, HIGHLIGHT_END, '...', 24),
+        )
+
+    if dialect == 'postgresql':
+        tsquery = func.websearch_to_tsquery('english', q)
+        vector = literal_column('jobs.search_vector')
+        options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}'
+        return (
+            vector.op('@@')(tsquery),
+            func.ts_rank_cd(vector, tsquery),
+            func.ts_headline('english', Job.title, tsquery, options + ', HighlightAll=true'),
+            func.ts_headline('english', Job.description, tsquery, options + ', MaxFragments=1, MaxWords=24, MinWords=8'),
+        )
+
+    # No full-text support: unranked substring match
+    pattern = f'%{q}%'
+    return (
+        or_(Job.title.ilike(pattern), Job.company.ilike(pattern), Job.description.ilike(pattern)),
+        literal(0.0),
+        Job.title,
+        Job.description,
+    )
+
+
+def search_jobs(query, q, args):
+    """
+    Rank the jobs of a Job query against free text, best match first.
+
+    Pages are keyset-paginated on (score, id) like the other list endpoints.
+
+    Returns:
+        tuple: ([(job, score, title_highlight, description_snippet)], next_cursor or None)
+    """
+    columns = _search_columns(q, db.engine.dialect.name)
+    if columns is None:
+        return [], None
+    match, score, title_highlight, snippet = columns
+
+    if db.engine.dialect.name == 'sqlite':
+        query = query.join(table('jobs_fts', column('rowid')), literal_column('jobs_fts.rowid') == Job.id)
+    query = query.filter(match)
+
+    cursor = args.get('cursor')
+    if cursor:
+        query = query.filter(tuple_(score, Job.id) < tuple(decode_cursor(cursor, (float, int))))
+
+    limit = page_size(args)
+    rows = (query.add_columns(score.label('search_score'), title_highlight, snippet)
+            .order_by(score.desc(), Job.id.desc())
+            .limit(limit + 1)
+            .all())
+    if len(rows) <= limit:
+        return [tuple(row) for row in rows], None
+    rows = rows[:limit]
+    return [tuple(row) for row in rows], encode_cursor([rows[-1][1], rows[-1][0].id])
@@ -0,0 +1,91 @@
+from datetime import datetime
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+from models.db import db
+from models.job import Job
+from models.job_list_version import JobListVersion
+
+# A counter of writes to the jobs table, kept in the one row of
+# job_list_version and bumped in the same transaction as every write: ORM
+# flushes touching a Job, and INSERT/UPDATE/DELETE statements on jobs run
+# through a session (bulk ingest, deduplication, backfills). Reading it is a
+# primary key lookup, so the job listing's conditional GETs and the
+# in-process skill index can tell cheaply whether any process changed a job,
+# deletions included.
+
+_ROW_ID = 1
+
+# session.info key of the open transaction's bumps: (version before the
+# first one, version after the last one, whether all came from flushes)
+_BUMPS_KEY = 'job_version_bumps'
+
+_commit_listeners = []
+
+
+def current_job_version():
+    """
+    The jobs table's write counter
+
+    Returns:
+        tuple: (version, changed_at); (0, None) before any write
+    """
+    row = db.session.query(JobListVersion.version, JobListVersion.changed_at).filter_by(id=_ROW_ID).first()
+    return (row.version, row.changed_at) if row else (0, None)
+
+
+def on_job_commit(listener):
+    """
+    Register listener(session, before, after, flushed) to be called after a
+    transaction that bumped the version commits; flushed is False if some of
+    its writes were statements rather than ORM flushes
+    """
+    _commit_listeners.append(listener)
+    return listener
+
+
+def _bump(session, flushed):
+    table = JobListVersion.__table__
+    connection = session.connection()
+    now = datetime.utcnow()
+    version = connection.execute(update(table).where(table.c.id == _ROW_ID)
+                                 .values(version=table.c.version + 1, changed_at=now)
+                                 .returning(table.c.version)).scalar()
+    if version is None:
+        version = 1
+        connection.execute(insert(table).values(id=_ROW_ID, version=version, changed_at=now))
+    before, _, all_flushed = session.info.get(_BUMPS_KEY, (version - 1, None, True))
+    session.info[_BUMPS_KEY] = (before, version, all_flushed and flushed)
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_on_flush(session, flush_context):
+    if any(isinstance(obj, Job) for obj in session.new) or \
+       any(isinstance(obj, Job) for obj in session.deleted) or \
+       any(isinstance(obj, Job) and session.is_modified(obj, include_collections=False) for obj in session.dirty):
+        _bump(session, flushed=True)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_on_statement(orm_execute_state):
+    statement = orm_execute_state.statement
+    if (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete) and \
+       getattr(statement, 'table', None) is not None and statement.table.name == Job.__tablename__:
+        _bump(orm_execute_state.session, flushed=False)
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_commit(session):
+    bumps = session.info.pop(_BUMPS_KEY, None)
+    if bumps:
+        for listener in _commit_listeners:
+            listener(session, *bumps)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_bumps(session, previous_transaction):
+    session.info.pop(_BUMPS_KEY, None)
+
+
+@event.listens_for(JobListVersion.__table__, 'after_create')
+def _create_row(target, connection, **kw):
+    connection.execute(insert(target).values(id=_ROW_ID, version=0))
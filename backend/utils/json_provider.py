@@ -0,0 +1,42 @@
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional; without it responses use Flask's json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes responses with orjson when installed.
+
+    Output matches the default provider: keys are sorted when sort_keys is
+    set, and types orjson does not know (Decimal, ...) are converted by the
+    default provider's hook. Dates are passed through to that hook as well,
+    so they keep Flask's HTTP date format instead of orjson's RFC 3339.
+    """
+
+    def _orjson_options(self, pretty=False):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if not ORJSON_AVAILABLE or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode()
+
+    def response(self, *args, **kwargs):
+        if not ORJSON_AVAILABLE:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._orjson_options(pretty)) + b'\n',
+            mimetype=self.mimetype,
+        )
@@ -0,0 +1,152 @@
+import json
+import time
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, insert
+from models.db import db
+from models.job import Job
+from models.portfolio import Portfolio
+from models.resume import Resume
+from models.user_job_match import UserJobMatch
+from utils.skills import parse_job_skills, parse_user_skills, skill_ids, skill_registry
+from utils.skill_index import DEFAULT_MATCH_SCORE
+
+
+def load_job_matrix():
+    """
+    Build the binary job x skill matrix for all active jobs.
+
+    Returns:
+        tuple: (job_ids array, csr matrix, vocabulary dict skill id -> column)
+    """
+    vocabulary = {}
+    job_ids = []
+    indptr = [0]
+    indices = []
+
+    rows = db.session.query(Job.id, Job.requirements).filter_by(active=True).order_by(Job.id)
+    for job_id, requirements in rows:
+        columns = {vocabulary.setdefault(skill_id, len(vocabulary))
+                   for skill_id in skill_ids(parse_job_skills(requirements))}
+        job_ids.append(job_id)
+        indices.extend(sorted(columns))
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices, indptr),
+        shape=(len(job_ids), len(vocabulary))
+    )
+    return np.array(job_ids, dtype=np.int64), matrix, vocabulary
+
+
+def load_user_skill_sets(user_ids=None):
+    """
+    Get canonical skill ids per user, from Portfolio first and the Resume otherwise.
+
+    Mirrors utils.skills.load_user_skills but reads every row in two queries.
+    """
+    portfolio_query = db.session.query(Portfolio.user_id, Portfolio.skills)
+    first_resumes = db.session.query(func.min(Resume.id)).group_by(Resume.user_id)
+    resume_query = db.session.query(Resume.user_id, Resume.skills).filter(Resume.id.in_(first_resumes))
+    if user_ids is not None:
+        portfolio_query = portfolio_query.filter(Portfolio.user_id.in_(user_ids))
+        resume_query = resume_query.filter(Resume.user_id.in_(user_ids))
+
+    user_skills = {}
+    for user_id, raw in resume_query:
+        skills = set(skill_ids(parse_user_skills(raw)))
+        if skills:
+            user_skills[user_id] = skills
+    for user_id, raw in portfolio_query.order_by(Portfolio.id.desc()):
+        skills = set(skill_ids(parse_user_skills(raw)))
+        if skills:
+            user_skills[user_id] = skills
+    return user_skills
+
+
+def _user_matrix(skill_sets, vocabulary):
+    indptr = [0]
+    indices = []
+    for skills in skill_sets:
+        indices.extend(sorted(vocabulary[s] for s in skills if s in vocabulary))
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices, indptr),
+        shape=(len(skill_sets), len(vocabulary))
+    )
+
+
+def _top_n(scores, job_positions, top_n):
+    """Positions of the top_n scores, highest first and lowest job id on ties"""
+    if len(scores) > top_n:
+        keep = np.argpartition(-scores, top_n - 1)[:top_n]
+        # Widen the cut so jobs tied with the last kept score are still considered
+        threshold = scores[keep].min()
+        keep = np.flatnonzero(scores >= threshold)
+        scores, job_positions = scores[keep], job_positions[keep]
+    order = np.lexsort((job_positions, -scores))[:top_n]
+    return scores[order], job_positions[order]
+
+
+def recompute_matches(top_n=10, chunk_size=500, user_ids=None, log=print):
+    """
+    Score every user against every active job and store each user's top matches.
+
+    The score is the fraction of a job's required skills the user has, i.e.
+    the same value POST /api/jobs/match computes, obtained for a whole chunk of
+    users with a single sparse product (users x skills) . (skills x jobs).
+    Each processed user's rows in user_job_matches are replaced by their
+    fresh top_n matches.
+
+    Returns:
+        dict: counts and timings of the run
+    """
+    started = time.perf_counter()
+    job_ids, job_matrix, vocabulary = load_job_matrix()
+    skill_names = skill_registry.names(sorted(vocabulary, key=vocabulary.get))
+    job_skill_counts = np.diff(job_matrix.indptr).astype(np.float64)
+    job_columns = np.split(job_matrix.indices, job_matrix.indptr[1:-1])
+    unskilled = np.flatnonzero(job_skill_counts == 0)[:top_n]
+    job_matrix_t = job_matrix.T.tocsc()
+
+    user_skills = load_user_skill_sets(user_ids)
+    users = sorted(user_skills)
+    log(f"Loaded {len(job_ids)} jobs, {len(vocabulary)} skills and {len(users)} users "
+        f"in {time.perf_counter() - started:.2f}s")
+
+    written = 0
+    for start in range(0, len(users), chunk_size):
+        chunk = users[start:start + chunk_size]
+        user_matrix = _user_matrix([user_skills[uid] for uid in chunk], vocabulary)
+        overlap = (user_matrix @ job_matrix_t).tocsr()
+
+        rows = []
+        for i, user_id in enumerate(chunk):
+            row = slice(overlap.indptr[i], overlap.indptr[i + 1])
+            positions = overlap.indices[row]
+            scores = overlap.data[row] / job_skill_counts[positions]
+            positions = np.concatenate([positions, unskilled])
+            scores = np.concatenate([scores, np.full(len(unskilled), DEFAULT_MATCH_SCORE)])
+            if not len(positions):
+                continue
+
+            user_columns = {vocabulary[s] for s in user_skills[user_id] if s in vocabulary}
+            for score, position in zip(*_top_n(scores, positions, top_n)):
+                columns = job_columns[position]
+                rows.append({
+                    'user_id': user_id,
+                    'job_id': int(job_ids[position]),
+                    'match_score': float(score),
+                    'matched_skills': json.dumps([skill_names[c] for c in columns if c in user_columns]),
+                    'missing_skills': json.dumps([skill_names[c] for c in columns if c not in user_columns])
+                })
+
+        UserJobMatch.query.filter(UserJobMatch.user_id.in_(chunk)).delete(synchronize_session=False)
+        if rows:
+            db.session.execute(insert(UserJobMatch), rows)
+        db.session.commit()
+        written += len(rows)
+        log(f"Scored users {start + 1}-{start + len(chunk)} of {len(users)}, {written} matches written")
+
+    elapsed = time.perf_counter() - started
+    return {'users': len(users), 'jobs': len(job_ids), 'matches': written, 'seconds': elapsed}
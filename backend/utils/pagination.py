@@ -0,0 +1,83 @@
+import base64
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe cursor for the sort key of the last row of a page"""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, types):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor (str): Cursor from a previous response
+        types (tuple): Expected type of each sort key value (datetime, float or int);
+            any value may also be None for a NULL sort key
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise InvalidCursor('Malformed cursor')
+        return [None if v is None else datetime.fromisoformat(v) if t is datetime else t(v)
+                for v, t in zip(values, types)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+
+
+def page_size(args):
+    """The requested ?limit=, clamped to the server's maximum page size"""
+    default = current_app.config['DEFAULT_PAGE_SIZE']
+    try:
+        limit = int(args.get('limit', default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+
+
+def _after(columns, values):
+    """
+    Rows after the cursor values in descending order with NULLs last.
+
+    A row comparison like (col1, col2) < cursor is NULL when a key is, so
+    NULL keys are spelled out: they sort after every value, and among
+    themselves by the remaining columns.
+    """
+    column, value = columns[0], values[0]
+    if len(columns) == 1:
+        return column < value
+    rest = _after(columns[1:], values[1:])
+    if value is None:
+        return and_(column.is_(None), rest)
+    return or_(column < value, column.is_(None), and_(column == value, rest))
+
+
+def keyset_page(query, columns, args, types):
+    """
+    Fetch one page of a query ordered by columns (descending, NULLs last)
+    using keyset pagination, i.e. WHERE (col1, col2) < cursor instead of
+    OFFSET. The last column must be unique and not null.
+
+    Returns:
+        tuple: (rows, next_cursor or None)
+    """
+    limit = page_size(args)
+    cursor = args.get('cursor')
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, types)))
+
+    rows = query.order_by(*[column.desc().nulls_last() for column in columns]).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
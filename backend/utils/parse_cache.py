@@ -0,0 +1,201 @@
+import hashlib
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from models.db import db
+from models.parse_cache_entry import ParseCacheEntry
+from utils.parse_queue import PARSER_AVAILABLE, extraction_limits, extractor_config
+from utils.resume_analyzer import ANALYZER_VERSION
+
+if PARSER_AVAILABLE:
+    from resume_parser import PARSER_VERSION
+    from nlp_registry import SPACY_AVAILABLE
+    from skill_extractor import load_skill_extractor
+
+# Parse and analysis results cached by content. Uploads are hashed (SHA-256)
+# while they are streamed to disk, and the hash is the cache key together
+# with the version of whatever produced the result: the parser, spaCy model
+# and profile, and skills taxonomy for parses, the analyzer for analyses. An
+# upgrade of any of them changes the version, so stale entries are never
+# hit again and age out through the LRU eviction, which keeps the table
+# under PARSE_CACHE_MAX_ENTRIES rows and PARSE_CACHE_MAX_BYTES of results.
+# The extraction backends and budgets are part of the parse version too;
+# parses cut short by time or memory depend on the load at the time and are
+# not cached.
+
+PARSE = 'parse'
+ANALYSIS = 'analysis'
+
+CHUNK_SIZE = 64 * 1024
+
+# Eviction trims the cache to this fraction of its bounds, so it does not run on every insert
+_EVICT_TO = 0.9
+
+_LOOKUP_CHUNK = 900
+
+# Truncations that depend on the load rather than on the file
+_TRANSIENT_TRUNCATIONS = ('time', 'memory', 'aborted')
+
+
+def save_upload(file_storage, file_path):
+    """
+    Stream an uploaded file to disk, hashing it on the way
+
+    Returns:
+        str: SHA-256 hex digest of the file
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'wb') as f:
+        for chunk in iter(lambda: file_storage.stream.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(file_path):
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_sha256(data):
+    """SHA-256 hex digest of a JSON-serializable value, independent of key order"""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def parse_version(model=None, profile=None, limits=None, extractors=None):
+    """
+    Cache version of parse results: parser, spaCy pipeline, taxonomy,
+    extraction backends and extraction budgets
+    """
+    if not PARSER_AVAILABLE:
+        return None
+    config = current_app.config
+    pipeline = f"{model or config['NLP_MODEL']}/{profile or config['NLP_PROFILE']}" if SPACY_AVAILABLE else 'no-nlp'
+    limits = limits or extraction_limits()[0]
+    extractors = extractors or extractor_config()
+    return (f"parser-{PARSER_VERSION}:{pipeline}:taxonomy-{load_skill_extractor().version}:"
+            f"extract-{extractors.get('pdf')}/{extractors.get('docx')}:"
+            f"limits-{limits.max_pages}/{limits.max_bytes}")
+
+
+def cacheable(parsed_data):
+    """Whether a parse result only depends on the file (and the parse version)"""
+    return parsed_data.get('truncated') not in _TRANSIENT_TRUNCATIONS
+
+
+def analysis_version():
+    """Cache version of ResumeAnalyzer results"""
+    return f"analyzer-{ANALYZER_VERSION}"
+
+
+def cache_get_many(kind, content_hashes, version):
+    """
+    Cached results of many inputs; hits are marked as used. The caller commits.
+
+    Returns:
+        dict: content hash -> result, for the hits only
+    """
+    content_hashes = list(dict.fromkeys(h for h in content_hashes if h))
+    if not content_hashes or not version:
+        return {}
+
+    found = {}
+    for start in range(0, len(content_hashes), _LOOKUP_CHUNK):
+        rows = db.session.execute(
+            select(ParseCacheEntry.id, ParseCacheEntry.content_hash, ParseCacheEntry.result)
+            .where(ParseCacheEntry.kind == kind, ParseCacheEntry.version == version,
+                   ParseCacheEntry.content_hash.in_(content_hashes[start:start + _LOOKUP_CHUNK])))
+        for entry_id, content_hash, result in rows:
+            found[content_hash] = (entry_id, json.loads(result))
+    if found:
+        db.session.execute(
+            update(ParseCacheEntry)
+            .where(ParseCacheEntry.id.in_([entry_id for entry_id, _ in found.values()]))
+            .values(last_used_at=datetime.utcnow(), hits=ParseCacheEntry.hits + 1)
+            .execution_options(synchronize_session=False))
+    return {content_hash: result for content_hash, (_, result) in found.items()}
+
+
+def cache_get(kind, content_hash, version):
+    """Cached result of one input, or None; the caller commits"""
+    return cache_get_many(kind, [content_hash], version).get(content_hash)
+
+
+def cache_put_many(kind, results, version):
+    """
+    Cache many results, replacing any entries under the same keys; the caller commits
+
+    Args:
+        kind (str): PARSE or ANALYSIS
+        results (dict): content hash -> JSON-serializable result
+        version (str): Version of the producer of the results
+    """
+    if not version:
+        return
+    now = datetime.utcnow()
+    for content_hash, result in results.items():
+        if not content_hash:
+            continue
+        payload = json.dumps(result)
+        values = {'result': payload, 'size': len(payload.encode('utf-8')), 'last_used_at': now}
+        key = (ParseCacheEntry.kind == kind, ParseCacheEntry.content_hash == content_hash,
+               ParseCacheEntry.version == version)
+
+        updated = db.session.execute(
+            update(ParseCacheEntry).where(*key).values(**values)
+            .execution_options(synchronize_session=False))
+        if updated.rowcount:
+            continue
+        try:
+            # Another process may cache the same content in between
+            with db.session.begin_nested():
+                db.session.add(ParseCacheEntry(kind=kind, content_hash=content_hash, version=version,
+                                               hits=0, created_at=now, **values))
+        except IntegrityError:
+            db.session.execute(
+                update(ParseCacheEntry).where(*key).values(**values)
+                .execution_options(synchronize_session=False))
+    evict()
+
+
+def cache_put(kind, content_hash, version, result):
+    """Cache one result; the caller commits"""
+    cache_put_many(kind, {content_hash: result}, version)
+
+
+def evict():
+    """
+    Drop least recently used entries once the cache exceeds its bounds
+
+    Returns:
+        int: Entries deleted
+    """
+    config = current_app.config
+    max_entries = config['PARSE_CACHE_MAX_ENTRIES']
+    max_bytes = config['PARSE_CACHE_MAX_BYTES']
+    entries, total = db.session.execute(
+        select(func.count(ParseCacheEntry.id), func.coalesce(func.sum(ParseCacheEntry.size), 0))).one()
+    if entries <= max_entries and total <= max_bytes:
+        return 0
+
+    keep_entries, keep_bytes = int(max_entries * _EVICT_TO), int(max_bytes * _EVICT_TO)
+    doomed = []
+    rows = db.session.execute(
+        select(ParseCacheEntry.id, ParseCacheEntry.size)
+        .order_by(ParseCacheEntry.last_used_at, ParseCacheEntry.id)).all()
+    for entry_id, size in rows:
+        if entries <= keep_entries and total <= keep_bytes:
+            break
+        doomed.append(entry_id)
+        entries -= 1
+        total -= size
+    for start in range(0, len(doomed), _LOOKUP_CHUNK):
+        db.session.execute(delete(ParseCacheEntry).where(ParseCacheEntry.id.in_(doomed[start:start + _LOOKUP_CHUNK])))
+    return len(doomed)
@@ -0,0 +1,297 @@
+import json
+import os
+import socket
+import sys
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert, or_, select, update
+from models.db import db
+from models.parse_job import ParseJob
+from models.resume import Resume
+from utils.skills import load_user_skills
+from utils.skill_store import sync_user_skills
+from utils.parsed_resume import encode_parsed, resume_fields
+
+# Try to import the resume parser, but don't fail if ML dependencies are missing
+try:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'ml', 'scripts'))
+    from resume_parser import PARSER_VERSION, ResumeParser
+    from nlp_registry import nlp_registry
+    from text_extraction import ExtractionLimits, configure_extractors
+    PARSER_AVAILABLE = True
+except ImportError:
+    PARSER_AVAILABLE = False
+
+# Resume parsing off the request path. Uploads add a row to parse_jobs, which
+# is the queue: parse_worker.py claims rows with a compare-and-set UPDATE that
+# makes them invisible to other workers for RESUME_PARSE_VISIBILITY_TIMEOUT
+# seconds, parses the files in a process pool and writes the results back to
+# the resume. A worker that dies leaves its jobs to reappear when the lease
+# expires; failures are retried with exponential backoff up to
+# RESUME_PARSE_MAX_ATTEMPTS attempts. Text is extracted in a sandboxed child
+# of the parser process within the RESUME_PARSE_MAX_* budgets.
+
+# Delay before the first retry of a failed parse, doubled on each attempt
+RETRY_BACKOFF = 30
+
+# Longest error message stored on a job
+_MAX_ERROR = 2000
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_parse(resume):
+    """Queue a (flushed) resume for parsing; the caller commits"""
+    job = ParseJob(resume_id=resume.id, status=ParseJob.QUEUED, visible_at=datetime.utcnow())
+    db.session.add(job)
+    return job
+
+
+def _stale_resumes():
+    """Conditions on Resume: parsed by an older parser version (or never), with no parse queued or running"""
+    pending = (select(ParseJob.id)
+               .where(ParseJob.resume_id == Resume.id,
+                      ParseJob.status.in_((ParseJob.QUEUED, ParseJob.RUNNING)))
+               .exists())
+    return or_(Resume.parser_version.is_(None), Resume.parser_version < PARSER_VERSION), ~pending
+
+
+def count_stale():
+    """Resumes enqueue_stale() would queue"""
+    if not PARSER_AVAILABLE:
+        raise RuntimeError('Resume parser not available - ML dependencies may be missing')
+    return db.session.query(Resume.id).filter(*_stale_resumes()).count()
+
+
+def enqueue_stale(limit=None, batch_size=1000):
+    """
+    Queue a parse of every resume last parsed by an older parser version (or
+    never parsed) that has no parse queued or running
+
+    Args:
+        limit (int): Most resumes to queue
+        batch_size (int): Jobs inserted per commit
+
+    Returns:
+        int: Jobs queued
+    """
+    if not PARSER_AVAILABLE:
+        raise RuntimeError('Resume parser not available - ML dependencies may be missing')
+
+    stale = _stale_resumes()
+    queued, last_id = 0, 0
+    while limit is None or queued < limit:
+        size = batch_size if limit is None else min(batch_size, limit - queued)
+        resume_ids = db.session.execute(
+            select(Resume.id).where(Resume.id > last_id, *stale).order_by(Resume.id).limit(size)).scalars().all()
+        if not resume_ids:
+            break
+        now = datetime.utcnow()
+        db.session.execute(insert(ParseJob), [
+            {'resume_id': resume_id, 'status': ParseJob.QUEUED, 'attempts': 0, 'visible_at': now, 'created_at': now}
+            for resume_id in resume_ids])
+        db.session.commit()
+        queued += len(resume_ids)
+        last_id = resume_ids[-1]
+    return queued
+
+
+def _expire_exhausted(now):
+    """Fail running jobs whose lease ran out on their last attempt"""
+    db.session.execute(
+        update(ParseJob)
+        .where(ParseJob.status == ParseJob.RUNNING, ParseJob.visible_at <= now,
+               ParseJob.attempts >= current_app.config['RESUME_PARSE_MAX_ATTEMPTS'])
+        .values(status=ParseJob.FAILED, finished_at=now, worker=None,
+                error='Visibility timeout expired on the last attempt')
+        .execution_options(synchronize_session=False))
+
+
+def claim_jobs(limit, worker):
+    """
+    Lease up to limit visible jobs to a worker, oldest first.
+
+    A job is visible when it is queued and past its retry backoff, or running
+    with an expired lease (its worker died or stalled). Each claim is an
+    UPDATE conditioned on the job still being visible, so concurrent workers
+    never get the same job.
+
+    Returns:
+        list: (job id, resume file path, resume content hash) of the claimed jobs
+    """
+    now = datetime.utcnow()
+    lease = now + timedelta(seconds=current_app.config['RESUME_PARSE_VISIBILITY_TIMEOUT'])
+    _expire_exhausted(now)
+
+    visible = (ParseJob.status.in_((ParseJob.QUEUED, ParseJob.RUNNING)), ParseJob.visible_at <= now)
+    candidates = [job_id for (job_id,) in db.session.query(ParseJob.id).filter(*visible)
+                  .order_by(ParseJob.id).limit(limit * 2)]
+    claimed = []
+    for job_id in candidates:
+        if len(claimed) >= limit:
+            break
+        result = db.session.execute(
+            update(ParseJob)
+            .where(ParseJob.id == job_id, *visible)
+            .values(status=ParseJob.RUNNING, visible_at=lease, worker=worker,
+                    attempts=ParseJob.attempts + 1, started_at=now)
+            .execution_options(synchronize_session=False))
+        if result.rowcount == 1:
+            claimed.append(job_id)
+    db.session.commit()
+
+    if not claimed:
+        return []
+    return (db.session.query(ParseJob.id, Resume.file_path, Resume.content_hash)
+            .join(Resume, Resume.id == ParseJob.resume_id)
+            .filter(ParseJob.id.in_(claimed))
+            .order_by(ParseJob.id)
+            .all())
+
+
+def extend_leases(job_ids, worker):
+    """Push back the visibility timeout of jobs a worker is still parsing"""
+    if not job_ids:
+        return
+    lease = datetime.utcnow() + timedelta(seconds=current_app.config['RESUME_PARSE_VISIBILITY_TIMEOUT'])
+    db.session.execute(
+        update(ParseJob)
+        .where(ParseJob.id.in_(job_ids), ParseJob.worker == worker, ParseJob.status == ParseJob.RUNNING)
+        .values(visible_at=lease)
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+
+
+def _leased_job(job_id, worker):
+    job = db.session.get(ParseJob, job_id)
+    # A job whose lease expired may have been claimed by another worker since
+    if not job or job.status != ParseJob.RUNNING or job.worker != worker:
+        return None
+    return job
+
+
+def store_parse(resume, parsed_data):
+    """
+    Write a parse result to a resume (the full result, the fields derived from
+    it and its skills) and to its user's skills; the caller commits
+    """
+    skills = parsed_data.get('skills', [])
+    resume.parsed_data = encode_parsed(parsed_data)
+    resume.skills = json.dumps(skills) if skills else None
+    resume.parse_truncated = bool(parsed_data.get('truncated'))
+    resume.parser_version = parsed_data.get('parser_version')
+    for column, value in resume_fields(parsed_data).items():
+        setattr(resume, column, value)
+    db.session.flush()
+    # Keep the normalized user_skills table in step with the user's skills
+    sync_user_skills(resume.user_id, load_user_skills(resume.user_id))
+
+
+def complete_job(job_id, worker, parsed_data):
+    """
+    Store a parse result on the job's resume and mark the job done
+
+    Returns:
+        bool: False if the worker no longer holds the job's lease
+    """
+    job = _leased_job(job_id, worker)
+    if not job:
+        db.session.rollback()
+        return False
+
+    store_parse(db.session.get(Resume, job.resume_id), parsed_data)
+
+    job.status = ParseJob.DONE
+    job.finished_at = datetime.utcnow()
+    job.worker = None
+    job.error = None
+    db.session.commit()
+    return True
+
+
+def fail_job(job_id, worker, error):
+    """
+    Record a failed attempt: requeue the job after a backoff, or mark it
+    failed once it has used up its attempts
+
+    Returns:
+        bool: False if the worker no longer holds the job's lease
+    """
+    job = _leased_job(job_id, worker)
+    if not job:
+        db.session.rollback()
+        return False
+
+    now = datetime.utcnow()
+    job.error = str(error)[:_MAX_ERROR]
+    job.worker = None
+    if job.attempts >= current_app.config['RESUME_PARSE_MAX_ATTEMPTS']:
+        job.status = ParseJob.FAILED
+        job.finished_at = now
+    else:
+        job.status = ParseJob.QUEUED
+        job.visible_at = now + timedelta(seconds=RETRY_BACKOFF * 2 ** (job.attempts - 1))
+    db.session.commit()
+    return True
+
+
+def extraction_limits():
+    """
+    Text extraction budgets from the app config
+
+    Returns:
+        tuple: (ExtractionLimits, bytes of memory of the sandboxed extraction)
+    """
+    if not PARSER_AVAILABLE:
+        return None, None
+    config = current_app.config
+    limits = ExtractionLimits(config['RESUME_PARSE_MAX_PAGES'], config['RESUME_PARSE_MAX_BYTES'],
+                              config['RESUME_PARSE_MAX_SECONDS'])
+    return limits, config['RESUME_PARSE_MAX_MEMORY']
+
+
+def extractor_config():
+    """PDF and DOCX extraction backends from the app config, as configure_extractors() arguments"""
+    return {'pdf': current_app.config['PDF_EXTRACTOR'], 'docx': current_app.config['DOCX_EXTRACTOR']}
+
+
+def init_parser_process(model=None, profile=None, nice=0, extractors=None):
+    """
+    Process pool initializer: pick the spaCy pipeline and the text extraction
+    backends, and lower the process priority
+    """
+    if nice and hasattr(os, 'nice'):
+        os.nice(nice)
+    if PARSER_AVAILABLE:
+        nlp_registry.configure(model, profile)
+        configure_extractors(**(extractors or {}))
+
+
+def parse_resume_file(file_path, limits=None, max_memory=None, content_hash=None):
+    """
+    Extract text and entities from a resume file; runs in the worker's
+    parser processes, outside any app context
+
+    Args:
+        file_path (str): Resume file
+        limits (ExtractionLimits): Text extraction budgets (see extraction_limits())
+        max_memory (int): Bytes of memory of the sandboxed extraction
+        content_hash (str): SHA-256 of the file when it was uploaded; a file
+            whose content differs once it has been parsed is rejected, so its
+            result is neither stored nor cached under that hash
+
+    Returns:
+        dict: ResumeParser result
+    """
+    if not PARSER_AVAILABLE:
+        raise RuntimeError('Resume parser not available - ML dependencies may be missing')
+
+    # Imported here: utils.parse_cache imports this module
+    from utils.parse_cache import file_sha256
+
+    parsed = ResumeParser().parse_file(file_path, limits, sandbox=True, max_memory=max_memory)
+    if content_hash and file_sha256(file_path) != content_hash:
+        raise ValueError(f'{file_path} changed since it was uploaded')
+    return parsed
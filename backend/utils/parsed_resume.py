@@ -0,0 +1,101 @@
+import base64
+import json
+import zlib
+from flask import current_app
+
+# orjson is optional; without it parse results are encoded with the json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Storage of the full parse result in Resume.parsed_data: the text, entities,
+# contact details, sections and skill mentions with offsets, and the parser
+# version that produced them. It is compact JSON; results larger than
+# RESUME_PARSED_COMPRESS_MIN bytes are zlib-compressed and base64-encoded
+# behind a format prefix, so the column stays text and rows written before
+# compression (plain JSON) still decode.
+
+# Prefix of compressed values; the digit is the storage format version
+_ZLIB_PREFIX = 'z1:'
+
+# Resume columns filled from the parse result, and their lengths
+_COLUMN_LENGTHS = {'full_name': 100, 'email': 120, 'phone': 20}
+
+
+def _dumps(data):
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def encode_parsed(parsed_data):
+    """
+    Serialize a parse result for Resume.parsed_data
+
+    Returns:
+        str: Compact JSON, or its zlib compression behind a prefix when it is
+            larger than RESUME_PARSED_COMPRESS_MIN bytes (0: never compress)
+    """
+    encoded = _dumps(parsed_data)
+    compress_min = current_app.config['RESUME_PARSED_COMPRESS_MIN']
+    if compress_min and len(encoded) > compress_min:
+        return _ZLIB_PREFIX + base64.b64encode(zlib.compress(encoded, 6)).decode('ascii')
+    return encoded.decode('utf-8')
+
+
+def decode_parsed(stored):
+    """Parse result of a Resume.parsed_data value, in any storage format; None if empty"""
+    if not stored:
+        return None
+    if stored.startswith(_ZLIB_PREFIX):
+        return json.loads(zlib.decompress(base64.b64decode(stored[len(_ZLIB_PREFIX):])))
+    return json.loads(stored)
+
+
+def _section_slice(text, section, header=False):
+    start = section.get('header_start', section['start']) if header else section['start']
+    return text[start:section['end']].strip() or None
+
+
+def section_text(parsed_data, name, header=False):
+    """
+    Text of the first section of a kind in a parse result, or None
+
+    Args:
+        header (bool): Start at the section's header line instead of its body
+    """
+    text = parsed_data.get('text') or ''
+    for section in parsed_data.get('sections', []):
+        if section['name'] == name:
+            return _section_slice(text, section, header)
+    return None
+
+
+def experience_sections(parsed_data):
+    """
+    Text of each experience section of a parse result, header line included
+
+    Parse results store only section offsets, so this slices them from the
+    text (as ResumeParser.extract_experience does).
+    """
+    text = parsed_data.get('text') or ''
+    return [_section_slice(text, section, header=True)
+            for section in parsed_data.get('sections', []) if section['name'] == 'experience']
+
+
+def resume_fields(parsed_data):
+    """
+    Resume columns derived from a parse result
+
+    Returns:
+        dict: full_name, email, phone and summary (None when not found)
+    """
+    contact = parsed_data.get('contact') or {}
+    fields = {'full_name': contact.get('name'), 'email': contact.get('email'), 'phone': contact.get('phone')}
+    for column, length in _COLUMN_LENGTHS.items():
+        if fields[column]:
+            fields[column] = fields[column][:length]
+    fields['summary'] = section_text(parsed_data, 'summary')
+    return fields
@@ -0,0 +1,78 @@
+from models.job import Job
+from utils.skills import parse_job_skills
+
+# Sparse job representations for list endpoints. ?fields=id,title,... or
+# ?view=summary select a subset of the job's fields; those are read with a
+# column-only query instead of loading full Job objects.
+
+JOB_COLUMNS = {
+    'id': Job.id,
+    'title': Job.title,
+    'company': Job.company,
+    'description': Job.description,
+    'location': Job.location,
+    'salary_range': Job.salary_range,
+    'salary_min': Job.salary_min,
+    'salary_max': Job.salary_max,
+    'city': Job.city,
+    'region': Job.region,
+    'country': Job.country,
+    'remote': Job.remote,
+    'posted_at': Job.posted_at,
+}
+
+# Computed fields and the columns they are derived from
+DERIVED_FIELDS = {
+    'skills': (Job.requirements,),
+}
+
+SUMMARY_FIELDS = ('id', 'title', 'company', 'location', 'salary_range', 'posted_at', 'skills')
+
+# How many of a job's required skills a summary lists
+SUMMARY_SKILLS = 5
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def requested_fields(args):
+    """
+    Fields asked for with ?view=summary or ?fields=a,b,c
+
+    Returns:
+        tuple: Field names (always including id), or None for the full representation
+    """
+    if args.get('view') == 'summary':
+        return SUMMARY_FIELDS
+
+    fields = [name.strip() for name in args.get('fields', '').split(',') if name.strip()]
+    if not fields:
+        return None
+
+    unknown = set(fields) - JOB_COLUMNS.keys() - DERIVED_FIELDS.keys()
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(dict.fromkeys(['id'] + fields))
+
+
+def projection_columns(fields, *extra):
+    """Columns to select for fields, plus any extra ones (e.g. sort keys)"""
+    columns = []
+    for name in fields:
+        columns.extend(DERIVED_FIELDS.get(name, (JOB_COLUMNS.get(name),)))
+    columns.extend(extra)
+    return list({column.key: column for column in columns}.values())
+
+
+def project_job(row, fields):
+    """Dict of the requested fields of a Job or of a row from a column-only query"""
+    data = {}
+    for name in fields:
+        if name == 'skills':
+            data[name] = parse_job_skills(row.requirements)[:SUMMARY_SKILLS]
+        elif name == 'posted_at':
+            data[name] = row.posted_at.isoformat() if row.posted_at else None
+        else:
+            data[name] = getattr(row, name)
+    return data
@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from models.db import db
+
+# Counting the SQL statements a block of code (typically one test-client
+# request) runs, to catch N+1 query regressions.
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Record the statements executed on an engine inside the block
+
+    Yields:
+        list: SQL of each statement, in execution order
+    """
+    engine = engine or db.engine
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', _record)
+
+
+@contextmanager
+def assert_max_queries(limit, engine=None):
+    """Fail with the offending statements if the block runs more than limit queries"""
+    with count_queries(engine) as statements:
+        yield statements
+    if len(statements) > limit:
+        raise AssertionError(f"{len(statements)} queries executed, expected at most {limit}:\n"
+                             + '\n'.join(statements))
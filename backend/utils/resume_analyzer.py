@@ -1,17 +1,80 @@
+import multiprocessing
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from utils.skills import skill_ids
+
+# Bumped whenever a change to the analyzer changes its output
+ANALYZER_VERSION = 3
+
+# Resumes per task sent to the analysis pool
+BATCH_CHUNK_SIZE = 256
+
+
+def _trie_pattern(phrases):
+    """
+    Regex matching any of the phrases, with alternatives factored by common
+    prefix ('de(?:livered|signed|veloped)') so re does not retry every phrase
+    at every position
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{pattern})?' if '' in node else pattern
+
+    return build(trie)
+
 
 class ResumeAnalyzer:
+    action_verbs = [
+        'led', 'managed', 'developed', 'created', 'implemented', 'designed', 'analyzed',
+        'improved', 'increased', 'reduced', 'saved', 'launched', 'initiated', 'coordinated',
+        'collaborated', 'mentored', 'supervised', 'achieved', 'generated', 'delivered'
+    ]
+    
+    weak_words = [
+        'responsible for', 'duties included', 'worked on', 'helped', 'assisted', 'tried',
+        'attempted', 'various', 'etc'
+    ]
+    
+    metrics_pattern = r'\d+%|\$\d+|\d+ years|\d+ team members'
+
     def __init__(self):
-        self.action_verbs = [
-            'led', 'managed', 'developed', 'created', 'implemented', 'designed', 'analyzed',
-            'improved', 'increased', 'reduced', 'saved', 'launched', 'initiated', 'coordinated',
-            'collaborated', 'mentored', 'supervised', 'achieved', 'generated', 'delivered'
-        ]
-        
-        self.weak_words = [
-            'responsible for', 'duties included', 'worked on', 'helped', 'assisted', 'tried',
-            'attempted', 'various', 'etc'
-        ]
+        # One pattern for the whole bullet check, run on the lowercased
+        # bullet: which group matched tells an action verb from a weak phrase
+        # or a metric. Words match on word boundaries ('led' does not match
+        # inside 'handled'), and the lookahead skips positions no phrase or
+        # metric can start at.
+        first_chars = ''.join(sorted({phrase[0] for phrase in self.action_verbs + self.weak_words}))
+        self._bullet_pattern = re.compile(
+            rf'(?=[{re.escape(first_chars)}\d$])'
+            rf'(?:\b(?:(?P<verb>{_trie_pattern(self.action_verbs)})|(?P<weak>{_trie_pattern(self.weak_words)}))\b'
+            rf'|(?P<metric>{self.metrics_pattern}))')
+
+    def _scan_bullet(self, point):
+        """(has an action verb, has a weak phrase, has a metric) in one pass over a bullet point"""
+        verb = weak = metric = False
+        for match in self._bullet_pattern.finditer(point.lower()):
+            kind = match.lastgroup
+            if kind == 'verb':
+                verb = True
+            elif kind == 'weak':
+                weak = True
+            else:
+                metric = True
+            if verb and weak and metric:
+                break
+        return verb, weak, metric
 
     def analyze(self, resume_data):
         """
@@ -54,10 +117,11 @@ class ResumeAnalyzer:
         if experience:
             score += 20 # Base points for having experience
             
-            # Check for action verbs
+            # Action verbs, weak phrases and metrics, in one pass over the bullet points
             action_verb_count = 0
             weak_word_count = 0
             bullet_points_count = 0
+            has_numbers = False
             
             for job in experience:
                 details = job.get('details', [])
@@ -68,11 +132,10 @@ class ResumeAnalyzer:
                 bullet_points_count += len(details)
                 
                 for point in details:
-                    point_lower = point.lower()
-                    if any(verb in point_lower for verb in self.action_verbs):
-                        action_verb_count += 1
-                    if any(word in point_lower for word in self.weak_words):
-                        weak_word_count += 1
+                    verb, weak, metric = self._scan_bullet(point)
+                    action_verb_count += verb
+                    weak_word_count += weak
+                    has_numbers = has_numbers or metric
             
             # Score based on action verbs
             if bullet_points_count > 0:
@@ -93,15 +156,6 @@ class ResumeAnalyzer:
                     feedback['suggestions'].append(f"Avoid passive phrases like 'responsible for'. Use active voice.")
             
             # Check for quantification (numbers)
-            has_numbers = False
-            for job in experience:
-                details = job.get('details', [])
-                if isinstance(details, str): details = [details]
-                for point in details:
-                    if re.search(r'\d+%|\$\d+|\d+ years|\d+ team members', point):
-                        has_numbers = True
-                        break
-            
             if has_numbers:
                 score += 15
                 feedback['strengths'].append("Good use of metrics/numbers to quantify achievements.")
@@ -118,6 +172,8 @@ class ResumeAnalyzer:
         # Handle if skills is a string (comma separated) or list
         if isinstance(skills, str):
             skills = [s.strip() for s in skills.split(',') if s.strip()]
+        # Distinct canonical skills: 'JS' and 'JavaScript' count once, 'HTML/CSS' twice
+        skills = skill_ids(skills, intern=False) if isinstance(skills, list) else []
         
         if skills:
             if len(skills) >= 5:
@@ -146,3 +202,60 @@ class ResumeAnalyzer:
             'score': score,
             'feedback': feedback
         }
+
+
+# Compiled once per process and shared by every request; analyze() keeps no state
+resume_analyzer = ResumeAnalyzer()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _analyze_one(resume_data):
+    """analyze() result of a resume, or {'error': ...} if it is malformed"""
+    try:
+        return resume_analyzer.analyze(resume_data)
+    except Exception as e:
+        return {'error': f'Failed to analyze resume: {type(e).__name__}'}
+
+
+def _analyze_chunk(resumes):
+    """Pool worker: analyze a chunk of resumes"""
+    return [_analyze_one(resume_data) for resume_data in resumes]
+
+
+def _analysis_pool(processes):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Created from a threaded web worker: forking it could copy a lock
+            # another thread holds, so the workers are spawned instead
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def analyze_batch(resumes, processes=None, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Analyze many resumes, yielding the results in input order as they are ready.
+
+    Batches larger than one chunk are spread over a pool of spawned processes
+    (created on first use and kept for the life of the process), a chunk per task.
+
+    Args:
+        resumes (list): resume_data dicts
+        processes (int): Pool size (default: all cores); 0 analyzes in this process
+        chunk_size (int): Resumes per pool task
+
+    Yields:
+        dict: analyze() result of each resume, or {'error': ...} for a
+            malformed one (e.g. a summary that is not a string); one bad
+            resume does not fail the others
+    """
+    if processes == 0 or len(resumes) <= chunk_size:
+        for resume_data in resumes:
+            yield _analyze_one(resume_data)
+        return
+
+    chunks = [resumes[start:start + chunk_size] for start in range(0, len(resumes), chunk_size)]
+    for results in _analysis_pool(processes or os.cpu_count()).map(_analyze_chunk, chunks):
+        yield from results
@@ -0,0 +1,25 @@
+from sqlalchemy import inspect, text
+from models.db import db
+
+
+def upgrade_schema(connection):
+    """
+    Bring an existing database up to the current models.
+
+    db.create_all() only creates missing tables; columns and indexes added to
+    existing tables since the database was created are added here. New
+    columns are added nullable, so rows written before them read as NULL.
+    """
+    inspector = inspect(connection)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
@@ -0,0 +1,188 @@
+import bisect
+import heapq
+import threading
+from collections import Counter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models.db import db
+from models.job import Job
+from utils.job_version import current_job_version, on_job_commit
+from utils.skills import parse_job_skills, skill_ids
+
+# Score given to jobs that do not list any required skills
+DEFAULT_MATCH_SCORE = 0.5
+
+
+class SkillIndex:
+    """
+    In-process inverted index from canonical skill id to the active jobs requiring it.
+
+    The index is built lazily from the jobs table and remembers the jobs
+    write counter (see utils/job_version.py) it was built at. Committed ORM
+    writes made by this process are applied to it in place (see the session
+    hooks below); every lookup compares the counter with the database's, a
+    primary key read, and rebuilds the index when some other write moved it:
+    another worker, a script, or a bulk statement that skips the ORM hooks.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Drop all postings; the index is rebuilt on next use"""
+        with self._lock:
+            self._postings = {}      # skill id -> set of job ids
+            self._job_skills = {}    # job id -> frozenset of skill ids
+            self._active = []        # sorted ids of all indexed jobs
+            self._unskilled = []     # sorted ids of jobs without requirements
+            self._loaded = False
+            self._version = None     # jobs write counter the postings reflect
+
+    def _ensure_current(self):
+        version, _ = current_job_version()
+        if self._loaded and self._version == version:
+            return
+        with self._lock:
+            if self._loaded and self._version == version:
+                return
+            self.reset()
+            # Read after the counter: a write racing the load moves it again
+            rows = db.session.query(Job.id, Job.requirements).filter_by(active=True)
+            for job_id, requirements in rows:
+                self._add(job_id, parse_job_skills(requirements))
+            self._loaded = True
+            self._version = version
+
+    def _add(self, job_id, skills):
+        job_skills = frozenset(skill_ids(skills))
+        self._job_skills[job_id] = job_skills
+        bisect.insort(self._active, job_id)
+        if job_skills:
+            for skill_id in job_skills:
+                self._postings.setdefault(skill_id, set()).add(job_id)
+        else:
+            bisect.insort(self._unskilled, job_id)
+
+    def _remove(self, job_id):
+        job_skills = self._job_skills.pop(job_id, None)
+        if job_skills is None:
+            return
+        _discard_sorted(self._active, job_id)
+        if job_skills:
+            for skill_id in job_skills:
+                posting = self._postings.get(skill_id)
+                if posting is not None:
+                    posting.discard(job_id)
+                    if not posting:
+                        del self._postings[skill_id]
+        else:
+            _discard_sorted(self._unskilled, job_id)
+
+    def apply_commit(self, changes, before, after):
+        """
+        Apply the job writes of a committed transaction that moved the write
+        counter from before to after. Unless the index was current at before,
+        it is left stale and rebuilt on the next lookup.
+
+        Args:
+            changes (dict): job id -> (requirements, active), or None if deleted
+        """
+        with self._lock:
+            if not self._loaded or self._version != before:
+                return
+            for job_id, change in changes.items():
+                self._remove(job_id)
+                if change is not None and (change[1] or change[1] is None):
+                    self._add(job_id, parse_job_skills(change[0]))
+            self._version = after
+
+    def top_matches(self, user_skills, limit=10):
+        """
+        Rank active jobs for a set of user skills.
+
+        Only jobs sharing at least one skill are scored; jobs without
+        requirements keep the default score, and any remaining slots are
+        filled with non-matching jobs at score 0.
+
+        Returns:
+            list: (job_id, match_score, matched_skills) tuples, best first;
+                matched_skills is a frozenset of skill ids
+        """
+        self._ensure_current()
+        user_skill_ids = frozenset(skill_ids(user_skills))
+
+        with self._lock:
+            overlap = Counter()
+            for skill_id in user_skill_ids:
+                overlap.update(self._postings.get(skill_id, ()))
+
+            candidates = [(count / len(self._job_skills[job_id]), job_id)
+                          for job_id, count in overlap.items()]
+            candidates.extend((DEFAULT_MATCH_SCORE, job_id) for job_id in self._unskilled[:limit])
+
+            # Bounded heap: highest score first, lowest id wins ties
+            top = heapq.nlargest(limit, candidates, key=lambda c: (c[0], -c[1]))
+
+            if len(top) < limit:
+                chosen = {job_id for _, job_id in top}
+                for job_id in self._active:
+                    if len(top) >= limit:
+                        break
+                    if job_id not in chosen:
+                        top.append((0.0, job_id))
+
+            return [(job_id, score, self._job_skills[job_id] & user_skill_ids)
+                    for score, job_id in top]
+
+
+def _discard_sorted(values, value):
+    i = bisect.bisect_left(values, value)
+    if i < len(values) and values[i] == value:
+        del values[i]
+
+
+skill_index = SkillIndex()
+
+
+# Keep the index in sync with committed job writes from this process.
+# Changes are collected at flush time and only applied once the transaction
+# commits, so rolled back edits never reach the index. A transaction that
+# also wrote jobs with statements is not applied: the index is rebuilt.
+_PENDING_KEY = 'skill_index_pending'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_job_changes(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Job):
+            session.info.setdefault(_PENDING_KEY, {})[obj.id] = (obj.requirements, obj.active)
+    for obj in session.dirty:
+        if isinstance(obj, Job) and session.is_modified(obj, include_collections=False):
+            session.info.setdefault(_PENDING_KEY, {})[obj.id] = (obj.requirements, obj.active)
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            session.info.setdefault(_PENDING_KEY, {})[obj.id] = None
+
+
+@on_job_commit
+def _apply_job_changes(session, before, after, flushed):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if flushed and pending:
+        skill_index.apply_commit(pending, before, after)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_job_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# The jobs table being (re)created or dropped invalidates every posting
+@event.listens_for(Job.__table__, 'after_create')
+def _reset_on_create(target, connection, **kw):
+    skill_index.reset()
+
+
+@event.listens_for(Job.__table__, 'after_drop')
+def _reset_on_drop(target, connection, **kw):
+    skill_index.reset()
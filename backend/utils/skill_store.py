@@ -0,0 +1,107 @@
+import json
+from sqlalchemy import Float, and_, case, cast, func, select
+from sqlalchemy.exc import IntegrityError
+from models.db import db
+from models.job import Job
+from models.skill import Skill
+from models.user_skill import UserSkill
+from models.job_skill import JobSkill
+from utils.skills import parse_job_skills, skill_ids, skill_registry
+
+# Importance assumed for a required skill when the posting does not rank it
+DEFAULT_IMPORTANCE = 1
+
+
+def get_or_create_skills(names):
+    """
+    Map skill names to rows of the skills table, creating missing ones.
+
+    Every spelling of a skill maps to the one row of its canonical name.
+
+    Returns:
+        dict: registry skill id (see skill_ids()) -> skills row id
+    """
+    canonical = {skill_id: skill_registry.name(skill_id) for skill_id in skill_ids(names)}
+    if not canonical:
+        return {}
+
+    rows = dict(db.session.query(Skill.name, Skill.id).filter(Skill.name.in_(canonical.values())))
+    missing = set(canonical.values()) - rows.keys()
+    for name in sorted(missing):
+        try:
+            # Another request may create the same skill in between
+            with db.session.begin_nested():
+                skill = Skill(name=name)
+                db.session.add(skill)
+            rows[name] = skill.id
+        except IntegrityError:
+            rows[name] = db.session.query(Skill.id).filter(Skill.name == name).scalar()
+    return {skill_id: rows[name] for skill_id, name in canonical.items()}
+
+
+def _job_importance(requirements):
+    """Optional {"importance": {skill: 1-5}} mapping stored next to the skills list, by registry skill id"""
+    try:
+        importance = json.loads(requirements or '{}').get('importance', {})
+    except (json.JSONDecodeError, AttributeError):
+        return {}
+    if not isinstance(importance, dict):
+        return {}
+    return {skill_id: level for name, level in importance.items() for skill_id in skill_ids([name])}
+
+
+def sync_job_skills(job):
+    """Make the job_skills rows of a (flushed) job mirror Job.requirements"""
+    importance = _job_importance(job.requirements)
+    skill_rows = get_or_create_skills(parse_job_skills(job.requirements))
+    wanted = {row_id: importance.get(skill_id, DEFAULT_IMPORTANCE) for skill_id, row_id in skill_rows.items()}
+
+    for row in JobSkill.query.filter_by(job_id=job.id).all():
+        if row.skill_id not in wanted:
+            db.session.delete(row)
+        else:
+            row.importance_level = wanted.pop(row.skill_id)
+    db.session.add_all(JobSkill(job_id=job.id, skill_id=skill_id, importance_level=level)
+                       for skill_id, level in wanted.items())
+
+
+def sync_user_skills(user_id, skills):
+    """Make the user_skills rows of a user mirror their current skill list"""
+    wanted = set(get_or_create_skills(skills).values())
+
+    for row in UserSkill.query.filter_by(user_id=user_id).all():
+        if row.skill_id not in wanted:
+            db.session.delete(row)
+        else:
+            wanted.discard(row.skill_id)
+    db.session.add_all(UserSkill(user_id=user_id, skill_id=skill_id) for skill_id in wanted)
+
+
+def top_jobs_for_user(user_id, limit=10):
+    """
+    Score active jobs for a user in the database.
+
+    The score is the importance-weighted fraction of a job's skills the user
+    has (the plain matched/required fraction when importances are equal).
+    Only jobs sharing at least one skill with the user are grouped, found
+    through the job_skills (skill_id, job_id) index.
+
+    Returns:
+        list: (job_id, match_score) tuples, best first
+    """
+    weight = func.coalesce(JobSkill.importance_level, DEFAULT_IMPORTANCE)
+    matched_weight = func.sum(case((UserSkill.id.isnot(None), weight), else_=0))
+    score = (cast(matched_weight, Float) / func.sum(weight)).label('match_score')
+
+    user_skill_ids = select(UserSkill.skill_id).where(UserSkill.user_id == user_id)
+    candidate_jobs = select(JobSkill.job_id).where(JobSkill.skill_id.in_(user_skill_ids))
+
+    rows = (db.session.query(JobSkill.job_id, score)
+            .join(Job, Job.id == JobSkill.job_id)
+            .outerjoin(UserSkill, and_(UserSkill.skill_id == JobSkill.skill_id,
+                                       UserSkill.user_id == user_id))
+            .filter(Job.active.is_(True), JobSkill.job_id.in_(candidate_jobs))
+            .group_by(JobSkill.job_id)
+            .order_by(score.desc(), JobSkill.job_id)
+            .limit(limit))
+    return [(job_id, float(match_score)) for job_id, match_score in rows]
@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+from models.portfolio import Portfolio
+from models.resume import Resume
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'ml', 'scripts'))
+from skill_registry import load_skill_registry
+
+# Skills are compared by canonical integer id everywhere (skill index, batch
+# matching, recommendations, the skills tables): the registry maps every
+# spelling of a taxonomy skill ('Node.js', 'nodejs', 'JS') to its id through
+# one alias table and splits skills written together ('HTML/CSS'). It is
+# loaded once per process; stored skills outside the taxonomy are interned on
+# first sight and their ids are only stable within the process, so only
+# canonical names (skill_names()) are stored. Skills of one-off comparisons
+# (intern=False) are not interned.
+skill_registry = load_skill_registry()
+
+
+def skill_ids(skills, intern=True):
+    """Distinct canonical ids of free-text skills, in order of first mention"""
+    return skill_registry.ids(skills, intern)
+
+
+def skill_names(skills):
+    """Distinct canonical names of free-text skills, in order of first mention"""
+    return skill_registry.canonical(skills)
+
+
+def parse_user_skills(raw):
+    """Decode a Portfolio/Resume skills column into a flat list of skills"""
+    if not raw:
+        return []
+    try:
+        skills_data = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return []
+
+    # Combine technical and soft skills if structured, or use as list if flat
+    if isinstance(skills_data, dict):
+        return skills_data.get('technical', []) + skills_data.get('soft', [])
+    if isinstance(skills_data, list):
+        return skills_data
+    return []
+
+
+def parse_job_skills(requirements):
+    """Decode a Job.requirements column into its list of required skills"""
+    if not requirements:
+        return []
+    try:
+        job_requirements = json.loads(requirements)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    if not isinstance(job_requirements, dict):
+        return []
+    return job_requirements.get('skills', [])
+
+
+def load_user_skills(user_id):
+    """Get user skills from Portfolio, falling back to the Resume"""
+    portfolio = Portfolio.query.filter_by(user_id=user_id).first()
+    user_skills = parse_user_skills(portfolio.skills) if portfolio else []
+
+    if not user_skills:
+        resume = Resume.query.filter_by(user_id=user_id).first()
+        if resume:
+            user_skills = parse_user_skills(resume.skills)
+
+    return user_skills
@@ -8,7 +8,8 @@ CREATE TABLE users (
     password_hash VARCHAR(120) NOT NULL,
     first_name VARCHAR(50) NOT NULL,
     last_name VARCHAR(50) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Resumes table
@@ -17,14 +18,53 @@ CREATE TABLE resumes (
     user_id INTEGER REFERENCES users(id) NOT NULL,
     file_path VARCHAR(200) NOT NULL,
     original_filename VARCHAR(100) NOT NULL,
-    parsed_data TEXT, -- JSON string of parsed resume data
+    parsed_data TEXT, -- full parse result: compact JSON, or zlib + base64 behind a 'z1:' prefix
     uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     full_name VARCHAR(100),
     email VARCHAR(120),
     phone VARCHAR(20),
-    summary TEXT
+    summary TEXT,
+    content_hash VARCHAR(64), -- SHA-256 hex of the uploaded file
+    parse_truncated BOOLEAN, -- text extraction stopped at a page, size or time budget
+    parser_version INTEGER -- parser version of parsed_data
+);
+
+CREATE INDEX ix_resumes_content_hash ON resumes (content_hash);
+CREATE INDEX ix_resumes_parser_version ON resumes (parser_version);
+
+-- Resume parse queue (see backend/parse_worker.py)
+CREATE TABLE parse_jobs (
+    id SERIAL PRIMARY KEY,
+    resume_id INTEGER REFERENCES resumes(id) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, done or failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    visible_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- retry backoff or lease expiry
+    worker VARCHAR(100),
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX ix_parse_jobs_status_visible ON parse_jobs (status, visible_at, id);
+CREATE INDEX ix_parse_jobs_resume ON parse_jobs (resume_id);
+
+-- Resume parses and analyses cached by content hash (see backend/utils/parse_cache.py)
+CREATE TABLE parse_cache (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL, -- parse or analysis
+    content_hash VARCHAR(64) NOT NULL, -- SHA-256 hex of the input
+    version VARCHAR(200) NOT NULL, -- parser/model/taxonomy or analyzer version
+    result TEXT NOT NULL, -- JSON
+    size INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_parse_cache_key UNIQUE (kind, content_hash, version)
 );
 
+CREATE INDEX ix_parse_cache_last_used ON parse_cache (last_used_at);
+
 -- Jobs table
 CREATE TABLE jobs (
     id SERIAL PRIMARY KEY,
@@ -34,10 +74,84 @@ CREATE TABLE jobs (
     requirements TEXT, -- JSON string of required skills
     location VARCHAR(100),
     salary_range VARCHAR(50),
+    salary_min INTEGER, -- Parsed from salary_range (annual)
+    salary_max INTEGER,
+    city VARCHAR(100), -- Parsed from location
+    region VARCHAR(100),
+    country VARCHAR(2),
+    remote BOOLEAN DEFAULT FALSE,
     posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    active BOOLEAN DEFAULT TRUE
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    active BOOLEAN DEFAULT TRUE,
+    minhash BYTEA, -- MinHash signature of the description
+    canonical_job_id INTEGER REFERENCES jobs(id) -- Set on (inactive) near-duplicates
+);
+
+CREATE INDEX ix_jobs_active_posted_at ON jobs (active, posted_at, id);
+CREATE INDEX ix_jobs_updated_at ON jobs (updated_at);
+CREATE INDEX ix_jobs_salary_max ON jobs (salary_max);
+CREATE INDEX ix_jobs_salary_min ON jobs (salary_min);
+CREATE INDEX ix_jobs_region ON jobs (region);
+CREATE INDEX ix_jobs_country ON jobs (country);
+CREATE INDEX ix_jobs_remote ON jobs (remote);
+CREATE INDEX ix_jobs_canonical_job_id ON jobs (canonical_job_id);
+
+-- LSH band buckets of canonical jobs' MinHash signatures
+CREATE TABLE job_lsh_bands (
+    id SERIAL PRIMARY KEY,
+    job_id INTEGER REFERENCES jobs(id) NOT NULL,
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL
 );
 
+CREATE INDEX ix_job_lsh_bands_bucket ON job_lsh_bands (bucket, band, job_id);
+CREATE INDEX ix_job_lsh_bands_job ON job_lsh_bands (job_id);
+
+-- Precomputed most similar active jobs of each job (see backend/compute_job_neighbors.py)
+CREATE TABLE job_neighbors (
+    id SERIAL PRIMARY KEY,
+    job_id INTEGER REFERENCES jobs(id) NOT NULL,
+    neighbor_id INTEGER REFERENCES jobs(id) NOT NULL,
+    rank INTEGER NOT NULL,
+    score FLOAT NOT NULL,
+    skill_score FLOAT,
+    text_score FLOAT,
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_job_neighbors_job_neighbor UNIQUE (job_id, neighbor_id)
+);
+
+CREATE INDEX ix_job_neighbors_job_rank ON job_neighbors (job_id, rank);
+CREATE INDEX ix_job_neighbors_neighbor ON job_neighbors (neighbor_id);
+
+-- Completed refreshes of job_neighbors; the latest start is the incremental watermark
+CREATE TABLE job_neighbor_runs (
+    id SERIAL PRIMARY KEY,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    "full" BOOLEAN DEFAULT FALSE,
+    refreshed INTEGER DEFAULT 0,
+    neighbors INTEGER DEFAULT 0
+);
+
+CREATE INDEX ix_job_neighbor_runs_started ON job_neighbor_runs (started_at);
+
+-- Write counter of the jobs table, bumped by every transaction writing jobs (see backend/utils/job_version.py)
+CREATE TABLE job_list_version (
+    id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP
+);
+
+INSERT INTO job_list_version (id, version) VALUES (1, 0);
+
+-- Full-text search (see backend/utils/job_search.py)
+ALTER TABLE jobs ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(requirements, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED;
+CREATE INDEX ix_jobs_search_vector ON jobs USING GIN (search_vector);
+
 -- User-Job Matches table
 CREATE TABLE user_job_matches (
     id SERIAL PRIMARY KEY,
@@ -49,6 +163,9 @@ CREATE TABLE user_job_matches (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX ix_user_job_matches_user_score ON user_job_matches (user_id, match_score, id);
+CREATE INDEX ix_user_job_matches_user_job ON user_job_matches (user_id, job_id, id);
+
 -- Skills table
 CREATE TABLE skills (
     id SERIAL PRIMARY KEY,
@@ -62,13 +179,19 @@ CREATE TABLE user_skills (
     user_id INTEGER REFERENCES users(id) NOT NULL,
     skill_id INTEGER REFERENCES skills(id) NOT NULL,
     proficiency_level INTEGER, -- 1-5 scale
-    years_of_experience FLOAT
+    years_of_experience FLOAT,
+    UNIQUE (user_id, skill_id)
 );
 
+CREATE INDEX ix_user_skills_skill_user ON user_skills (skill_id, user_id);
+
 -- Job Skills table
 CREATE TABLE job_skills (
     id SERIAL PRIMARY KEY,
     job_id INTEGER REFERENCES jobs(id) NOT NULL,
     skill_id INTEGER REFERENCES skills(id) NOT NULL,
-    importance_level INTEGER -- 1-5 scale
-);
\ No newline at end of file
+    importance_level INTEGER, -- 1-5 scale
+    UNIQUE (job_id, skill_id)
+);
+
+CREATE INDEX ix_job_skills_skill_job ON job_skills (skill_id, job_id);
\ No newline at end of file
@@ -54,27 +54,50 @@ function validateResumeUpload() {
 }
 
 // Job search functionality
+// Results are fetched one page at a time; the cursor of the next page is kept
+// so "Load more" continues where the previous page ended
+let jobSearchParams = null;
+let jobSearchCursor = null;
+
 function searchJobs() {
     const searchTerm = document.getElementById('job-search').value.toLowerCase();
     const location = document.getElementById('job-location').value.toLowerCase();
     
     // Build query parameters
     const params = new URLSearchParams();
-    if (searchTerm) params.append('title', searchTerm);
+    if (searchTerm) params.append('q', searchTerm);
     if (location) params.append('location', location);
     
+    jobSearchParams = params;
+    jobSearchCursor = null;
+    
     // Display loading message
     const resultsContainer = document.getElementById('job-results');
     if (resultsContainer) {
         resultsContainer.innerHTML = '<p>Searching for jobs...</p>';
     }
     
+    fetchJobsPage(false);
+}
+
+function loadMoreJobs() {
+    if (jobSearchParams && jobSearchCursor) {
+        fetchJobsPage(true);
+    }
+}
+
+function fetchJobsPage(append) {
+    const resultsContainer = document.getElementById('job-results');
+    const params = new URLSearchParams(jobSearchParams);
+    if (jobSearchCursor) params.set('cursor', jobSearchCursor);
+    
     // Make API call to search jobs
     fetch(`http://localhost:5000/api/jobs?${params.toString()}`)
         .then(response => response.json())
         .then(data => {
+            jobSearchCursor = data.next_cursor || null;
             if (resultsContainer) {
-                displayJobs(data.jobs);
+                displayJobs(data.jobs, append);
             }
         })
         .catch(error => {
@@ -86,26 +109,30 @@ function searchJobs() {
 }
 
 // Display jobs in the job results container
-function displayJobs(jobs) {
+function displayJobs(jobs, append = false) {
     const resultsContainer = document.getElementById('job-results');
     
     if (!resultsContainer) return;
     
-    if (!jobs || jobs.length === 0) {
+    const loadMoreButton = document.getElementById('load-more-jobs');
+    if (loadMoreButton) loadMoreButton.remove();
+    
+    if ((!jobs || jobs.length === 0) && !append) {
         resultsContainer.innerHTML = '<p>No jobs found matching your criteria.</p>';
         return;
     }
     
-    resultsContainer.innerHTML = jobs.map(job => `
+    // Keyword searches come back with <mark>ed title and description fragments
+    const cards = (jobs || []).map(job => `
         <div class="job-card">
             <div class="job-header">
-                <h3>${job.title || 'Job Title'}</h3>
+                <h3>${(job.highlight && job.highlight.title) || job.title || 'Job Title'}</h3>
                 <span class="match-score">${Math.floor(Math.random() * 40 + 60)}% Match</span>
             </div>
             <p class="company"><i class="fas fa-building"></i> ${job.company || 'Company Name'}</p>
             <p class="location"><i class="fas fa-map-marker-alt"></i> ${job.location || 'Location'}</p>
             <p class="salary"><i class="fas fa-dollar-sign"></i> ${job.salary_range || 'Salary Range'}</p>
-            <p class="description">${job.description || 'Job description not available.'}</p>
+            <p class="description">${(job.highlight && job.highlight.description) || job.description || 'Job description not available.'}</p>
             <div class="job-tags">
                 <!-- Tags would be populated based on job requirements -->
                 <span class="tag">Python</span>
@@ -118,6 +145,17 @@ function displayJobs(jobs) {
             </div>
         </div>
     `).join('');
+    
+    if (append) {
+        resultsContainer.insertAdjacentHTML('beforeend', cards);
+    } else {
+        resultsContainer.innerHTML = cards;
+    }
+    
+    if (jobSearchCursor) {
+        resultsContainer.insertAdjacentHTML('beforeend',
+            '<button id="load-more-jobs" class="btn secondary-btn" onclick="loadMoreJobs()">Load more</button>');
+    }
 }
 
 // Initialize dashboard charts (using Chart.js)
@@ -0,0 +1,137 @@
+"""
+Compare the text extraction backends on a local corpus of resumes.
+
+Every installed backend extracts every file of its type; throughput is
+files/s and MB/s of input, fidelity the share of the words found by any
+backend of that type that this backend found too (averaged over files).
+The recommendation is the fastest backend whose fidelity is within
+--tolerance of the best one.
+
+    python ml/scripts/benchmark_extractors.py path/to/resumes [--repeat 3]
+"""
+import argparse
+import os
+import re
+import time
+try:
+    from text_extraction import extractor_names, file_kind, get_extractor
+except ImportError:  # imported as ml.scripts.benchmark_extractors
+    from .text_extraction import extractor_names, file_kind, get_extractor
+
+_WORD = re.compile(r'\w+')
+
+
+def find_corpus(directory):
+    """PDF and DOCX files under a directory, by type"""
+    corpus = {'pdf': [], 'docx': []}
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            kind = file_kind(name)
+            if kind:
+                corpus[kind].append(os.path.join(root, name))
+    return corpus
+
+
+def _extract(extractor, file_path):
+    return "".join(extractor.open_pages(file_path)[1])
+
+
+def benchmark(directory, repeat=1):
+    """
+    Time and compare every installed backend on the files under a directory
+
+    Args:
+        directory (str): Corpus directory
+        repeat (int): Extractions of each file per backend; the fastest run counts
+
+    Returns:
+        dict: kind -> backend name -> {'files', 'errors', 'seconds',
+            'files_per_second', 'mb_per_second', 'fidelity'}
+    """
+    results = {}
+    for kind, files in find_corpus(directory).items():
+        if not files:
+            continue
+        size = sum(os.path.getsize(file_path) for file_path in files)
+        words = {}  # backend -> [word set per file]
+        results[kind] = {}
+        for name in extractor_names(kind):
+            extractor = get_extractor(kind, name)
+            seconds, errors, file_words = 0.0, 0, []
+            for file_path in files:
+                best, text = None, ""
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    try:
+                        text = _extract(extractor, file_path)
+                    except Exception:
+                        errors += 1
+                        text = ""
+                        break
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                seconds += best or 0.0
+                file_words.append(set(_WORD.findall(text.lower())))
+            words[name] = file_words
+            results[kind][name] = {
+                'files': len(files),
+                'errors': errors,
+                'seconds': seconds,
+                'files_per_second': len(files) / seconds if seconds else 0,
+                'mb_per_second': size / 1e6 / seconds if seconds else 0,
+            }
+
+        for index in range(len(files)):
+            found_by_any = set().union(*(file_words[index] for file_words in words.values()))
+            for name, file_words in words.items():
+                share = len(file_words[index]) / len(found_by_any) if found_by_any else 1.0
+                results[kind][name].setdefault('fidelity', 0.0)
+                results[kind][name]['fidelity'] += share / len(files)
+    return results
+
+
+def recommend(results, tolerance=0.02):
+    """
+    The fastest backend of each type whose fidelity is within tolerance of the best
+
+    Returns:
+        dict: kind -> backend name
+    """
+    choice = {}
+    for kind, backends in results.items():
+        best_fidelity = max(stats['fidelity'] for stats in backends.values())
+        eligible = {name: stats for name, stats in backends.items()
+                    if stats['fidelity'] >= best_fidelity - tolerance and not stats['errors']}
+        if eligible:
+            choice[kind] = max(eligible, key=lambda name: eligible[name]['files_per_second'])
+    return choice
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the PDF and DOCX text extraction backends')
+    parser.add_argument('directory', help='directory searched recursively for .pdf and .docx files')
+    parser.add_argument('--repeat', type=int, default=1, help='extractions of each file per backend')
+    parser.add_argument('--tolerance', type=float, default=0.02,
+                        help='fidelity a faster backend may give up against the most faithful one')
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('--repeat must be positive')
+
+    results = benchmark(args.directory, args.repeat)
+    if not results:
+        parser.error(f'no .pdf or .docx files under {args.directory}')
+    for kind, backends in results.items():
+        print(f"{kind.upper()} ({next(iter(backends.values()))['files']} files)")
+        for name, stats in sorted(backends.items(), key=lambda item: -item[1]['files_per_second']):
+            print(f"  {name:12} {stats['files_per_second']:8.1f} files/s {stats['mb_per_second']:7.2f} MB/s "
+                  f"fidelity {stats['fidelity']:.3f} errors {stats['errors']}")
+
+    choice = recommend(results, args.tolerance)
+    print("Recommended settings:")
+    for kind, name in choice.items():
+        print(f"  {kind.upper()}_EXTRACTOR={name}")
+
+
+if __name__ == '__main__':
+    main()
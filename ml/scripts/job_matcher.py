@@ -1,11 +1,36 @@
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+import joblib
 import json
+import os
+try:
+    from skill_registry import load_skill_registry
+except ImportError:  # imported as ml.scripts.job_matcher
+    from .skill_registry import load_skill_registry
 
 class JobMatcher:
-    def __init__(self):
+    # File names of a persisted corpus model inside its model directory
+    VECTORIZER_FILE = 'vectorizer.joblib'
+    MATRIX_FILE = 'job_matrix.npz'
+    STATE_FILE = 'state.joblib'
+    
+    def __init__(self, corpus_max_features=50000, drift_threshold=0.1):
         self.tfidf_vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+        
+        # Corpus mode: a vectorizer fitted once over all job descriptions plus
+        # the L2-normalized job matrix, so queries only transform the user text
+        self.corpus_max_features = corpus_max_features
+        self.drift_threshold = drift_threshold
+        self.corpus_vectorizer = None
+        self.job_matrix = None
+        self.job_ids = np.empty(0, dtype=np.int64)  # row -> job id, -1 for removed rows
+        self._rows = {}  # job id -> row
+        self._doc_freq = None  # live document frequency of every vocabulary term
+        self._num_docs = 0
+        self._tokens_seen = 0  # tokens in documents added since the last fit
+        self._tokens_oov = 0  # ... of which were outside the fitted vocabulary
     
     def calculate_similarity(self, user_profile, job_descriptions):
         """
@@ -42,27 +67,30 @@ class JobMatcher:
             job_requirements (list): List of job requirement dictionaries
             
         Returns:
-            dict: Matching results with scores and skill gaps
+            dict: Matching results with scores and skill gaps (canonical skill names)
         """
         results = []
         
-        user_skills_set = set(skill.lower() for skill in user_skills)
+        # Skills are compared by canonical id ('Node.js' is 'nodejs', 'JS' is 'JavaScript'),
+        # without interning the free text of a one-off comparison
+        registry = load_skill_registry()
+        user_skill_ids = set(registry.ids(user_skills, intern=False))
         
         for job in job_requirements:
-            job_skills_set = set(skill.lower() for skill in job.get('skills', []))
+            job_skill_ids = registry.ids(job.get('skills', []), intern=False)
             
             # Calculate match score
-            if job_skills_set:
-                matched_skills = user_skills_set.intersection(job_skills_set)
-                missing_skills = job_skills_set.difference(user_skills_set)
+            if job_skill_ids:
+                matched_skills = [skill_id for skill_id in job_skill_ids if skill_id in user_skill_ids]
+                missing_skills = [skill_id for skill_id in job_skill_ids if skill_id not in user_skill_ids]
                 
-                match_score = len(matched_skills) / len(job_skills_set)
+                match_score = len(matched_skills) / len(job_skill_ids)
                 
                 results.append({
                     'job_id': job.get('id'),
                     'match_score': match_score,
-                    'matched_skills': list(matched_skills),
-                    'missing_skills': list(missing_skills)
+                    'matched_skills': registry.names(matched_skills),
+                    'missing_skills': registry.names(missing_skills)
                 })
             else:
                 results.append({
@@ -74,6 +102,241 @@ class JobMatcher:
         
         return results
 
+    def fit_jobs(self, jobs):
+        """
+        Fit the corpus vectorizer over all job descriptions
+        
+        Args:
+            jobs (iterable): (job_id, description text) pairs
+        """
+        job_ids, texts = [], []
+        for job_id, text in jobs:
+            job_ids.append(job_id)
+            texts.append(text or '')
+        
+        self.corpus_vectorizer = TfidfVectorizer(stop_words='english', max_features=self.corpus_max_features,
+                                                 dtype=np.float32)
+        if texts:
+            self.job_matrix = self.corpus_vectorizer.fit_transform(texts).tocsr()
+            self._doc_freq = np.bincount(self.job_matrix.indices, minlength=self.job_matrix.shape[1]).astype(np.int64)
+        else:
+            self.job_matrix = None
+            self._doc_freq = None
+        self.job_ids = np.array(job_ids, dtype=np.int64)
+        self._rows = {job_id: row for row, job_id in enumerate(job_ids)}
+        self._num_docs = len(texts)
+        self._tokens_seen = 0
+        self._tokens_oov = 0
+    
+    @property
+    def is_fitted(self):
+        return self.job_matrix is not None
+    
+    def update_jobs(self, jobs):
+        """
+        Add new jobs to the corpus model, or replace the vectors of changed ones,
+        using the vocabulary and IDF weights of the last fit
+        
+        Args:
+            jobs (iterable): (job_id, description text) pairs
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+        if not self.is_fitted:
+            raise ValueError("Corpus model is not fitted; call fit_jobs() first")
+        
+        self.remove_jobs(job_id for job_id, _ in jobs)
+        texts = [text or '' for _, text in jobs]
+        new_rows = self.corpus_vectorizer.transform(texts).tocsr()
+        
+        # Track how far the corpus drifts from the one the IDF was fitted on
+        self._doc_freq += np.bincount(new_rows.indices, minlength=new_rows.shape[1])
+        self._num_docs += len(texts)
+        analyzer = self.corpus_vectorizer.build_analyzer()
+        vocabulary = self.corpus_vectorizer.vocabulary_
+        for text in texts:
+            tokens = analyzer(text)
+            self._tokens_seen += len(tokens)
+            self._tokens_oov += sum(1 for token in tokens if token not in vocabulary)
+        
+        first_row = self.job_matrix.shape[0]
+        self.job_matrix = sparse.vstack([self.job_matrix, new_rows], format='csr')
+        self.job_ids = np.concatenate([self.job_ids, np.array([job_id for job_id, _ in jobs], dtype=np.int64)])
+        for offset, (job_id, _) in enumerate(jobs):
+            self._rows[job_id] = first_row + offset
+    
+    def remove_jobs(self, job_ids):
+        """Drop jobs (e.g. deactivated postings) from the corpus model"""
+        rows = [self._rows.pop(job_id) for job_id in job_ids if job_id in self._rows]
+        if not rows:
+            return
+        removed = self.job_matrix[rows]
+        self._doc_freq -= np.bincount(removed.indices, minlength=removed.shape[1])
+        self._num_docs -= len(rows)
+        self.job_ids[rows] = -1
+        
+        # Zero the rows in place; they are dropped on the next save or refit
+        for row in rows:
+            self.job_matrix.data[self.job_matrix.indptr[row]:self.job_matrix.indptr[row + 1]] = 0
+    
+    def idf_drift(self):
+        """
+        Estimate how stale the fitted IDF weights are
+        
+        Returns:
+            float: the larger of the mean relative change of the IDF weights
+                recomputed on the live corpus, and the share of tokens in
+                added documents that fall outside the fitted vocabulary
+        """
+        if not self.is_fitted or self._num_docs <= 0:
+            return 0.0
+        fitted_idf = self.corpus_vectorizer.idf_
+        live_idf = np.log((1 + self._num_docs) / (1 + np.maximum(self._doc_freq, 0))) + 1
+        idf_shift = float(np.mean(np.abs(live_idf - fitted_idf) / fitted_idf))
+        oov_rate = self._tokens_oov / self._tokens_seen if self._tokens_seen else 0.0
+        return max(idf_shift, oov_rate)
+    
+    def needs_refit(self):
+        return self.idf_drift() > self.drift_threshold
+    
+    def has_job(self, job_id):
+        return job_id in self._rows
+    
+    def score_jobs(self, user_profile, job_ids=None):
+        """
+        Cosine similarity between a user profile and jobs of the corpus model
+        
+        Args:
+            user_profile (str): User's resume/profile text
+            job_ids (list): Jobs to score; defaults to every job in the model
+            
+        Returns:
+            numpy.ndarray: Similarity per requested job (0 for unknown jobs)
+        """
+        if not self.is_fitted:
+            raise ValueError("Corpus model is not fitted; call fit_jobs() or load() first")
+        
+        # Rows are L2-normalized, so a sparse dot product is the cosine
+        user_vector = self.corpus_vectorizer.transform([user_profile or ''])
+        if job_ids is None:
+            return (self.job_matrix @ user_vector.T).toarray().ravel()
+        
+        rows = [self._rows.get(job_id, -1) for job_id in job_ids]
+        known = [i for i, row in enumerate(rows) if row >= 0]
+        scores = np.zeros(len(rows), dtype=np.float32)
+        if known:
+            matrix = self.job_matrix[[rows[i] for i in known]]
+            scores[known] = (matrix @ user_vector.T).toarray().ravel()
+        return scores
+    
+    def score_texts(self, user_profile, texts):
+        """
+        Cosine similarity between a user profile and job texts that are not
+        (yet) part of the corpus model, using its fitted vocabulary and IDF
+        """
+        if not self.is_fitted:
+            raise ValueError("Corpus model is not fitted; call fit_jobs() or load() first")
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        user_vector = self.corpus_vectorizer.transform([user_profile or ''])
+        job_vectors = self.corpus_vectorizer.transform(texts)
+        return (job_vectors @ user_vector.T).toarray().ravel()
+    
+    def job_vectors(self, job_ids):
+        """
+        TF-IDF vectors of jobs of the corpus model
+        
+        Args:
+            job_ids (list): Jobs to look up
+            
+        Returns:
+            scipy.sparse.csr_matrix: One L2-normalized row per job (all zero for unknown jobs)
+        """
+        if not self.is_fitted:
+            raise ValueError("Corpus model is not fitted; call fit_jobs() or load() first")
+        
+        rows = [self._rows.get(job_id, -1) for job_id in job_ids]
+        known = [i for i, row in enumerate(rows) if row >= 0]
+        selector = sparse.csr_matrix((np.ones(len(known), dtype=np.float32),
+                                      (known, [rows[i] for i in known])),
+                                     shape=(len(rows), self.job_matrix.shape[0]))
+        return (selector @ self.job_matrix).tocsr()
+    
+    def text_vectors(self, texts):
+        """TF-IDF vectors of texts with the corpus model's vocabulary and IDF"""
+        if not self.is_fitted:
+            raise ValueError("Corpus model is not fitted; call fit_jobs() or load() first")
+        return self.corpus_vectorizer.transform(texts).tocsr()
+    
+    def top_jobs(self, user_profile, limit=10):
+        """
+        Best matching jobs of the corpus model for a user profile
+        
+        Returns:
+            list: (job_id, similarity) pairs, best first
+        """
+        scores = self.score_jobs(user_profile)
+        scores[self.job_ids < 0] = -1
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(self.job_ids[row]), float(scores[row])) for row in top if scores[row] >= 0]
+    
+    def _compact(self):
+        live = np.flatnonzero(self.job_ids >= 0)
+        if len(live) == len(self.job_ids):
+            return
+        self.job_matrix = self.job_matrix[live]
+        self.job_matrix.eliminate_zeros()
+        self.job_ids = self.job_ids[live]
+        self._rows = {int(job_id): row for row, job_id in enumerate(self.job_ids)}
+    
+    def save(self, model_dir):
+        """Persist the corpus model (vectorizer, job matrix and drift state)"""
+        if not self.is_fitted:
+            raise ValueError("Corpus model is not fitted; nothing to save")
+        self._compact()
+        os.makedirs(model_dir, exist_ok=True)
+        state = {
+            'job_ids': self.job_ids,
+            'doc_freq': self._doc_freq,
+            'num_docs': self._num_docs,
+            'tokens_seen': self._tokens_seen,
+            'tokens_oov': self._tokens_oov,
+            'drift_threshold': self.drift_threshold
+        }
+        
+        # Write to temporary files first so readers never see a partial model
+        targets = {
+            self.VECTORIZER_FILE: lambda path: joblib.dump(self.corpus_vectorizer, path),
+            self.MATRIX_FILE: lambda path: sparse.save_npz(path, self.job_matrix),
+            self.STATE_FILE: lambda path: joblib.dump(state, path)
+        }
+        for name, write in targets.items():
+            tmp_path = os.path.join(model_dir, f".{name}.tmp")
+            with open(tmp_path, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, os.path.join(model_dir, name))
+    
+    @classmethod
+    def load(cls, model_dir):
+        """Load a corpus model persisted with save()"""
+        matcher = cls()
+        matcher.corpus_vectorizer = joblib.load(os.path.join(model_dir, cls.VECTORIZER_FILE))
+        matcher.job_matrix = sparse.load_npz(os.path.join(model_dir, cls.MATRIX_FILE)).tocsr()
+        state = joblib.load(os.path.join(model_dir, cls.STATE_FILE))
+        matcher.job_ids = state['job_ids']
+        matcher._rows = {int(job_id): row for row, job_id in enumerate(matcher.job_ids)}
+        matcher._doc_freq = state['doc_freq']
+        matcher._num_docs = state['num_docs']
+        matcher._tokens_seen = state['tokens_seen']
+        matcher._tokens_oov = state['tokens_oov']
+        matcher.drift_threshold = state['drift_threshold']
+        return matcher
+
 # Example usage
 if __name__ == "__main__":
     matcher = JobMatcher()
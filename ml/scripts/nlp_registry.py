@@ -0,0 +1,155 @@
+import os
+import threading
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    SPACY_AVAILABLE = False
+
+DEFAULT_MODEL = os.environ.get('NLP_MODEL', 'en_core_web_sm')
+
+# Pipeline profiles: components left out when the model is loaded. The NER
+# component of the trained English pipelines has its own embedding layer, so
+# it runs without the shared tok2vec, the tagger, the parser or the lemmatizer.
+PROFILES = {
+    'full': (),
+    'ner': ('tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter'),
+}
+DEFAULT_PROFILE = os.environ.get('NLP_PROFILE', 'ner')
+
+# Most texts run through one nlp.pipe call
+MAX_BATCH = 32
+
+
+class _Pending:
+    """A text waiting to be parsed, and its outcome"""
+
+    def __init__(self, text):
+        self.text = text
+        self.doc = None
+        self.error = None
+        self.done = False
+
+
+class _Batcher:
+    """
+    Serializes calls into one spaCy pipeline and batches them: while a batch
+    runs, texts from other threads queue up and the next thread to get the
+    pipeline parses all of them in a single nlp.pipe call.
+    """
+
+    def __init__(self, nlp, max_batch=MAX_BATCH):
+        self.nlp = nlp
+        self.max_batch = max_batch
+        self._queue = []
+        self._queue_lock = threading.Lock()
+        self._pipeline_lock = threading.Lock()
+
+    def parse(self, text):
+        pending = _Pending(text)
+        with self._queue_lock:
+            self._queue.append(pending)
+
+        with self._pipeline_lock:
+            # Another thread may have parsed this text along with its own
+            while not pending.done:
+                with self._queue_lock:
+                    batch = self._queue[:self.max_batch]
+                    del self._queue[:self.max_batch]
+                self._run(batch)
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.doc
+
+    def pipe(self, texts, batch_size=MAX_BATCH):
+        with self._pipeline_lock:
+            return list(self.nlp.pipe(texts, batch_size=batch_size))
+
+    def _run(self, batch):
+        try:
+            docs = list(self.nlp.pipe([pending.text for pending in batch], batch_size=len(batch)))
+        except Exception as e:
+            for pending in batch:
+                pending.error, pending.done = e, True
+            return
+        for pending, doc in zip(batch, docs):
+            pending.doc, pending.done = doc, True
+
+
+class NLPRegistry:
+    """
+    Process-wide cache of loaded spaCy pipelines, one per (model, profile).
+
+    Loading a pipeline takes hundreds of milliseconds and tens of MB, so it
+    happens once per process (or once before a pre-forking server forks its
+    workers, see preload()) rather than once per parser.
+    """
+
+    def __init__(self, model=DEFAULT_MODEL, profile=DEFAULT_PROFILE):
+        self.model = model
+        self.profile = profile
+        self._batchers = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+
+    def configure(self, model=None, profile=None):
+        """Set the default model and profile (e.g. from the app config)"""
+        if profile is not None and profile not in PROFILES:
+            raise ValueError(f"Unknown NLP profile: {profile}")
+        self.model = model or self.model
+        self.profile = profile or self.profile
+
+    def _batcher(self, model=None, profile=None):
+        key = (model or self.model, profile or self.profile)
+        batcher = self._batchers.get(key)
+        if batcher is not None or key in self._failed or not SPACY_AVAILABLE:
+            return batcher
+
+        with self._lock:
+            if key not in self._batchers and key not in self._failed:
+                try:
+                    nlp = spacy.load(key[0], exclude=list(PROFILES[key[1]]))
+                    self._batchers[key] = _Batcher(nlp)
+                except OSError:
+                    print(f"Please install spaCy model: python -m spacy download {key[0]}")
+                    self._failed.add(key)
+        return self._batchers.get(key)
+
+    def get(self, model=None, profile=None):
+        """
+        The loaded pipeline for a model and profile
+
+        Returns:
+            spacy.Language: The pipeline, or None if spaCy or the model is not installed
+        """
+        batcher = self._batcher(model, profile)
+        return batcher.nlp if batcher else None
+
+    def preload(self, model=None, profile=None):
+        """Load a pipeline now; returns whether it is available"""
+        return self.get(model, profile) is not None
+
+    def parse(self, text, model=None, profile=None):
+        """
+        Thread-safe parse of one text, batched with concurrent callers
+
+        Returns:
+            spacy.tokens.Doc: The parsed text, or None if the pipeline is unavailable
+        """
+        batcher = self._batcher(model, profile)
+        return batcher.parse(text) if batcher else None
+
+    def pipe(self, texts, model=None, profile=None, batch_size=MAX_BATCH):
+        """
+        Parse many texts with nlp.pipe
+
+        Returns:
+            list: One Doc per text, or None if the pipeline is unavailable
+        """
+        batcher = self._batcher(model, profile)
+        return batcher.pipe(texts, batch_size) if batcher else None
+
+
+nlp_registry = NLPRegistry()
@@ -1,126 +1,186 @@
-import spacy
-from PyPDF2 import PdfReader
-import docx
 import json
 import re
+try:
+    from nlp_registry import nlp_registry
+    from skill_extractor import load_skill_extractor
+    from section_segmenter import PREAMBLE, segment_sections
+    from text_extraction import (extract_docx_text, extract_limited, extract_pdf_text, extract_sandboxed,
+                                 extract_text)
+except ImportError:  # imported as ml.scripts.resume_parser
+    from .nlp_registry import nlp_registry
+    from .skill_extractor import load_skill_extractor
+    from .section_segmenter import PREAMBLE, segment_sections
+    from .text_extraction import (extract_docx_text, extract_limited, extract_pdf_text, extract_sandboxed,
+                                  extract_text)
+
+# Bumped whenever a change to the parser changes its output
+PARSER_VERSION = 6
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+# Two to four capitalized words, e.g. "Jane Q. Roe"
+NAME_PATTERN = re.compile(r"[A-Z][A-Za-z'.-]*(?: [A-Z][A-Za-z'.-]*){1,3}")
+
+# Sections scanned for skill mentions and for named entities (the candidate's
+# name in the preamble, employers and places in the experience); a text
+# without section headers is scanned whole
+SKILL_SECTIONS = ('summary', 'experience', 'skills', 'projects')
+ENTITY_SECTIONS = (PREAMBLE, 'experience')
 
 class ResumeParser:
-    def __init__(self):
-        # Load spaCy model for NER
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            print("Please install spaCy English model: python -m spacy download en_core_web_sm")
-            self.nlp = None
+    def __init__(self, model=None, profile=None):
+        # The spaCy pipeline is loaded once per process and shared by all parsers
+        self.model = model
+        self.profile = profile
+        self.nlp = nlp_registry.get(model, profile)
+        # Compiled once per process from ml/data/skills_taxonomy.json
+        self.skill_extractor = load_skill_extractor()
     
     def parse_pdf(self, file_path):
         """Parse PDF resume and extract information"""
-        reader = PdfReader(file_path)
-        text = ""
-        
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        
-        return self.extract_info(text)
+        return self.extract_info(extract_pdf_text(file_path))
     
     def parse_docx(self, file_path):
         """Parse DOCX resume and extract information"""
-        doc = docx.Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return self.extract_info(text)
+        return self.extract_info(extract_docx_text(file_path))
     
-    def extract_info(self, text):
-        """Extract information from resume text"""
-        # Process text with spaCy
-        if self.nlp:
-            doc = self.nlp(text)
-            
-            # Extract named entities
-            entities = {
-                'PERSON': [],
-                'ORG': [],
-                'GPE': [],  # Geopolitical entity (locations)
-                'EMAIL': [],
-                'PHONE': []
-            }
-            
-            for ent in doc.ents:
-                if ent.label_ in entities:
-                    entities[ent.label_].append(ent.text)
-            
-            # Extract email addresses using regex
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = re.findall(email_pattern, text)
-            entities['EMAIL'] = emails
-            
-            # Extract phone numbers using regex
-            phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-            phones = re.findall(phone_pattern, text)
-            entities['PHONE'] = phones
-            
-            # Extract skills (simplified approach)
-            skills_keywords = [
-                'python', 'java', 'javascript', 'sql', 'html', 'css', 'react', 'node.js',
-                'machine learning', 'data analysis', 'project management', 'communication',
-                'leadership', 'teamwork', 'problem solving', 'critical thinking'
-            ]
-            
-            skills = []
-            text_lower = text.lower()
-            for skill in skills_keywords:
-                if skill in text_lower:
-                    skills.append(skill)
-            
-            # Extract experience sections
-            experience_sections = self.extract_experience(text)
+    def parse_file(self, file_path, limits=None, sandbox=False, max_memory=None):
+        """
+        Parse a PDF, DOCX or plain text resume and extract information
+        
+        Args:
+            file_path (str): Resume file
+            limits (ExtractionLimits): Page, byte and time budgets of the text extraction
+            sandbox (bool): Extract in a child process under rlimits (see extract_sandboxed)
+            max_memory (int): Bytes the sandboxed extraction may allocate
             
-            return {
-                'entities': entities,
-                'skills': skills,
-                'experience': experience_sections
-            }
+        Returns:
+            dict: extract_info() result, plus 'truncated' (None, or the budget
+                that cut the text short) and 'pages'
+        """
+        if sandbox:
+            extracted = extract_sandboxed(file_path, limits, max_memory)
         else:
-            # Fallback if spaCy is not available
-            return {
-                'text': text,
-                'skills': [],
-                'experience': []
-            }
+            extracted = extract_limited(file_path, limits)
+        return self.with_extraction(self.extract_info(extracted.text, extracted.sections), extracted)
     
-    def extract_experience(self, text):
-        """Extract experience sections from resume"""
-        # Simple approach to find experience sections
-        experience_keywords = ['experience', 'work history', 'employment']
-        sections = []
-        
-        lines = text.split('\n')
-        in_experience_section = False
-        current_section = ""
+    @staticmethod
+    def with_extraction(info, extracted):
+        """Record how the text of a parse result was extracted"""
+        info['pages'] = extracted.pages
+        info['truncated'] = extracted.truncated
+        return info
+    
+    def extract_info(self, text, sections=None):
+        """Extract information from resume text"""
+        if sections is None:
+            sections = segment_sections(text)
+        # Thread-safe; concurrent requests share nlp.pipe batches
+        doc = nlp_registry.parse(self._entity_text(text, sections), self.model, self.profile) if self.nlp else None
+        return self._info_from_doc(text, doc, sections)
+    
+    def extract_info_batch(self, texts, batch_size=32, sections=None):
+        """
+        Extract information from many resume texts with one nlp.pipe pass
         
-        for line in lines:
-            line_lower = line.lower().strip()
+        Args:
+            texts (list): Resume texts
+            batch_size (int): Texts per nlp.pipe batch
+            sections (list): Sections of each text, if already segmented
             
-            # Check if this line starts an experience section
-            if any(keyword in line_lower for keyword in experience_keywords):
-                if current_section:
-                    sections.append(current_section)
-                current_section = line + "\n"
-                in_experience_section = True
-            elif in_experience_section:
-                # Check if we've reached the end of the experience section
-                if line_lower in ['education', 'skills', 'projects', 'certifications'] or \
-                   (line_lower == '' and len(current_section.split('\n')) > 10):
-                    sections.append(current_section)
-                    in_experience_section = False
-                    current_section = ""
-                else:
-                    current_section += line + "\n"
+        Returns:
+            list: extract_info() result for each text
+        """
+        # Section offsets, from one pass over the lines (done during extraction for files)
+        sections = [text_sections if text_sections is not None else segment_sections(text)
+                    for text, text_sections in zip(texts, sections or [None] * len(texts))]
+        docs = None
+        if self.nlp:
+            entity_texts = [self._entity_text(text, text_sections) for text, text_sections in zip(texts, sections)]
+            docs = nlp_registry.pipe(entity_texts, self.model, self.profile, batch_size)
+        return [self._info_from_doc(text, doc, text_sections)
+                for text, doc, text_sections in zip(texts, docs or [None] * len(texts), sections)]
+    
+    @staticmethod
+    def _spans(text, sections, names):
+        """(start, end) of the sections of the given kinds, or of the whole text if it has no headers"""
+        if all(section.name == PREAMBLE for section in sections):
+            return [(0, len(text))]
+        return [(section.header_start, section.end) for section in sections if section.name in names]
+    
+    def _entity_text(self, text, sections):
+        """The text NER runs on: the preamble and experience sections only"""
+        return "\n".join(text[start:end] for start, end in self._spans(text, sections, ENTITY_SECTIONS))
+    
+    def _info_from_doc(self, text, doc, sections):
+        # Named entities (only with spaCy) of the entity sections; emails and phone numbers by regex
+        entities = {
+            'PERSON': [],
+            'ORG': [],
+            'GPE': [],  # Geopolitical entity (locations)
+            'EMAIL': EMAIL_PATTERN.findall(text),
+            'PHONE': PHONE_PATTERN.findall(text)
+        }
+        if doc is not None:
+            for ent in doc.ents:
+                if ent.label_ in ('PERSON', 'ORG', 'GPE'):
+                    entities[ent.label_].append(ent.text)
+        
+        # Taxonomy skills mentioned in the skill sections, in one pass over each:
+        # canonical ids in order of first mention, and every mention as [id, start, end]
+        mentions = [mention for start, end in self._spans(text, sections, SKILL_SECTIONS)
+                    for mention in self.skill_extractor.find(text, start, end)]
         
-        # Add the last section if it exists
-        if current_section:
-            sections.append(current_section)
+        return {
+            'parser_version': PARSER_VERSION,
+            'text': text,
+            'entities': entities,
+            'contact': {
+                'name': self._candidate_name(text, sections, entities['PERSON']),
+                'email': entities['EMAIL'][0] if entities['EMAIL'] else None,
+                'phone': entities['PHONE'][0].strip() if entities['PHONE'] else None
+            },
+            'skills': list(dict.fromkeys(mention['id'] for mention in mentions)),
+            'skill_mentions': [[mention['id'], mention['start'], mention['end']] for mention in mentions],
+            # Offsets only; the experience sections are sliced from the text when read
+            'sections': self._section_offsets(sections)
+        }
+    
+    @staticmethod
+    def _candidate_name(text, sections, people):
+        """The candidate's name: a person named before the first section, else the first name-like line there"""
+        preamble = next((section for section in sections if section.name == PREAMBLE), None)
+        if preamble is None:
+            return people[0] if people else None
+        head = text[preamble.start:preamble.end]
+        for person in people:
+            if person in head:
+                return person
+        for line in head.split('\n'):
+            line = line.strip()
+            if line:
+                return line if NAME_PATTERN.fullmatch(line) else None
+        return None
+    
+    @staticmethod
+    def _section_offsets(sections):
+        return [{'name': section.name, 'header_start': section.header_start, 'start': section.start,
+                 'end': section.end} for section in sections]
+    
+    def extract_experience(self, text, sections=None):
+        """
+        Extract experience sections from resume
         
-        return sections
+        Args:
+            text (str): Resume text
+            sections (list): segment_sections(text), if already computed
+            
+        Returns:
+            list: Text of each experience section, header line included
+        """
+        if sections is None:
+            sections = segment_sections(text)
+        return [text[section.header_start:section.end] for section in sections if section.name == 'experience']
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+from collections import namedtuple
+import re
+
+# Header lines of each section, after lowercasing, dropping punctuation and
+# collapsing whitespace
+SECTION_HEADERS = {
+    'summary': ('summary', 'professional summary', 'career summary', 'executive summary', 'profile',
+                'professional profile', 'objective', 'career objective', 'about me'),
+    'experience': ('experience', 'work experience', 'professional experience', 'relevant experience',
+                   'work history', 'employment', 'employment history', 'career history'),
+    'education': ('education', 'education and training', 'academic background', 'academic history',
+                  'qualifications', 'academic qualifications'),
+    'skills': ('skills', 'technical skills', 'key skills', 'core skills', 'core competencies',
+               'competencies', 'technologies', 'tools and technologies', 'skills and technologies'),
+    'projects': ('projects', 'personal projects', 'selected projects', 'key projects', 'academic projects'),
+    'certifications': ('certifications', 'certificates', 'licenses and certifications',
+                       'certifications and licenses', 'courses and certifications'),
+}
+
+# Text before the first header (name, contact details)
+PREAMBLE = 'preamble'
+
+# Lines longer than this are body text, whatever words they contain
+MAX_HEADER_LENGTH = 40
+
+_HEADERS = {header: name for name, headers in SECTION_HEADERS.items() for header in headers}
+_NOT_WORD = re.compile(r'[^a-z]+')
+
+# header_start: offset of the header line; start/end: the section body
+Section = namedtuple('Section', ['name', 'header_start', 'start', 'end'])
+
+
+def classify_header(line):
+    """Section name of a header line, or None for any other line"""
+    if len(line) > MAX_HEADER_LENGTH:
+        return None
+    return _HEADERS.get(' '.join(_NOT_WORD.sub(' ', line.lower().replace('&', ' and ')).split()))
+
+
+class SectionSegmenter:
+    """
+    Splits a resume into sections in one pass over its lines.
+
+    Text is fed in chunks (e.g. page by page); every line is looked at once
+    and sections are returned as offsets into the text fed so far, so no
+    section text is copied.
+    """
+
+    def __init__(self):
+        self.sections = []
+        self._offset = 0  # offset of the start of the buffered partial line
+        self._partial = ''
+        self._current = (PREAMBLE, 0, 0)  # (name, header start, body start) of the open section
+
+    def feed(self, text):
+        """Consume the next chunk of text; lines may span chunks"""
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._line(line)
+            self._offset += len(line) + 1
+
+    def close(self):
+        """
+        Finish the text
+
+        Returns:
+            list: Section per non-empty section, in text order
+        """
+        if self._partial:
+            self._line(self._partial)
+            self._offset += len(self._partial)
+            self._partial = ''
+        self._close_current(self._offset)
+        return self.sections
+
+    def _line(self, line):
+        name = classify_header(line)
+        if name:
+            self._close_current(self._offset)
+            self._current = (name, self._offset, self._offset + len(line) + 1)
+
+    def _close_current(self, end):
+        name, header_start, start = self._current
+        start = min(start, end)
+        if end > start or name != PREAMBLE:
+            self.sections.append(Section(name, header_start, start, end))
+
+
+def segment_sections(text):
+    """Sections of a resume text (see SectionSegmenter)"""
+    segmenter = SectionSegmenter()
+    segmenter.feed(text)
+    return segmenter.close()
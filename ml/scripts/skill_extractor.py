@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+try:
+    from skill_registry import DEFAULT_TAXONOMY, SkillRegistry, load_skill_registry
+except ImportError:  # imported as ml.scripts.skill_extractor
+    from .skill_registry import DEFAULT_TAXONOMY, SkillRegistry, load_skill_registry
+
+# Runs of whitespace in patterns and texts are matched as a single space
+_SPACE = ' '
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+class SkillExtractor:
+    """
+    Finds the skills of a taxonomy in free text in one pass.
+
+    Every skill name and alias is compiled into an Aho-Corasick automaton,
+    so a scan costs O(len(text) + matches) however large the taxonomy is.
+    Matching is case-insensitive and on word boundaries ('java' does not
+    match inside 'javascript'); overlapping matches resolve to the leftmost
+    longest one ('machine learning engineer' is 'machine learning', not
+    'learning').
+    """
+
+    def __init__(self, taxonomy, registry=None):
+        """
+        Args:
+            taxonomy (dict): {'version': ..., 'skills': [{'id', 'name',
+                'aliases', 'ambiguous'}, ...]}; names of ambiguous skills
+                (e.g. 'Go') are only matched through their aliases
+            registry (SkillRegistry): Registry of the same taxonomy, whose
+                integer ids the automaton emits (default: built from it)
+        """
+        self.version = taxonomy.get('version')
+        self.registry = registry or SkillRegistry(taxonomy)
+        self.skills = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]  # per state: (pattern length, registry id) of every pattern ending there
+
+        for skill in taxonomy.get('skills', []):
+            self.skills[skill['id']] = skill
+            skill_id = self.registry.lookup(skill['id'])
+            terms = list(skill.get('aliases', []))
+            if not skill.get('ambiguous'):
+                terms.append(skill['name'])
+            for term in terms:
+                self._add(self._normalize_term(term), skill_id)
+        self._build()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TAXONOMY, registry=None):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), registry)
+
+    @staticmethod
+    def _normalize_term(term):
+        return _SPACE.join(term.lower().split())
+
+    def _add(self, term, skill_id):
+        if not term:
+            return
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        if (len(term), skill_id) not in self._outputs[state]:
+            self._outputs[state] += ((len(term), skill_id),)
+
+    def _build(self):
+        # Breadth-first: a state's failure link is the longest proper suffix
+        # of its path that is also a path, and it inherits that state's outputs
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._outputs[next_state] += self._outputs[fail]
+                queue.append(next_state)
+
+    def find(self, text, start=0, end=None):
+        """
+        Skill mentions in a text
+
+        Args:
+            text (str): Resume, job description, ...
+            start, end (int): Span of the text to scan (default: all of it)
+
+        Returns:
+            list: {'id', 'skill_id', 'name', 'start', 'end', 'text'} per
+                mention, in text order, with offsets into the original text;
+                'id' is the taxonomy id, 'skill_id' the registry id
+        """
+        if not text:
+            return []
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        positions = []  # original offset of every character fed to the automaton
+        candidates = []
+        state = 0
+        previous_space = True
+        for index in range(start, len(text) if end is None else end):
+            char = text[index]
+            if char.isspace():
+                if previous_space:
+                    continue
+                previous_space = True
+                lowered = _SPACE
+            else:
+                previous_space = False
+                lowered = char.lower()
+            for fed in lowered:
+                positions.append(index)
+                while state and fed not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(fed, 0)
+                for length, skill_id in outputs[state]:
+                    candidates.append((positions[len(positions) - length], index + 1, skill_id))
+
+        mentions = []
+        end_of_last = 0
+        # Leftmost longest, skipping matches inside a word or overlapping a kept one
+        for first, last, skill_id in sorted(candidates, key=lambda c: (c[0], -c[1])):
+            if first < end_of_last:
+                continue
+            if (first > 0 and _is_word_char(text[first - 1]) and _is_word_char(text[first])) or \
+               (last < len(text) and _is_word_char(text[last]) and _is_word_char(text[last - 1])):
+                continue
+            taxonomy_id = self.registry.name(skill_id)
+            mentions.append({'id': taxonomy_id, 'skill_id': skill_id, 'name': self.skills[taxonomy_id]['name'],
+                             'start': first, 'end': last, 'text': text[first:last]})
+            end_of_last = last
+        return mentions
+
+    def extract(self, text):
+        """Ids of the skills mentioned in a text, in order of first mention"""
+        return list(dict.fromkeys(mention['id'] for mention in self.find(text)))
+
+
+_extractors = {}
+_lock = threading.Lock()
+
+
+def load_skill_extractor(path=None):
+    """The compiled extractor of a taxonomy file, built once per process on its shared registry"""
+    path = os.path.abspath(path or os.environ.get('SKILLS_TAXONOMY') or DEFAULT_TAXONOMY)
+    extractor = _extractors.get(path)
+    if extractor is None:
+        with _lock:
+            extractor = _extractors.get(path)
+            if extractor is None:
+                extractor = _extractors[path] = SkillExtractor.from_file(path, load_skill_registry(path))
+    return extractor
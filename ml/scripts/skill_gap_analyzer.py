@@ -1,8 +1,12 @@
 import json
+try:
+    from skill_registry import load_skill_registry
+except ImportError:  # imported as ml.scripts.skill_gap_analyzer
+    from .skill_registry import load_skill_registry
 
 class SkillGapAnalyzer:
     def __init__(self):
-        pass
+        self.skill_registry = load_skill_registry()
     
     def analyze_gaps(self, user_skills, job_requirements):
         """
@@ -15,17 +19,20 @@ class SkillGapAnalyzer:
         Returns:
             dict: Analysis results including gaps and recommendations
         """
-        user_skills_set = set(skill.lower() for skill in user_skills)
+        # Skills are compared by canonical id; a skill written as several
+        # ('HTML/CSS') is matched when the user has all of them
+        user_skill_ids = set(self.skill_registry.ids(user_skills, intern=False))
         job_skills = job_requirements.get('skills', [])
         
         matched_skills = []
         missing_skills = []
         
         for skill in job_skills:
-            skill_name = skill.get('name', '').lower()
+            skill_ids = self.skill_registry.ids([skill.get('name', '')], intern=False)
+            skill_name = '/'.join(self.skill_registry.names(skill_ids))
             importance = skill.get('importance', 1)
             
-            if skill_name in user_skills_set:
+            if skill_ids and user_skill_ids.issuperset(skill_ids):
                 matched_skills.append({
                     'name': skill_name,
                     'importance': importance
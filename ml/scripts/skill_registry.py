@@ -0,0 +1,168 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+
+DEFAULT_TAXONOMY = os.path.join(os.path.dirname(__file__), '..', 'data', 'skills_taxonomy.json')
+
+# Dots, dashes, underscores and whitespace do not tell skills apart:
+# 'Node.js', 'nodejs' and 'node js' are one skill
+_IGNORED = re.compile(r'[\s._-]+')
+
+# Separators of skills written together ('HTML/CSS', 'Docker & Kubernetes')
+_COMPOSITE = re.compile(r'\s*[/&,;|]\s*')
+
+# Skill strings whose ids are remembered per registry
+RESOLVE_CACHE_SIZE = 65536
+
+
+class TransientSkill(int):
+    """
+    Id of a skill outside the taxonomy that was resolved without interning:
+    a negative int derived from its normalized form (so it is the same for
+    every spelling and never an interned id), carrying the lowercased skill
+    """
+
+    def __new__(cls, key, name):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        skill = super().__new__(cls, -1 - int.from_bytes(digest, 'big'))
+        skill.name = name
+        return skill
+
+
+class SkillRegistry:
+    """
+    Canonical integer ids of skills.
+
+    Every skill of the taxonomy gets an id (in taxonomy order), and its
+    name, its taxonomy id and every alias map to it through one alias table
+    keyed by a normalized form (see key()). Skills outside the taxonomy that
+    are stored (job requirements, user skill lists) are interned on first
+    sight with the next free id and the spelling first seen as their one
+    canonical name; their ids are only stable within the process. One-off
+    comparisons (e.g. of a resume being analyzed) pass intern=False so the
+    registry does not grow with them: their unknown skills get a
+    TransientSkill id instead. The last RESOLVE_CACHE_SIZE skill strings
+    resolved are remembered, so a frequent skill is normalized once however
+    often it is compared.
+    """
+
+    def __init__(self, taxonomy):
+        """
+        Args:
+            taxonomy (dict): {'version': ..., 'skills': [{'id', 'name',
+                'aliases'}, ...]} as in ml/data/skills_taxonomy.json
+        """
+        self.version = taxonomy.get('version')
+        self._names = []      # id -> canonical name
+        self._aliases = {}    # normalized form -> id
+        self._lock = threading.Lock()
+        self._resolve = functools.lru_cache(maxsize=RESOLVE_CACHE_SIZE)(self._resolve_ids)
+
+        for skill in taxonomy.get('skills', []):
+            skill_id = len(self._names)
+            self._names.append(skill['id'])
+            for term in [skill['id'], skill['name']] + list(skill.get('aliases', [])):
+                self._aliases.setdefault(self.key(term), skill_id)
+        self.taxonomy_size = len(self._names)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TAXONOMY):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self._names)
+
+    @staticmethod
+    def key(text):
+        """Normalized form skills are compared by"""
+        return _IGNORED.sub('', unicodedata.normalize('NFKC', text).casefold())
+
+    def lookup(self, text):
+        """Id of a skill known so far (the whole text, not split), or None"""
+        return self._aliases.get(self.key(text))
+
+    def intern(self, text):
+        """Id of a skill (the whole text, not split), allocating one for a new skill"""
+        key = self.key(text)
+        skill_id = self._aliases.get(key)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._aliases.get(key)
+                if skill_id is None:
+                    skill_id = len(self._names)
+                    self._names.append(' '.join(text.lower().split()))
+                    self._aliases[key] = skill_id
+        return skill_id
+
+    def _transient_id(self, text):
+        key = self.key(text)
+        skill_id = self._aliases.get(key)
+        if skill_id is None:
+            skill_id = TransientSkill(key, ' '.join(text.lower().split()))
+        return skill_id
+
+    def _resolve_ids(self, text, intern=True):
+        parts = [part for part in _COMPOSITE.split(text.strip()) if self.key(part)]
+        part_ids = [self.lookup(part) for part in parts]
+        if len(parts) > 1 and self.lookup(text) is None and \
+           all(part_id is not None and 0 <= part_id < self.taxonomy_size for part_id in part_ids):
+            # Known skills written together; 'R&D' is not R and D
+            return tuple(dict.fromkeys(part_ids))
+        if not self.key(text):
+            return ()
+        return (self.intern(text) if intern else self._transient_id(text),)
+
+    def ids(self, skills, intern=True):
+        """
+        Canonical ids of free-text skills
+
+        Args:
+            skills (iterable): Skill strings; empty and non-string items are skipped
+            intern (bool): Intern skills outside the taxonomy; with False
+                they get TransientSkill ids and the registry is left as is
+
+        Returns:
+            list: Distinct ids in order of first mention
+        """
+        # Transient ids are not cached: the skill may be interned later
+        resolve = self._resolve if intern else functools.partial(self._resolve_ids, intern=False)
+        found = {}
+        for skill in skills:
+            if isinstance(skill, str):
+                for skill_id in resolve(skill):
+                    found[skill_id] = None
+        return list(found)
+
+    def name(self, skill_id):
+        """Canonical name of an id: the taxonomy id, or the lowercased skill as first seen"""
+        if isinstance(skill_id, TransientSkill):
+            return skill_id.name
+        return self._names[skill_id]
+
+    def names(self, skill_ids):
+        return [self.name(skill_id) for skill_id in skill_ids]
+
+    def canonical(self, skills):
+        """Canonical names of free-text skills (see ids())"""
+        return self.names(self.ids(skills))
+
+
+_registries = {}
+_lock = threading.Lock()
+
+
+def load_skill_registry(path=None):
+    """The skill registry of a taxonomy file, built once per process"""
+    path = os.path.abspath(path or os.environ.get('SKILLS_TAXONOMY') or DEFAULT_TAXONOMY)
+    registry = _registries.get(path)
+    if registry is None:
+        with _lock:
+            registry = _registries.get(path)
+            if registry is None:
+                registry = _registries[path] = SkillRegistry.from_file(path)
+    return registry
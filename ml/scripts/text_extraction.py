@@ -0,0 +1,391 @@
+from collections import namedtuple
+from itertools import islice
+import importlib.util
+import math
+import multiprocessing
+import os
+import time
+import zipfile
+from xml.etree import ElementTree
+from PyPDF2 import PdfReader
+import docx
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+try:
+    from section_segmenter import SectionSegmenter
+except ImportError:  # imported as ml.scripts.text_extraction
+    from .section_segmenter import SectionSegmenter
+
+# Text extraction of resume files, page by page and within budgets. A PDF's
+# pages are extracted one at a time as they are consumed, so a long file
+# stops costing anything once a budget runs out: at most max_pages pages,
+# max_bytes of text and (checked between pages) max_seconds. Untrusted
+# files can be extracted in a forked child under CPU and memory rlimits that
+# is killed when it overruns its time budget; the pages it sent before that
+# are kept and the result is marked truncated.
+#
+# Each file type has pluggable backends (TextExtractor subclasses), selected
+# per process with configure_extractors() or PDF_EXTRACTOR/DOCX_EXTRACTOR;
+# benchmark_extractors.py compares them on a local corpus.
+
+# Budgets; None means unlimited
+ExtractionLimits = namedtuple('ExtractionLimits', ['max_pages', 'max_bytes', 'max_seconds'],
+                              defaults=(None, None, None))
+
+# truncated: None, or why extraction stopped early ('pages', 'bytes', 'time',
+# 'memory' or 'aborted' when the sandboxed child died)
+ExtractedText = namedtuple('ExtractedText', ['text', 'pages', 'truncated', 'sections'])
+
+# Seconds past max_seconds before a sandboxed extraction is killed; the
+# budget itself is only checked between pages
+KILL_GRACE = 5
+
+
+class ExtractionError(RuntimeError):
+    """A file's text could not be extracted"""
+
+
+class TextExtractor:
+    """
+    A text extraction backend for one file type ('pdf' or 'docx').
+
+    open_pages() returns the page count and an iterator of page texts that
+    extracts each page as it is consumed.
+    """
+
+    name = None
+    kind = None
+    module = None  # imported by the backend; it is available when this is installed
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec(cls.module) is not None
+
+    def open_pages(self, file_path):
+        raise NotImplementedError
+
+
+class PyPDF2Extractor(TextExtractor):
+    name, kind, module = 'pypdf2', 'pdf', 'PyPDF2'
+
+    def open_pages(self, file_path):
+        reader = PdfReader(file_path)
+        return len(reader.pages), ((page.extract_text() or "") + "\n" for page in reader.pages)
+
+
+class PypdfExtractor(TextExtractor):
+    """pypdf, the maintained successor of PyPDF2"""
+    name, kind, module = 'pypdf', 'pdf', 'pypdf'
+
+    def open_pages(self, file_path):
+        import pypdf
+        reader = pypdf.PdfReader(file_path)
+        return len(reader.pages), ((page.extract_text() or "") + "\n" for page in reader.pages)
+
+
+class PdfminerExtractor(TextExtractor):
+    """pdfminer.six: slower, but follows the layout of multi-column pages more closely"""
+    name, kind, module = 'pdfminer', 'pdf', 'pdfminer'
+
+    def open_pages(self, file_path):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        from pdfminer.pdfpage import PDFPage
+        with open(file_path, 'rb') as f:
+            page_count = sum(1 for _ in PDFPage.get_pages(f))
+        pages = ("".join(element.get_text() for element in layout if isinstance(element, LTTextContainer)) + "\n"
+                 for layout in extract_pages(file_path))
+        return page_count, pages
+
+
+class PythonDocxExtractor(TextExtractor):
+    """python-docx: builds the whole document tree; body paragraphs only"""
+    name, kind, module = 'python-docx', 'docx', 'docx'
+
+    def open_pages(self, file_path):
+        doc = docx.Document(file_path)
+        return 1, iter(["\n".join([paragraph.text for paragraph in doc.paragraphs])])
+
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Text boxes are stored twice, as DrawingML and as a VML fallback
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+
+class IterparseDocxExtractor(TextExtractor):
+    """
+    Streams the document XML with iterparse instead of building a tree, and
+    also reads tables, text boxes, headers and footers
+    """
+    name, kind, module = 'iterparse', 'docx', 'xml.etree.ElementTree'
+
+    def open_pages(self, file_path):
+        return 1, iter([self._text(file_path)])
+
+    def _text(self, file_path):
+        with zipfile.ZipFile(file_path) as archive:
+            names = archive.namelist()
+            parts = ([name for name in sorted(names) if name.startswith('word/header')] +
+                     ['word/document.xml'] +
+                     [name for name in sorted(names) if name.startswith('word/footer')])
+            texts = []
+            for name in parts:
+                with archive.open(name) as part:
+                    texts.append(self._part_text(part))
+        return "".join(texts)
+
+    @staticmethod
+    def _part_text(part):
+        pieces = []
+        in_fallback = 0
+        open_elements = []
+        for event, element in ElementTree.iterparse(part, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                open_elements.append(element)
+                if tag == _MC_FALLBACK:
+                    in_fallback += 1
+                continue
+            open_elements.pop()
+            if open_elements:
+                # Its text is consumed: detach it, so only the open elements
+                # (the path from the root) are ever held in memory
+                open_elements[-1].remove(element)
+            if tag == _MC_FALLBACK:
+                in_fallback -= 1
+            elif in_fallback:
+                continue
+            elif tag == _W + 't':
+                pieces.append(element.text or "")
+            elif tag == _W + 'tab':
+                pieces.append("\t")
+            elif tag in (_W + 'br', _W + 'cr'):
+                pieces.append("\n")
+            elif tag == _W + 'p':
+                pieces.append("\n")
+        return "".join(pieces)
+
+
+EXTRACTORS = {extractor.name: extractor for extractor in (
+    PyPDF2Extractor, PypdfExtractor, PdfminerExtractor, PythonDocxExtractor, IterparseDocxExtractor)}
+
+# Backend of each file type, chosen per deployment (see configure_extractors)
+DEFAULT_EXTRACTORS = {'pdf': 'pypdf2', 'docx': 'iterparse'}
+_selected = {'pdf': os.environ.get('PDF_EXTRACTOR') or DEFAULT_EXTRACTORS['pdf'],
+             'docx': os.environ.get('DOCX_EXTRACTOR') or DEFAULT_EXTRACTORS['docx']}
+_instances = {}
+
+
+def extractor_names(kind):
+    """Names of the installed backends of a file type"""
+    return [name for name, extractor in EXTRACTORS.items() if extractor.kind == kind and extractor.available()]
+
+
+def configure_extractors(pdf=None, docx=None):
+    """
+    Select the PDF and DOCX backends of this process (e.g. from the app config)
+
+    Raises ValueError for a backend that is unknown or not installed rather
+    than falling back to another one: parse results are cached under the
+    configured backends' names.
+    """
+    for kind, name in (('pdf', pdf), ('docx', docx)):
+        if name is None:
+            continue
+        if name not in EXTRACTORS or EXTRACTORS[name].kind != kind:
+            raise ValueError(f"Unknown {kind} extractor: {name}")
+        if not EXTRACTORS[name].available():
+            raise ValueError(f"{kind} extractor {name} is not installed")
+        _selected[kind] = name
+
+
+def get_extractor(kind, name=None):
+    """The backend of a file type: the named one, or the configured one"""
+    name = name or _selected[kind]
+    extractor = _instances.get(name)
+    if extractor is None:
+        extractor = _instances[name] = EXTRACTORS[name]()
+    return extractor
+
+
+def file_kind(file_path):
+    """'pdf', 'docx' or None (plain text) from a file's extension"""
+    lower = file_path.lower()
+    if lower.endswith('.pdf'):
+        return 'pdf'
+    if lower.endswith('.docx'):
+        return 'docx'
+    return None
+
+
+def open_pages(file_path):
+    """
+    Page count and lazy page texts of a PDF, DOCX or plain text file, with the
+    configured backends; DOCX and text files are a single page
+
+    Returns:
+        tuple: (page count, iterator of page texts)
+    """
+    kind = file_kind(file_path)
+    if kind:
+        return get_extractor(kind).open_pages(file_path)
+    with open(file_path, 'r', errors='replace') as f:
+        return 1, iter([f.read()])
+
+
+def extract_pdf_text(file_path):
+    """Text of a PDF file, page by page"""
+    return "".join(get_extractor('pdf').open_pages(file_path)[1])
+
+
+def extract_docx_text(file_path):
+    """Text of a DOCX file"""
+    return "".join(get_extractor('docx').open_pages(file_path)[1])
+
+
+def extract_text(file_path):
+    """Text of a PDF, DOCX or plain text resume file, without budgets"""
+    return "".join(open_pages(file_path)[1])
+
+
+class PageStream:
+    """
+    Iterates the page texts of a file within an ExtractionLimits budget;
+    once exhausted, truncated says whether (and why) it stopped early
+    """
+
+    def __init__(self, file_path, limits=None):
+        self.file_path = file_path
+        self.limits = limits or ExtractionLimits()
+        self.pages = 0
+        self.size = 0
+        self.truncated = None
+
+    def __iter__(self):
+        limits = self.limits
+        started = time.monotonic()
+        page_count, pages = open_pages(self.file_path)
+        if limits.max_pages is not None and page_count > limits.max_pages:
+            self.truncated = 'pages'
+            pages = islice(pages, limits.max_pages)
+
+        for text in pages:
+            if limits.max_bytes is not None:
+                encoded = text.encode('utf-8')
+                if self.size + len(encoded) > limits.max_bytes:
+                    text = encoded[:limits.max_bytes - self.size].decode('utf-8', errors='ignore')
+                    self.truncated = 'bytes'
+                self.size += len(text.encode('utf-8'))
+            self.pages += 1
+            yield text
+            if self.truncated == 'bytes':
+                return
+            if limits.max_seconds is not None and time.monotonic() - started > limits.max_seconds \
+               and self.pages < page_count:
+                self.truncated = 'time'
+                return
+
+
+def extract_limited(file_path, limits=None):
+    """
+    Text of a file within a budget, segmented into sections as it is read
+
+    Returns:
+        ExtractedText
+    """
+    stream = PageStream(file_path, limits)
+    segmenter = SectionSegmenter()
+    parts = []
+    for text in stream:
+        parts.append(text)
+        segmenter.feed(text)
+    return ExtractedText("".join(parts), stream.pages, stream.truncated, segmenter.close())
+
+
+def _current_address_space():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError):
+        return None
+
+
+def _sandbox_main(connection, file_path, limits, max_memory):
+    """Child process: extract under rlimits, sending each page as it is extracted"""
+    if limits.max_seconds is not None:
+        cpu_seconds = math.ceil(limits.max_seconds) + KILL_GRACE
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    current = _current_address_space()
+    if max_memory and current:
+        # The fork inherits the parent's mappings; the budget is on top of them
+        resource.setrlimit(resource.RLIMIT_AS, (current + max_memory, current + max_memory))
+
+    stream = PageStream(file_path, limits)
+    try:
+        for text in stream:
+            connection.send(('page', text))
+        connection.send(('done', stream.truncated))
+    except MemoryError:
+        connection.send(('done', 'memory'))
+    except Exception as e:
+        connection.send(('error', f'{type(e).__name__}: {e}'))
+    finally:
+        connection.close()
+
+
+def extract_sandboxed(file_path, limits=None, max_memory=None):
+    """
+    extract_limited() in a forked child process under CPU time and address
+    space rlimits, killed KILL_GRACE seconds after its time budget; falls back
+    to extracting in process where fork or rlimits are unavailable
+
+    Args:
+        file_path (str): PDF, DOCX or text file
+        limits (ExtractionLimits): Page, byte and time budgets
+        max_memory (int): Bytes the child may allocate
+
+    Returns:
+        ExtractedText
+    """
+    limits = limits or ExtractionLimits()
+    if resource is None or 'fork' not in multiprocessing.get_all_start_methods():
+        return extract_limited(file_path, limits)
+
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+    child = context.Process(target=_sandbox_main, args=(sender, file_path, limits, max_memory))
+    child.start()
+    sender.close()
+
+    deadline = time.monotonic() + limits.max_seconds + KILL_GRACE if limits.max_seconds is not None else None
+    segmenter = SectionSegmenter()
+    parts = []
+    truncated = 'aborted'
+    try:
+        while True:
+            timeout = max(0, deadline - time.monotonic()) if deadline is not None else None
+            if not receiver.poll(timeout):
+                truncated = 'time'
+                break
+            try:
+                kind, value = receiver.recv()
+            except EOFError:
+                break  # died, e.g. on its CPU limit or the OOM killer
+            if kind == 'page':
+                parts.append(value)
+                segmenter.feed(value)
+            elif kind == 'error':
+                if parts:
+                    break
+                raise ExtractionError(value)
+            else:
+                truncated = value
+                break
+    finally:
+        if child.is_alive():
+            child.kill()
+        child.join()
+        receiver.close()
+    return ExtractedText("".join(parts), len(parts), truncated, segmenter.close())
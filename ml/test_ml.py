@@ -5,6 +5,7 @@ Test script for ML components
 
 import sys
 import os
+import tempfile
 
 # Add parent directory to path to import ML modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -13,6 +14,11 @@ from ml.scripts.resume_parser import ResumeParser
 from ml.scripts.job_matcher import JobMatcher
 from ml.scripts.skill_gap_analyzer import SkillGapAnalyzer
 from ml.scripts.resume_generator import ResumeGenerator
+from ml.scripts.skill_extractor import SkillExtractor, load_skill_extractor
+from ml.scripts.skill_registry import load_skill_registry
+from ml.scripts.section_segmenter import SectionSegmenter, segment_sections
+from ml.scripts.text_extraction import (EXTRACTORS, ExtractionLimits, configure_extractors, extract_limited,
+                                        extract_sandboxed, get_extractor)
 
 def test_resume_parser():
     """Test the resume parser component"""
@@ -54,9 +60,151 @@ def test_resume_parser():
     
     print("Parsed entities:", parsed_data.get('entities', {}))
     print("Parsed skills:", parsed_data.get('skills', []))
-    print("Experience sections:", len(parsed_data.get('experience', [])))
+    print("Experience sections:", len(parser.extract_experience(parsed_data['text'])))
+    
+    # The spaCy pipeline is loaded once per process and shared by every parser
+    print("Pipeline shared between parsers:", ResumeParser().nlp is parser.nlp)
+    batch = parser.extract_info_batch([sample_resume, sample_resume.replace('SQL', 'Java')])
+    print("Batch parsed skills:", [info.get('skills', []) for info in batch])
+    
+    # Skills are only looked for in the sections that list them, with offsets into the whole text
+    text = "Jane Roe\n\nEducation\nThesis on Kubernetes\n\nSkills\nPython, SQL\n"
+    parsed = parser.extract_info(text)
+    assert parsed['skills'] == ['python', 'sql']
+    assert [text[start:end] for _, start, end in parsed['skill_mentions']] == ['Python', 'SQL']
+    assert parser.extract_info("Kubernetes and Python")['skills'] == ['kubernetes', 'python']
     print("Resume Parser test completed.\n")
 
+def test_skill_extractor():
+    """Test the taxonomy skill extractor"""
+    print("Testing Skill Extractor...")
+    
+    extractor = load_skill_extractor()
+    print(f"Taxonomy version {extractor.version}: {len(extractor.skills)} skills")
+    
+    # Word boundaries, aliases and whitespace runs; ambiguous names only match qualified aliases
+    text = "JavaScript and Node.js developer, some Java.\nMachine   learning in golang. Go-to-market, R&D."
+    for mention in extractor.find(text):
+        print(f"  {mention['id']} at {mention['start']}-{mention['end']}: {mention['text']!r}")
+    assert extractor.extract(text) == ['javascript', 'node.js', 'java', 'machine learning', 'go']
+    
+    # Leftmost longest match wins over the shorter overlapping one
+    small = SkillExtractor({'skills': [{'id': 'learning', 'name': 'Learning'},
+                                       {'id': 'machine learning', 'name': 'Machine Learning'}]})
+    assert small.extract('machine learning engineer') == ['machine learning']
+    
+    print("Skill Extractor test completed.\n")
+
+def test_skill_registry():
+    """Test the canonical skill registry"""
+    print("Testing Skill Registry...")
+    
+    registry = load_skill_registry()
+    print(f"Taxonomy version {registry.version}: {registry.taxonomy_size} skills")
+    
+    # Spellings and aliases of a skill share its id; known skills written together are split
+    for skills in (['Node.js', 'nodejs', 'Node JS'], ['JS', 'JavaScript'], ['HTML/CSS', 'html', 'CSS3']):
+        print(f"  {skills} -> {registry.canonical(skills)}")
+    assert registry.canonical(['Node.js', 'nodejs', 'Node JS']) == ['node.js']
+    assert registry.ids(['JS']) == registry.ids(['JavaScript'])
+    assert registry.canonical(['HTML/CSS']) == ['html', 'css']
+    
+    # One-off comparisons do not intern other skills; their ids are still ints equal for every spelling
+    size = len(registry)
+    transient = registry.ids(['Quantum Basket-Weaving'], intern=False)
+    assert transient == registry.ids(['quantum basketweaving'], intern=False) and transient[0] < 0
+    assert registry.names(transient) == ['quantum basket-weaving']
+    assert (registry.lookup('Quantum Basket-Weaving'), len(registry)) == (None, size)
+    
+    # Stored skills are interned: one id and one canonical name per normalized form
+    assert registry.canonical(['Quantum Basket-Weaving', 'quantum basketweaving']) == ['quantum basket-weaving']
+    assert registry.ids(['quantum basketweaving'])[0] >= registry.taxonomy_size
+    assert registry.ids(['quantum basketweaving'], intern=False) == registry.ids(['Quantum Basket-Weaving'])
+    assert len(registry.ids(['R&D'])) == 1
+    
+    # The extractor emits the registry's ids
+    mention = load_skill_extractor().find("Built APIs in nodejs")[0]
+    assert (mention['id'], mention['skill_id']) == ('node.js', registry.lookup('Node.js'))
+    
+    print("Skill Registry test completed.\n")
+
+def test_section_segmenter():
+    """Test the single-pass section segmenter"""
+    print("Testing Section Segmenter...")
+    
+    text = ("Jane Roe\njane@example.com\n\nSummary\nData engineer.\n\nWORK EXPERIENCE:\n"
+            "Engineer, Acme (2020-2024)\n- 5 years of experience with Spark\n\nEducation\n"
+            "B.S. Computer Science\nSkills & Technologies\nPython, SQL")
+    sections = segment_sections(text)
+    for section in sections:
+        print(f"  {section.name} at {section.start}-{section.end}: {text[section.start:section.end]!r}")
+    # Body lines mentioning a section name ("experience with Spark") are not headers
+    assert [section.name for section in sections] == ['preamble', 'summary', 'experience', 'education', 'skills']
+    assert text[sections[-1].start:sections[-1].end] == "Python, SQL"
+    
+    # Fed in chunks that split lines, the offsets are the same
+    segmenter = SectionSegmenter()
+    for start in range(0, len(text), 7):
+        segmenter.feed(text[start:start + 7])
+    assert segmenter.close() == sections
+    
+    print("Section Segmenter test completed.\n")
+
+def test_text_extraction():
+    """Test page-streaming text extraction within budgets"""
+    print("Testing Text Extraction...")
+    from PyPDF2 import PdfWriter
+    
+    with tempfile.TemporaryDirectory() as directory:
+        pdf_path = os.path.join(directory, 'long.pdf')
+        writer = PdfWriter()
+        for _ in range(5):
+            writer.add_blank_page(width=612, height=792)
+        with open(pdf_path, 'wb') as f:
+            writer.write(f)
+        text_path = os.path.join(directory, 'cv.txt')
+        with open(text_path, 'w') as f:
+            f.write("Experience\n" + "Built data pipelines in Python.\n" * 100)
+        
+        extracted = extract_limited(pdf_path, ExtractionLimits(max_pages=2))
+        print(f"PDF: {extracted.pages} pages, truncated: {extracted.truncated}")
+        assert (extracted.pages, extracted.truncated) == (2, 'pages')
+        
+        extracted = extract_limited(text_path, ExtractionLimits(max_bytes=100))
+        print(f"Text: {len(extracted.text)} bytes, truncated: {extracted.truncated}")
+        assert (len(extracted.text), extracted.truncated) == (100, 'bytes')
+        assert [section.name for section in extracted.sections] == ['experience']
+        
+        # The sandboxed child streams the same pages back
+        assert extract_sandboxed(text_path, ExtractionLimits(max_bytes=100), 256 * 1024 * 1024) == extracted
+        assert extract_sandboxed(pdf_path, ExtractionLimits(max_pages=2)).truncated == 'pages'
+        
+        # The streaming DOCX backend also reads headers and tables
+        import docx
+        document = docx.Document()
+        document.sections[0].header.paragraphs[0].text = "Jane Roe | jane@example.com"
+        document.add_paragraph("Skills")
+        document.add_table(rows=1, cols=2).cell(0, 0).text = "Kubernetes"
+        docx_path = os.path.join(directory, 'cv.docx')
+        document.save(docx_path)
+        for name in ('iterparse', 'python-docx'):
+            text = "".join(get_extractor('docx', name).open_pages(docx_path)[1])
+            print(f"DOCX with {name}: {text!r}")
+        assert "".join(get_extractor('docx', 'iterparse').open_pages(docx_path)[1]) == \
+            "Jane Roe | jane@example.com\nSkills\nKubernetes\n\n"
+        
+        # A backend that is not installed is an error, not a silent fallback
+        missing = [name for name, extractor in EXTRACTORS.items() if not extractor.available()]
+        for name in missing:
+            try:
+                configure_extractors(**{EXTRACTORS[name].kind: name})
+            except ValueError as e:
+                print(f"Not installed: {e}")
+            else:
+                raise AssertionError(f"{name} was configured without being installed")
+    
+    print("Text Extraction test completed.\n")
+
 def test_job_matcher():
     """Test the job matcher component"""
     print("Testing Job Matcher...")
@@ -77,6 +225,14 @@ def test_job_matcher():
     for i, score in enumerate(similarities):
         print(f"Job {i+1} similarity score: {score:.3f}")
     
+    # Test corpus mode: fit once, then only transform the user profile
+    corpus_matcher = JobMatcher()
+    corpus_matcher.fit_jobs(enumerate(job_descriptions, 1))
+    corpus_matcher.update_jobs([(4, "Python machine learning engineer")])
+    for job_id, score in corpus_matcher.top_jobs(user_profile, limit=2):
+        print(f"Corpus job {job_id} similarity score: {score:.3f}")
+    print(f"IDF drift after update: {corpus_matcher.idf_drift():.3f}")
+    
     # Test skill matching
     user_skills = ['Python', 'Machine Learning', 'SQL']
     job_requirements = [
@@ -117,6 +273,12 @@ def test_skill_gap_analyzer():
     
     # Analyze gaps
     gaps = analyzer.analyze_gaps(user_skills, job_requirements)
+    assert [skill['name'] for skill in gaps['matched_skills']] == ['python', 'sql']
+    
+    # Skills are compared by canonical id, whatever their spelling
+    spelled = analyzer.analyze_gaps(['nodejs', 'JS', 'HTML/CSS'], {'skills': [
+        {'name': 'Node.js'}, {'name': 'JavaScript'}, {'name': 'HTML'}]})
+    assert spelled['match_percentage'] == 100
     
     print(f"Match percentage: {gaps['match_percentage']:.1f}%")
     print(f"Matched skills: {[skill['name'] for skill in gaps['matched_skills']]}")
@@ -171,6 +333,10 @@ def main():
     
     try:
         test_resume_parser()
+        test_skill_extractor()
+        test_skill_registry()
+        test_section_segmenter()
+        test_text_extraction()
         test_job_matcher()
         test_skill_gap_analyzer()
         test_resume_generator()